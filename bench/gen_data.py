@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试数据生成
+按指定规模生成与真实数据格式一致的合成输入：
+monitor/updates.md（标题/URL 使用各高校真实的日期格式）及由其规范化得到的 notices.jsonl、
+院校网址汇总.md、以及带导师子目录的学校文件夹。
+"""
+
+import argparse
+import os
+import random
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBAPP_DIR = os.path.join(ROOT_DIR, "webapp")
+MONITOR_DIR = os.path.join(ROOT_DIR, "monitor")
+
+# 预设规模
+SCALES = {
+    "small": {"notices": 1000, "sections": 30, "files_per_school": 50, "profs_per_school": 5},
+    "medium": {"notices": 10000, "sections": 100, "files_per_school": 300, "profs_per_school": 20},
+    "large": {"notices": 100000, "sections": 300, "files_per_school": 2000, "profs_per_school": 50},
+}
+
+# 与 updates.md 中 "### 学校 - 部门" 一致的来源名
+SOURCES = [
+    "上海交通大学 - AI学院", "上海交通大学 - 计算机学院", "上海交通大学 - 研究生招生网",
+    "中科院 - 自动化所通知", "中科院 - 自动化所硕士招生", "中科院 - 计算所通知", "中科院 - 计算所招生",
+    "北京大学 - 智能学院", "北京大学 - 计算机学院", "北京大学 - 软微学院", "北京大学 - 夏令营统一页",
+    "南京大学 - 智科院", "南京大学 - 计算机学院夏令营",
+    "浙江大学 - 计算机学院通知", "浙江大学 - 计算机学院招生",
+    "清华大学 - 电子系动态", "清华大学 - 自动化系通知", "清华大学 - 自动化系研招",
+    "清华大学 - 计算机系通知", "清华大学 - 计算机系招生", "清华大学 - 夏令营统一页",
+]
+
+# 院校网址汇总.md 中能映射到学校 id 的章节名
+KNOWN_SECTIONS = [
+    "上海交通大学 人工智能学院", "上海交通大学 计算机科学与工程系（现计算机学院）",
+    "中国科学院 自动化研究所", "中国科学院 计算技术研究所",
+    "北京大学 智能学院", "北京大学 计算机学院", "北京大学 软件与微电子学院",
+    "南京大学 智能科学与技术学院", "南京大学 计算机科学与技术系（现计算机学院）",
+    "浙江大学 计算机科学与技术学院", "清华大学 电子工程系", "清华大学 自动化系",
+    "清华大学 计算机科学与技术系",
+]
+
+SUBJECTS = [
+    "优秀大学生夏令营通知", "暑期学校招生简章", "推荐免试研究生预报名通知",
+    "接收推免研究生复试安排", "夏令营入营名单公示", "拟录取名单公示",
+    "博士研究生招生简章", "直博生遴选办法", "开放日活动报名", "硕博连读考核及录取办法",
+    "人工智能方向夏令营", "计算机学科优才计划", "电子系暑期营员名单", "自动化系招生说明",
+]
+
+CN_MONTHS = ["一月", "二月", "三月", "四月", "五月", "六月",
+             "七月", "八月", "九月", "十月", "十一月", "十二月"]
+EN_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+             "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _title(rng, i):
+    """按各高校列表页的真实日期格式生成标题"""
+    y, m, d = rng.randint(2022, 2026), rng.randint(1, 12), rng.randint(1, 28)
+    subject = f"{y}年{rng.choice(SUBJECTS)}（{i}）"
+    fmt = rng.randrange(10)
+    if fmt == 0:
+        return f"{y}-{m:02d}-{d:02d}{subject}"
+    if fmt == 1:
+        return f"{y}{m:02d}/{d:02d}{subject}"
+    if fmt == 2:
+        return f"{d:02d}{y}-{m:02d}{subject}"
+    if fmt == 3:
+        return f"{y}.{m:02d}.{d:02d} {subject}"
+    if fmt == 4:
+        return f"{d:02d}{y}.{m:02d}{subject}"
+    if fmt == 5:
+        return f"{m:02d}.{d:02d}/{y}{subject}"
+    if fmt == 6:
+        return f"{EN_MONTHS[m - 1]} {d}, {y} {subject}"
+    if fmt == 7:
+        return f"{d:02d}{CN_MONTHS[m - 1]}{subject}"
+    if fmt == 8:
+        return f"关于{y}年{m}月{d}日{rng.choice(SUBJECTS)}（{i}）"
+    return subject
+
+
+def _url(rng, i):
+    """按各高校真实的 URL 格式生成链接（部分不含日期）"""
+    y, m, d = rng.randint(2022, 2026), rng.randint(1, 12), rng.randint(1, 28)
+    fmt = rng.randrange(6)
+    if fmt == 0:
+        return f"https://ia.cas.cn/yjsjy/zs/sszs/{y}{m:02d}/t{y}{m:02d}{d:02d}_{i}.html"
+    if fmt == 1:
+        return f"https://yzb.nju.edu.cn/{y}/{m:02d}{d:02d}/c{rng.randint(100, 999)}a{i}/page.htm"
+    if fmt == 2:
+        return f"https://ict.cas.cn/yjsjy/zsxx/{y}{m:02d}/P0{y % 100:02d}{y}{m:02d}{d:02d}{i}.pdf"
+    if fmt == 3:
+        return f"https://www.cs.sjtu.edu.cn/{y}/{m:02d}{d:02d}/{i}.html"
+    if fmt == 4:
+        return f"https://www.ee.tsinghua.edu.cn/info/1078/{i}.htm"
+    return f"https://cs.pku.edu.cn/info/{rng.randint(1000, 9999)}/{i}.htm"
+
+
+def write_updates_md(path, count, rng):
+    """生成 updates.md：每批 50 条，模拟爬虫多次追加"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# 高校招生通知监控\n\n")
+        f.write("本文件由爬虫自动生成，记录新发现的招生相关通知。\n\n")
+        f.write("---\n\n")
+        written = 0
+        while written < count:
+            batch = min(50, count - written)
+            f.write(f"## 2025-06-01 08:00:00 更新（共 {batch} 条新通知）\n\n")
+            remaining = batch
+            while remaining:
+                n = min(remaining, rng.randint(1, 10))
+                f.write(f"### {rng.choice(SOURCES)}\n\n")
+                for _ in range(n):
+                    f.write(f"- [{_title(rng, written)}]({_url(rng, written)})\n")
+                    written += 1
+                f.write("\n")
+                remaining -= n
+            f.write("---\n\n")
+
+
+def write_schools_md(path, sections, rng):
+    """生成院校网址汇总.md：已知学校章节在前，其余为合成章节"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# 院校网址汇总\n\n")
+        for i in range(sections):
+            name = KNOWN_SECTIONS[i] if i < len(KNOWN_SECTIONS) else f"合成大学{i} 合成学院{i}"
+            f.write(f"\n## {i + 1}. {name}\n\n")
+            f.write(f"- **官网**: https://www.school{i}.edu.cn/\n")
+            f.write(f"- **研究生招生**: https://yz.school{i}.edu.cn/zsxx.htm\n")
+            f.write(f"  - 另一入口: https://gs.school{i}.edu.cn/\n")
+            for j in range(rng.randint(0, 4)):
+                f.write(f"- **其他链接{j}**: https://www.school{i}.edu.cn/page{j}.htm\n")
+
+
+def write_school_folders(base_dir, folders, files_per_school, profs_per_school, rng):
+    """生成学校文件夹：学院级文件分布在若干子目录中，另有导师子目录"""
+    names = ["申请表", "推荐信", "成绩单", "研究计划书", "个人陈述", "招生简章", "报名确认", "证明材料"]
+    for folder in folders:
+        root = os.path.join(base_dir, folder)
+        for i in range(files_per_school):
+            sub = os.path.join(root, f"资料{i % 10}") if i % 3 else root
+            os.makedirs(sub, exist_ok=True)
+            with open(os.path.join(sub, f"{rng.choice(names)}_{i}.pdf"), "wb") as f:
+                f.write(os.urandom(rng.randint(256, 4096)))
+        for p in range(profs_per_school):
+            prof = os.path.join(root, f"导师{p}")
+            os.makedirs(prof, exist_ok=True)
+            with open(os.path.join(prof, "陶瓷邮件.md"), "w", encoding="utf-8") as f:
+                f.write(f"导师{p} 您好：\n")
+            if p % 3 == 0:
+                with open(os.path.join(prof, "回复.md"), "w", encoding="utf-8") as f:
+                    f.write("同学你好\n")
+            with open(os.path.join(prof, "简历.pdf"), "wb") as f:
+                f.write(b"%PDF-1.4 cv")
+    profile = os.path.join(base_dir, "个人资料")
+    os.makedirs(profile, exist_ok=True)
+    with open(os.path.join(profile, "简历.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4 cv")
+
+
+def school_folders():
+    """读取 webapp 中的学校文件夹名（与被测代码保持一致）"""
+    sys.path.insert(0, WEBAPP_DIR)
+    import app
+    return list(app.SCHOOL_FOLDERS.values())
+
+
+def write_notices_store(base_dir):
+    """按爬虫的规范化规则由 updates.md 生成 notices.jsonl"""
+    sys.path.insert(0, MONITOR_DIR)
+    import normalize
+    monitor = os.path.join(base_dir, "monitor")
+    normalize.reprocess(os.path.join(monitor, "updates.md"), os.path.join(monitor, "notices.jsonl"),
+                        os.environ.get("CAMP_SCHOOLS_JSON") or os.path.join(WEBAPP_DIR, "schools.json"))
+
+
+def generate(base_dir, notices, sections, files_per_school, profs_per_school, folders, seed=0):
+    """在 base_dir 下生成一整套合成数据"""
+    rng = random.Random(seed)
+    write_updates_md(os.path.join(base_dir, "monitor", "updates.md"), notices, rng)
+    write_notices_store(base_dir)
+    write_schools_md(os.path.join(base_dir, "院校网址汇总.md"), sections, rng)
+    write_school_folders(base_dir, folders, files_per_school, profs_per_school, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试用的合成数据")
+    parser.add_argument("out", help="输出目录")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--notices", type=int, help="通知条数（覆盖预设）")
+    parser.add_argument("--sections", type=int, help="院校网址汇总.md 章节数（覆盖预设）")
+    parser.add_argument("--files-per-school", type=int, help="每校学院级文件数（覆盖预设）")
+    parser.add_argument("--profs-per-school", type=int, help="每校导师数（覆盖预设）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+    os.environ["CAMP_BASE_DIR"] = args.out
+    generate(args.out, folders=school_folders(), seed=args.seed, **params)
+    print(f"已生成: {args.out} {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+webapp 并发压测
+在合成数据上以子进程启动服务（serve.py 或开发服务器 app.py），用 asyncio 直接收发 HTTP/1.1（keep-alive，无外部依赖），
+按权重混合请求 /api/schools、/api/notices、/api/school/<id>、状态/截止日期 PUT 与 /api/file 下载，
+输出各路由的吞吐量与 p50/p95/p99 延迟（JSON）。
+
+用法:
+    python3 bench/load_test.py --scale small --concurrency 32 --duration 30 --output load.json
+    python3 bench/load_test.py --mix schools=5,file=1 --workers 1 --threads 16
+    python3 bench/load_test.py --server dev
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+WEBAPP_DIR = os.path.join(ROOT_DIR, "webapp")
+
+sys.path.insert(0, BENCH_DIR)
+from gen_data import SCALES  # noqa: E402
+from run_bench import git_revision  # noqa: E402
+
+# 结果格式版本，格式不兼容时递增
+RESULT_FORMAT = 1
+
+# 默认请求混合（权重），大致对应看板页面的实际访问比例
+DEFAULT_MIX = {
+    "schools": 30,
+    "notices": 20,
+    "school_detail": 25,
+    "put_status": 5,
+    "put_deadline": 5,
+    "file": 15,
+}
+
+# 等待服务就绪的最长时间（秒）
+STARTUP_TIMEOUT = 60
+# 每个被下载的学校最多取多少个文件
+FILES_PER_SCHOOL = 20
+
+
+# ========== HTTP 客户端 ==========
+
+class Connection:
+    """单个 keep-alive 连接，出错或服务端关闭后在下次请求时重连"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def request(self, method, path, body=None):
+        """发送请求，返回 (状态码, 正文字节数)"""
+        if self._writer is None:
+            await self._connect()
+        try:
+            return await asyncio.wait_for(self._exchange(method, path, body), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _exchange(self, method, path, body):
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                "Connection: keep-alive"]
+        payload = b""
+        if body is not None:
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            head += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+        self._writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await self._writer.drain()
+
+        raw = await self._reader.readuntil(b"\r\n\r\n")
+        lines = raw.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304):
+            size = 0
+        elif "content-length" in headers:
+            size = int(headers["content-length"])
+            await self._reader.readexactly(size)
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            size = await self._read_chunked()
+        else:
+            size = len(await self._reader.read())
+            self.close()
+            return status, size
+        if headers.get("connection", "").lower() == "close" or lines[0].startswith("HTTP/1.0"):
+            self.close()
+        return status, size
+
+    async def _read_chunked(self):
+        size = 0
+        while True:
+            line = await self._reader.readuntil(b"\r\n")
+            length = int(line.split(b";")[0], 16)
+            if not length:
+                # 末尾可能带 trailer，读到空行为止
+                while await self._reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return size
+            await self._reader.readexactly(length + 2)
+            size += length
+
+
+# ========== 路由混合 ==========
+
+def parse_mix(spec):
+    """"schools=5,file=1" → 权重字典；未列出的路由权重为 0"""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = dict.fromkeys(DEFAULT_MIX, 0)
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"未知路由 {name}，可选: {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("路由权重不能全为 0")
+    return mix
+
+
+class Workload:
+    """由服务端返回的学校、状态与文件列表生成具体请求"""
+
+    def __init__(self, school_ids, statuses, files):
+        self.school_ids = school_ids
+        self.statuses = statuses
+        self.files = files
+
+    def make(self, name, rng):
+        """返回 (方法, 路径, 请求体)"""
+        sid = rng.choice(self.school_ids)
+        if name == "schools":
+            return "GET", "/api/schools", None
+        if name == "notices":
+            return "GET", "/api/notices", None
+        if name == "school_detail":
+            return "GET", f"/api/school/{sid}", None
+        if name == "put_status":
+            return "PUT", f"/api/school/{sid}/status", {"status": rng.choice(self.statuses)}
+        if name == "put_deadline":
+            deadline = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            return "PUT", f"/api/school/{sid}/deadline", {"deadline": deadline}
+        if name == "file":
+            file_sid, path = rng.choice(self.files)
+            return "GET", f"/api/file/{file_sid}/{quote(path)}", None
+        raise ValueError(name)
+
+
+async def _get_json(host, port, path):
+    """一次性 GET 并解析 JSON（准备阶段使用）"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n"
+                     .encode("latin-1"))
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    status = int(head.split(None, 2)[1])
+    if b"chunked" in head.lower():
+        chunks, rest = [], body
+        while True:
+            size_line, _, rest = rest.partition(b"\r\n")
+            length = int(size_line.split(b";")[0], 16)
+            if not length:
+                break
+            chunks.append(rest[:length])
+            rest = rest[length + 2:]
+        body = b"".join(chunks)
+    if status != 200:
+        raise RuntimeError(f"GET {path} 返回 {status}")
+    return json.loads(body)
+
+
+async def discover(host, port, mix):
+    """读取学校列表、可用状态；需要下载文件时从学校详情中收集文件路径"""
+    summary = await _get_json(host, port, "/api/schools?view=summary")
+    school_ids = [row["id"] for row in summary]
+    statuses = await _get_json(host, port, "/api/statuses")
+    files = []
+    if mix.get("file"):
+        for sid in school_ids:
+            detail = await _get_json(host, port, f"/api/school/{sid}")
+            files += [(sid, f["path"]) for f in detail.get("files", [])[:FILES_PER_SCHOOL]]
+        if not files:
+            raise RuntimeError("合成数据中没有可下载的文件")
+    return Workload(school_ids, statuses, files)
+
+
+# ========== 压测 ==========
+
+def percentile(sorted_samples, q):
+    """最近秩法分位数"""
+    if not sorted_samples:
+        return None
+    index = max(0, min(len(sorted_samples) - 1, math.ceil(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples, errors, sizes, elapsed):
+    ordered = sorted(samples)
+    result = {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0,
+        "bytes": sizes,
+    }
+    if ordered:
+        result.update({
+            "mean_ms": round(sum(ordered) / len(ordered), 3),
+            "p50_ms": round(percentile(ordered, 50), 3),
+            "p95_ms": round(percentile(ordered, 95), 3),
+            "p99_ms": round(percentile(ordered, 99), 3),
+            "max_ms": round(ordered[-1], 3),
+        })
+    return result
+
+
+async def drive(host, port, workload, mix, concurrency, duration, warmup, timeout, seed):
+    """
+    closed-loop 压测：concurrency 个协程各持一个连接，收到响应后立即发出下一个请求。
+    预热期内的请求不计入统计
+    """
+    names = [name for name, weight in mix.items() if weight]
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    errors = dict.fromkeys(names, 0)
+    sizes = dict.fromkeys(names, 0)
+    failures = {}
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        conn = Connection(host, port, timeout)
+        try:
+            while True:
+                now = time.perf_counter()
+                if now >= stop_at:
+                    return
+                name = rng.choices(names, weights)[0]
+                method, path, body = workload.make(name, rng)
+                t0 = time.perf_counter()
+                try:
+                    status, size = await conn.request(method, path, body)
+                    ok = status < 400
+                    reason = f"HTTP {status}"
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                    ok, size, reason = False, 0, type(e).__name__
+                t1 = time.perf_counter()
+                if t0 < measure_from:
+                    continue
+                if ok:
+                    samples[name].append((t1 - t0) * 1000)
+                    sizes[name] += size
+                else:
+                    errors[name] += 1
+                    key = f"{name}: {reason}"
+                    failures[key] = failures.get(key, 0) + 1
+        finally:
+            conn.close()
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+
+    routes = {name: summarize(samples[name], errors[name], sizes[name], elapsed) for name in names}
+    total = summarize([s for name in names for s in samples[name]],
+                      sum(errors.values()), sum(sizes.values()), elapsed)
+    return routes, total, failures, elapsed
+
+
+# ========== 服务进程 ==========
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir, port, args):
+    """
+    以子进程启动服务，日志写入数据目录下的 server.log。
+    serve: serve.py（gunicorn 多进程）；dev: python3 webapp/app.py（Flask 开发服务器，不使用共享缓存）
+    """
+    env = dict(os.environ)
+    env["CAMP_BASE_DIR"] = data_dir
+    env["CAMP_WATCH_INTERVAL"] = str(args.watch_interval)
+    env["CAMP_WARM_START"] = "0"
+    log = open(os.path.join(data_dir, "server.log"), "wb")
+    if args.server == "dev":
+        env["CAMP_PORT"] = str(port)
+        env.pop("CAMP_SHARED_CACHE", None)
+        cmd = [sys.executable, os.path.join(WEBAPP_DIR, "app.py")]
+    else:
+        cmd = [sys.executable, os.path.join(WEBAPP_DIR, "serve.py"),
+               "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--threads", str(args.threads),
+               "--cache", os.path.join(data_dir, "webapp", ".cache", "shared.sqlite3")]
+    proc = subprocess.Popen(cmd, cwd=WEBAPP_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    proc.log_file = log
+    return proc
+
+
+async def wait_ready(proc, host, port):
+    """轮询 /api/dashboard/meta 直至返回（首个请求会完成看板构建）"""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"服务进程已退出（返回码 {proc.returncode}），见 server.log")
+        try:
+            await _get_json(host, port, "/api/dashboard/meta")
+            return
+        except (OSError, RuntimeError, ValueError):
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"服务在 {STARTUP_TIMEOUT} 秒内未就绪")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    proc.log_file.close()
+
+
+# ========== 主流程 ==========
+
+def generate_data(data_dir, args):
+    """调用 gen_data.py 生成合成数据（子进程，避免在本进程中导入 app）"""
+    cmd = [sys.executable, os.path.join(BENCH_DIR, "gen_data.py"), data_dir,
+           "--scale", args.scale, "--seed", str(args.seed)]
+    if args.notices:
+        cmd += ["--notices", str(args.notices)]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    params = dict(SCALES[args.scale])
+    if args.notices:
+        params["notices"] = args.notices
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="camp-load-")
+    host, port = "127.0.0.1", args.port or free_port()
+    proc = None
+    try:
+        if not args.data_dir:
+            print(f"生成合成数据: {data_dir}")
+            generate_data(data_dir, args)
+        proc = start_server(data_dir, port, args)
+        asyncio.run(wait_ready(proc, host, port))
+        workload = asyncio.run(discover(host, port, mix))
+        print(f"服务就绪: http://{host}:{port}  学校 {len(workload.school_ids)} 个，"
+              f"文件 {len(workload.files)} 个")
+        print(f"并发 {args.concurrency}，预热 {args.warmup}s，计时 {args.duration}s ...")
+        routes, total, failures, elapsed = asyncio.run(drive(
+            host, port, workload, mix, args.concurrency, args.duration, args.warmup,
+            args.timeout, args.seed))
+    finally:
+        if proc is not None:
+            stop_server(proc)
+        if not args.data_dir and not args.keep_data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        "format": RESULT_FORMAT,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "params": params,
+        "server": ({"kind": "dev"} if args.server == "dev" else
+                   {"kind": "serve", "workers": args.workers, "threads": args.threads}),
+        "load": {"concurrency": args.concurrency, "duration_s": round(elapsed, 3),
+                 "warmup_s": args.warmup, "mix": mix},
+        "total": total,
+        "routes": routes,
+        "failures": failures,
+    }
+
+
+def print_report(result):
+    header = f"  {'路由':<16}{'请求数':>8}{'错误':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)"
+    print("\n" + header)
+    rows = list(result["routes"].items()) + [("total", result["total"])]
+    for name, r in rows:
+        cells = [f"{r.get(k):>10.2f}" if r.get(k) is not None else f"{'-':>10}"
+                 for k in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"  {name:<16}{r['requests']:>8}{r['errors']:>6}{r['rps']:>10.1f}{''.join(cells)}")
+    for key, count in result["failures"].items():
+        print(f"  [失败] {key} x{count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="webapp 并发压测")
+    parser.add_argument("--scale", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--notices", type=int, help="通知条数（覆盖预设）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", help="使用已有的数据目录（不生成、不删除）")
+    parser.add_argument("--keep-data", action="store_true", help="保留生成的临时数据目录")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=20, help="计时时长（秒）")
+    parser.add_argument("--warmup", type=float, default=3, help="预热时长（秒），不计入统计")
+    parser.add_argument("--timeout", type=float, default=30, help="单个请求的超时（秒）")
+    parser.add_argument("--mix", help="路由权重，如 schools=30,notices=20,file=10；"
+                                      f"可选: {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--server", choices=["serve", "dev"], default="serve",
+                        help="serve: serve.py；dev: python3 webapp/app.py（忽略 --workers/--threads）")
+    parser.add_argument("--port", type=int, help="服务端口（默认取空闲端口）")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="服务 worker 进程数")
+    parser.add_argument("--threads", type=int, default=8, help="每个 worker 的线程数")
+    parser.add_argument("--watch-interval", type=float, default=2, help="服务的输入轮询间隔（秒）")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"规模: {args.scale}")
+    result = run(args)
+    print_report(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+
+    if result["total"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+webapp 微基准测试
+在合成数据上计时解析函数与各 API 路由（Flask test client），
+结果输出为 JSON，可用 --compare 与之前的结果对比以发现性能回退。
+
+用法:
+    python3 bench/run_bench.py --scale small --output bench/results.json
+    python3 bench/run_bench.py --scale small --compare bench/results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+WEBAPP_DIR = os.path.join(ROOT_DIR, "webapp")
+
+# 结果格式版本，格式不兼容时递增
+RESULT_FORMAT = 1
+
+
+def measure(fn, repeat, warmup=1):
+    """执行 fn 若干次，返回耗时统计（毫秒）"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+def _get(client, url):
+    def run():
+        resp = client.get(url)
+        assert resp.status_code == 200, (url, resp.status_code)
+        resp.get_data()
+    return run
+
+
+def _request(client, method, url, payload):
+    def run():
+        resp = client.open(url, method=method, json=payload)
+        assert resp.status_code == 200, (url, resp.status_code)
+    return run
+
+
+def build_cases(app, client):
+    """返回 [(名称, 可调用对象), ...]"""
+    school_ids = list(app.SCHOOL_INFO)
+    sid = school_ids[0]
+    cases = [
+        ("parse_updates_md", app.parse_updates_md),
+        ("load_notices_store", lambda: app._parse_notices_tail(app.NOTICES_STORE, 0, None)),
+        ("parse_schools_md", app.parse_schools_md),
+        ("determine_status[all]", lambda: [app.determine_status(s) for s in school_ids]),
+        ("get_folder_files[all]", lambda: [app.get_folder_files(s) for s in school_ids]),
+        ("get_professors[all]", lambda: [app.get_professors(s) for s in school_ids]),
+        ("build_dashboard", app.build_dashboard),
+    ]
+
+    files = app.get_folder_files(sid)
+    routes = [
+        "/api/profile",
+        "/api/schools",
+        "/api/notices",
+        f"/api/school/{sid}",
+        f"/api/notices/query?school_id={sid}&limit=50",
+        "/api/notices/query?category=夏令营&date_from=2025-01-01&limit=50",
+        "/api/notices/search?q=夏令营&limit=50",
+        "/api/statuses",
+        "/api/dashboard/meta",
+        f"/api/school/{sid}/history",
+        "/api/files/dedup",
+    ]
+    if files:
+        routes.append(f"/api/file/{sid}/{files[0]['path']}")
+    cases += [(f"GET {url}", _get(client, url)) for url in routes]
+    cases += [
+        (f"PUT /api/school/{sid}/status",
+         _request(client, "PUT", f"/api/school/{sid}/status", {"status": "准备中"})),
+        (f"PUT /api/school/{sid}/deadline",
+         _request(client, "PUT", f"/api/school/{sid}/deadline", {"deadline": "2026-06-30"})),
+        ("POST /api/batch[all]",
+         _request(client, "POST", "/api/batch",
+                  {"changes": [{"school_id": s, "status": "待定"} for s in school_ids]})),
+    ]
+    return cases
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(args):
+    sys.path.insert(0, BENCH_DIR)
+    import gen_data
+
+    params = dict(gen_data.SCALES[args.scale])
+    if args.notices:
+        params["notices"] = args.notices
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="camp-bench-")
+    # 必须在导入 app 之前设置；关闭后台轮询，避免干扰计时
+    os.environ["CAMP_BASE_DIR"] = data_dir
+    os.environ["CAMP_WATCH_INTERVAL"] = "3600"
+    os.environ["CAMP_WARM_START"] = "0"
+    sys.path.insert(0, WEBAPP_DIR)
+    import app
+
+    try:
+        if not args.data_dir:
+            gen_data.generate(data_dir, folders=list(app.SCHOOL_FOLDERS.values()),
+                              seed=args.seed, **params)
+        client = app.app.test_client()
+        results = {}
+        for name, fn in build_cases(app, client):
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(fn, args.repeat)
+            print(f"  {name:<70} {results[name]['median_ms']:>10.3f} ms")
+    finally:
+        if not args.data_dir and not args.keep_data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        "format": RESULT_FORMAT,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "params": params,
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """打印与基线的对比，返回回退的条目名列表（中位数变慢超过 threshold 倍）"""
+    regressions = []
+    print(f"\n对比基线 {baseline.get('git_revision', '?')} ({baseline.get('created_at', '?')}):")
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"  {name:<70} (新增)")
+            continue
+        ratio = cur["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        mark = ""
+        if ratio > threshold:
+            mark = "  <-- 回退"
+            regressions.append(name)
+        print(f"  {name:<70} {base['median_ms']:>10.3f} -> {cur['median_ms']:>10.3f} ms  x{ratio:.2f}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="webapp 微基准测试")
+    parser.add_argument("--scale", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--notices", type=int, help="通知条数（覆盖预设）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", help="只运行名称包含该字符串的条目")
+    parser.add_argument("--data-dir", help="使用已有的数据目录（不生成、不删除）")
+    parser.add_argument("--keep-data", action="store_true", help="保留生成的临时数据目录")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    parser.add_argument("--compare", help="基线结果 JSON，存在回退时以非零状态退出")
+    parser.add_argument("--threshold", type=float, default=1.25, help="判定回退的倍数")
+    args = parser.parse_args()
+
+    print(f"规模: {args.scale}")
+    result = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""合成数据生成与微基准的计时、对比"""
+
+import json
+import os
+
+import gen_data
+import run_bench
+
+FOLDERS = ["北大计算机", "清华计算机"]
+
+
+def generate(base, seed=0):
+    gen_data.generate(str(base), notices=120, sections=5, files_per_school=6, profs_per_school=3,
+                      folders=FOLDERS, seed=seed)
+
+
+def test_generated_inputs_match_real_formats(tmp_path):
+    generate(tmp_path)
+    lines = (tmp_path / "monitor" / "notices.jsonl").read_text(encoding="utf-8").splitlines()
+    assert "_meta" in json.loads(lines[0])
+    records = [json.loads(line) for line in lines[1:]]
+    # 按爬虫规则规范化：大部分标题保留，学校 id 均已分配
+    assert 60 <= len(records) <= 120
+    assert all(r["school_id"] and not r["school_id"].startswith("__") for r in records)
+    assert (tmp_path / "院校网址汇总.md").read_text(encoding="utf-8").count("\n## ") == 5
+    for folder in FOLDERS:
+        names = os.listdir(tmp_path / folder)
+        assert sum(n.startswith("导师") for n in names) == 3
+    assert (tmp_path / "个人资料" / "简历.pdf").exists()
+
+
+def test_same_seed_same_data(tmp_path):
+    generate(tmp_path / "a")
+    generate(tmp_path / "b")
+    generate(tmp_path / "c", seed=1)
+    read = lambda d: (d / "monitor" / "updates.md").read_text(encoding="utf-8")  # noqa: E731
+    assert read(tmp_path / "a") == read(tmp_path / "b")
+    assert read(tmp_path / "a") != read(tmp_path / "c")
+
+
+def test_measure_and_compare(capsys):
+    calls = []
+    stats = run_bench.measure(lambda: calls.append(1), repeat=5, warmup=2)
+    assert len(calls) == 7 and stats["repeat"] == 5
+    assert stats["min_ms"] <= stats["median_ms"] <= stats["max_ms"]
+
+    baseline = {"results": {"fast": {"median_ms": 1.0}, "slow": {"median_ms": 1.0}}}
+    current = {"results": {"fast": {"median_ms": 1.1}, "slow": {"median_ms": 2.0},
+                           "new": {"median_ms": 1.0}}}
+    assert run_bench.compare(current, baseline, threshold=1.25) == ["slow"]
+    assert "(新增)" in capsys.readouterr().out
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""压测脚本的路由混合解析、分位数统计与 keep-alive 客户端"""
+
+import asyncio
+import random
+
+import pytest
+
+import load_test
+
+
+def test_parse_mix():
+    assert load_test.parse_mix("") == load_test.DEFAULT_MIX
+    mix = load_test.parse_mix("schools=3, file")
+    assert mix["schools"] == 3 and mix["file"] == 1 and mix["notices"] == 0
+    assert set(mix) == set(load_test.DEFAULT_MIX)
+
+
+@pytest.mark.parametrize("spec", ["bogus=1", "schools=0", "schools=abc"])
+def test_parse_mix_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        load_test.parse_mix(spec)
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert load_test.percentile(samples, 50) == 50
+    assert load_test.percentile(samples, 95) == 95
+    assert load_test.percentile(samples, 100) == 100
+    assert load_test.percentile([7], 99) == 7
+    assert load_test.percentile([], 50) is None
+
+
+def test_summarize():
+    result = load_test.summarize([3.0, 1.0, 2.0], errors=1, sizes=300, elapsed=2)
+    assert result["requests"] == 3 and result["rps"] == 1.5
+    assert (result["p50_ms"], result["max_ms"], result["mean_ms"]) == (2.0, 3.0, 2.0)
+    empty = load_test.summarize([], errors=4, sizes=0, elapsed=1)
+    assert empty["rps"] == 0 and "p50_ms" not in empty
+
+
+def test_workload_requests():
+    workload = load_test.Workload(["pku_cs"], ["已入营"], [("pku_cs", "导师/简历 1.pdf")])
+    rng = random.Random(0)
+    assert workload.make("school_detail", rng) == ("GET", "/api/school/pku_cs", None)
+    assert workload.make("put_status", rng) == (
+        "PUT", "/api/school/pku_cs/status", {"status": "已入营"})
+    method, path, _ = workload.make("file", rng)
+    assert path == "/api/file/pku_cs/%E5%AF%BC%E5%B8%88/%E7%AE%80%E5%8E%86%201.pdf"
+
+
+def test_connection_reads_length_and_chunked_bodies():
+    responses = [
+        b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello",
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n2\r\nde\r\n0\r\n\r\n",
+        b"HTTP/1.1 204 No Content\r\n\r\n",
+    ]
+    accepted = []
+
+    async def handle(reader, writer):
+        accepted.append(1)
+        for response in responses:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(response)
+            await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        conn = load_test.Connection("127.0.0.1", port, timeout=5)
+        try:
+            return [await conn.request("GET", "/") for _ in responses]
+        finally:
+            conn.close()
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(main()) == [(200, 5), (200, 5), (204, 0)]
+    # 三个请求复用同一个连接
+    assert len(accepted) == 1
@@ -7,14 +7,17 @@
 
 import os
 import sys
-import json
+import argparse
+import codecs
+import fcntl
 import hashlib
 import time
 import random
 import logging
 import re
+from contextlib import contextmanager
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
 
 try:
     import requests
@@ -23,19 +26,34 @@ except ImportError:
     os.system(f"{sys.executable} -m pip install requests")
     import requests
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("beautifulsoup4 未安装，正在安装...")
-    os.system(f"{sys.executable} -m pip install beautifulsoup4")
-    from bs4 import BeautifulSoup
+# 排除关键词与通知规范化规则（与 webapp 共用）
+from normalize import (EXCLUDE_KEYWORDS, RULES_VERSION, NOTICES_FILE, append_records,
+                       load_source_map, normalize_notice, reprocess,
+                       store_rules_version)
+from seen_store import SeenStore
+# 监控目标与筛选（与 webapp 共用）
+from targets import MONITOR_TARGETS, select_targets
+from link_parser import SNIFF_BYTES, LinkParser, TextParser, sniff_encoding
+import harvest
+import revisit
 
 # ========== 配置 ==========
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 已见条目：SQLite 完整记录 + Bloom 过滤器（旧版 seen_items.json 首次运行时自动导入）
+SEEN_DB = os.path.join(BASE_DIR, "seen.sqlite3")
+SEEN_BLOOM = os.path.join(BASE_DIR, "seen.bloom")
 SEEN_FILE = os.path.join(BASE_DIR, "seen_items.json")
+# 过期压缩的默认窗口（天）：超过该时长未在任何页面出现的条目只保留 ID
+SEEN_TTL_DAYS = 365
 UPDATES_FILE = os.path.join(BASE_DIR, "updates.md")
 ERROR_LOG = os.path.join(BASE_DIR, "error.log")
+# 写入锁：定时全量抓取与 webapp 触发的单校刷新可能同时运行，
+# 已见条目、updates.md、notices.jsonl 的读写在锁内进行，页面抓取不持锁
+STORE_LOCK = os.path.join(BASE_DIR, ".crawler.lock")
+# 附件下载（待处理队列、.part 文件）与通知重访（重访记录、更新日志）各自的锁
+HARVEST_LOCK = os.path.join(BASE_DIR, ".harvest.lock")
+REVISIT_LOCK = os.path.join(BASE_DIR, ".revisit.lock")
 
 # 匹配关键词（必须命中至少一个）
 KEYWORDS = [
@@ -44,22 +62,6 @@ KEYWORDS = [
     "公示", "拟录取", "入营", "名单", "营员",
 ]
 
-# 排除关键词（命中任一则过滤掉）
-EXCLUDE_KEYWORDS = [
-    # 不适用的招生类型
-    "港澳台", "港澳", "台湾地区", "留学生", "国际学生", "来华留学",
-    # 统考相关（用户走推免，不走考研）
-    "网报公告", "网上确认", "初试科目", "考场安排", "条形码", "考点公告",
-    "准考证", "复试分数线", "调剂",
-    # 不相关的学院/专业
-    "医学院", "护理", "口腔", "药学", "公共卫生",
-    "体育系", "体育学", "法学院", "法律硕士", "法律学",
-    "农业与生物", "设计学院", "物流工程", "能源学院",
-    "MBA", "EMBA", "MPA", "MEM", "MTT",
-    # 宣传册类（非通知）
-    "宣传手册", "宣传册", "招生手册",
-]
-
 # User-Agent
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -69,124 +71,29 @@ USER_AGENT = (
 
 REQUEST_TIMEOUT = 10  # 秒
 
+# 页面流式读取：超过上限的部分不再下载（已读到的链接照常使用）
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+PAGE_CHUNK_SIZE = 16 * 1024
+# 接受的页面类型（响应头缺失 Content-Type 时也接受）
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
 # 请求间隔（秒）
 MIN_DELAY = 1.0
 MAX_DELAY = 2.0
 
-# 需要监控的 URL 列表
-MONITOR_TARGETS = [
-    # 上海交通大学
-    {
-        "school": "上海交通大学",
-        "department": "AI学院",
-        "url": "https://sai.sjtu.edu.cn/cn/list/qs",
-    },
-    {
-        "school": "上海交通大学",
-        "department": "计算机学院",
-        "url": "https://www.cs.sjtu.edu.cn/bsyjs_zsgz.html",
-    },
-    {
-        "school": "上海交通大学",
-        "department": "研究生招生网",
-        "url": "https://yzb.sjtu.edu.cn/",
-    },
-    # 中科院
-    {
-        "school": "中科院",
-        "department": "自动化所通知",
-        "url": "http://www.ia.cas.cn/qtgn/tzgg/",
-    },
-    {
-        "school": "中科院",
-        "department": "自动化所硕士招生",
-        "url": "https://ia.cas.cn/yjsjy/zs/sszs/",
-    },
-    {
-        "school": "中科院",
-        "department": "计算所通知",
-        "url": "http://www.ict.ac.cn/xwgg/tzgg/",
-    },
-    {
-        "school": "中科院",
-        "department": "计算所招生",
-        "url": "https://ict.cas.cn/yjsjy/zsxx/",
-    },
-    # 北京大学
-    {
-        "school": "北京大学",
-        "department": "智能学院",
-        "url": "https://sai.pku.edu.cn/rcpy/yjszs.htm",
-    },
-    {
-        "school": "北京大学",
-        "department": "计算机学院",
-        "url": "https://cs.pku.edu.cn/zsxx/yjszs.htm",
-    },
-    {
-        "school": "北京大学",
-        "department": "软微学院",
-        "url": "https://ss.pku.edu.cn/zsxx/zstz/index.htm",
-    },
-    {
-        "school": "北京大学",
-        "department": "夏令营统一页",
-        "url": "https://admission.pku.edu.cn/xly/index.htm",
-    },
-    # 南京大学
-    {
-        "school": "南京大学",
-        "department": "智科院",
-        "url": "https://is.nju.edu.cn/yjszs/list.htm",
-    },
-    {
-        "school": "南京大学",
-        "department": "计算机学院夏令营",
-        "url": "https://yzb.nju.edu.cn/xlyxx/main.htm",
-    },
-    # 浙江大学
-    {
-        "school": "浙江大学",
-        "department": "计算机学院通知",
-        "url": "http://www.cs.zju.edu.cn/csen/26994/list.htm",
-    },
-    {
-        "school": "浙江大学",
-        "department": "计算机学院招生",
-        "url": "http://www.cs.zju.edu.cn/csen/26697/list.htm",
-    },
-    # 清华大学
-    {
-        "school": "清华大学",
-        "department": "电子系动态",
-        "url": "https://www.ee.tsinghua.edu.cn/dzxw/dtxx.htm",
-    },
-    {
-        "school": "清华大学",
-        "department": "自动化系通知",
-        "url": "http://www.au.tsinghua.edu.cn/tzgg.htm",
-    },
-    {
-        "school": "清华大学",
-        "department": "自动化系研招",
-        "url": "https://www.au.tsinghua.edu.cn/zsjy/yjszs.htm",
-    },
-    {
-        "school": "清华大学",
-        "department": "计算机系通知",
-        "url": "https://www.cs.tsinghua.edu.cn/index/tzgg.htm",
-    },
-    {
-        "school": "清华大学",
-        "department": "计算机系招生",
-        "url": "https://www.cs.tsinghua.edu.cn/zszp/zsxx.htm",
-    },
-    {
-        "school": "清华大学",
-        "department": "夏令营统一页",
-        "url": "https://yz.tsinghua.edu.cn/xlyxx.htm",
-    },
-]
+# URL 规范化（仅用于生成条目 ID 与去重，写入 updates.md 的仍是原始链接）
+# 条目 ID 规则版本，修改下列规范化规则后递增，已见条目会自动重算 ID
+ITEM_ID_VERSION = 2
+# 主机别名：同一站点的不同域名归为一个（去掉 www. 之后再查表）
+HOST_ALIASES = {
+    "ict.ac.cn": "ict.cas.cn",
+}
+# 目录默认页，路径以这些文件名结尾时视为目录本身
+DEFAULT_DOCUMENTS = {"index.htm", "index.html", "index.shtml", "index.jsp", "index.php",
+                     "main.htm", "main.html", "default.htm", "default.html", "default.aspx"}
+# 跟踪参数（不影响页面内容），生成 ID 前去掉；utm_ 开头的一律去掉
+TRACKING_PARAMS = {"spm", "from", "source", "share", "fbclid", "gclid", "_t", "timestamp"}
+
 
 
 # ========== 工具函数 ==========
@@ -202,26 +109,38 @@ def setup_logging():
     )
 
 
-def load_seen_items():
-    """加载已见条目"""
-    if os.path.exists(SEEN_FILE):
-        try:
-            with open(SEEN_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            logging.warning("seen_items.json 读取失败，将使用空记录")
-    return {}
-
-
-def save_seen_items(seen):
-    """保存已见条目"""
-    with open(SEEN_FILE, "w", encoding="utf-8") as f:
-        json.dump(seen, f, ensure_ascii=False, indent=2)
+def canonicalize_url(url):
+    """
+    URL 规范化：http/https 统一、主机小写并去掉 www. 与默认端口、按别名表归并，
+    去掉目录默认页、片段和跟踪参数，查询参数排序。同一页面的不同写法得到相同结果。
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return url.strip()
+
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    host = HOST_ALIASES.get(host, host)
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    head, _, last = path.rpartition("/")
+    if last.lower() in DEFAULT_DOCUMENTS:
+        path = head + "/"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
 
 
 def make_item_id(title, url):
-    """为条目生成唯一 ID（基于标题和链接的 hash）"""
-    raw = f"{title.strip()}|{url.strip()}"
+    """为条目生成唯一 ID（基于标题和规范化链接的 hash）"""
+    raw = f"{title.strip()}|{canonicalize_url(url)}"
     return hashlib.md5(raw.encode("utf-8")).hexdigest()
 
 
@@ -245,66 +164,85 @@ def should_exclude(text):
     return False
 
 
-def fetch_page(url):
+class PageRejected(Exception):
+    """响应不是网页（如 PDF、压缩包），未下载正文"""
+
+
+def _stream_page(url, parser):
     """
-    抓取页面内容，返回 BeautifulSoup 对象。
-    自动尝试多种编码。
+    流式抓取页面并喂给增量解析器 parser。
+    先按响应头拒绝非网页内容，再分块读取，parser.done 或累计超过 MAX_PAGE_BYTES 时停止下载。
     """
     headers = {
         "User-Agent": USER_AGENT,
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
     }
-    resp = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT, verify=False)
-    resp.raise_for_status()
-
-    # 尝试从响应头或 meta 标签获取正确编码
-    # requests 有时猜错中文页面编码
-    content_type = resp.headers.get("Content-Type", "")
-    if "charset" in content_type.lower():
-        # 响应头里有 charset，requests 通常能处理
-        pass
-    else:
-        # 尝试从 HTML meta 中检测
-        apparent = resp.apparent_encoding
-        if apparent and apparent.lower() not in ("ascii",):
-            resp.encoding = apparent
-        else:
-            resp.encoding = "utf-8"
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # 再次检查 meta charset
-    meta_charset = soup.find("meta", attrs={"charset": True})
-    if meta_charset:
-        declared = meta_charset["charset"]
-        if declared.lower() != resp.encoding.lower():
-            resp.encoding = declared
-            soup = BeautifulSoup(resp.text, "html.parser")
-    else:
-        meta_content_type = soup.find("meta", attrs={"http-equiv": re.compile("content-type", re.I)})
-        if meta_content_type and meta_content_type.get("content"):
-            match = re.search(r"charset=([^\s;]+)", meta_content_type["content"], re.I)
-            if match:
-                declared = match.group(1)
-                if declared.lower() != resp.encoding.lower():
-                    resp.encoding = declared
-                    soup = BeautifulSoup(resp.text, "html.parser")
-
-    return soup
-
-
-def extract_links(soup, base_url):
+    with requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT,
+                      verify=False, stream=True) as resp:
+        resp.raise_for_status()
+
+        content_type = resp.headers.get("Content-Type", "")
+        mime = content_type.split(";")[0].strip().lower()
+        if mime and mime not in HTML_CONTENT_TYPES:
+            raise PageRejected(f"非网页内容: {mime}")
+        length = resp.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > MAX_PAGE_BYTES:
+            logging.warning(f"[页面过大] {url}: {int(length)} 字节，只读取前 {MAX_PAGE_BYTES} 字节")
+
+        decoder = None
+        head = b""
+        received = 0
+        for chunk in resp.iter_content(PAGE_CHUNK_SIZE):
+            received += len(chunk)
+            if decoder is None:
+                # 先积累开头一段，确定编码后再开始解析
+                head += chunk
+                if len(head) < SNIFF_BYTES and received < MAX_PAGE_BYTES:
+                    continue
+                decoder = codecs.getincrementaldecoder(sniff_encoding(head, content_type))("replace")
+                chunk, head = head, b""
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                break
+            if received >= MAX_PAGE_BYTES:
+                logging.warning(f"[页面过大] {url}: 已读取 {received} 字节，停止下载")
+                break
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(sniff_encoding(head, content_type))("replace")
+            parser.feed(decoder.decode(head))
+        if not parser.done:
+            parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+    return parser
+
+
+def fetch_links(url, container=None):
+    """
+    流式抓取页面，返回页面中的链接 [(链接文字, href), ...]。
+    指定 container 时只取该元素中的链接，读到元素结束即停止下载。
+    """
+    parser = _stream_page(url, LinkParser(container))
+    if container and not parser.found_container:
+        logging.warning(f"[容器未找到] {url}: {container}，使用全页链接")
+    return parser.links
+
+
+def fetch_text(url):
+    """流式抓取通知详情页，返回正文行列表（附件链接单独成行）"""
+    return _stream_page(url, TextParser(harvest.is_attachment_url)).lines
+
+
+def extract_links(links, base_url):
     """
-    从页面提取所有带文本的链接条目。
+    整理页面中的链接条目（过滤、转为绝对 URL、去重）。
     返回列表: [{"title": ..., "url": ...}, ...]
     """
     items = []
     seen_urls = set()
 
-    for a_tag in soup.find_all("a", href=True):
-        title = a_tag.get_text(strip=True)
-        href = a_tag["href"].strip()
+    for title, href in links:
+        href = href.strip()
 
         # 跳过空标题、过短标题、锚点、javascript
         if not title or len(title) < 4:
@@ -315,10 +253,11 @@ def extract_links(soup, base_url):
         # 转换为绝对 URL
         full_url = urljoin(base_url, href)
 
-        # 去重
-        if full_url in seen_urls:
+        # 去重（同一页面的不同写法算一个）
+        key = canonicalize_url(full_url)
+        if key in seen_urls:
             continue
-        seen_urls.add(full_url)
+        seen_urls.add(key)
 
         items.append({
             "title": title,
@@ -336,12 +275,11 @@ def filter_by_keywords(items):
     ]
 
 
-def append_to_updates(new_items):
+def append_to_updates(new_items, now):
     """将新条目追加到 updates.md"""
     if not new_items:
         return
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     file_exists = os.path.exists(UPDATES_FILE) and os.path.getsize(UPDATES_FILE) > 0
 
     with open(UPDATES_FILE, "a", encoding="utf-8") as f:
@@ -369,35 +307,45 @@ def append_to_updates(new_items):
         f.write("---\n\n")
 
 
+def append_to_store(new_items, now):
+    """将新条目规范化后追加到 notices.jsonl（webapp 直接读取，不再重复解析）"""
+    source_map = load_source_map()
+    records = []
+    for item in new_items:
+        source = f"{item['school']} - {item['department']}"
+        record = normalize_notice(item["title"], item["url"], source, source_map.get(source))
+        if record is not None:
+            record["first_seen"] = now
+            records.append(record)
+    append_records(records)
+
+
+def ensure_store():
+    """notices.jsonl 不存在或规则版本不一致时，从 updates.md 重建"""
+    if not os.path.exists(UPDATES_FILE) or store_rules_version() == RULES_VERSION:
+        return
+    count = reprocess()
+    print(f"已按规则版本 {RULES_VERSION} 重建 {NOTICES_FILE}: {count} 条通知")
+
+
 # ========== 主逻辑 ==========
 
-def crawl_target(target, seen):
+def crawl_target(target):
     """
-    抓取单个目标页面，返回新发现的条目列表。
+    抓取单个目标页面，返回命中关键词的条目列表（含 school/department），出错时返回空列表。
+    是否为新条目由 record_new_items 在写入锁内判断
     """
     school = target["school"]
     department = target["department"]
     url = target["url"]
-    new_items = []
 
     try:
-        soup = fetch_page(url)
-        all_links = extract_links(soup, url)
+        all_links = extract_links(fetch_links(url, target.get("container")), url)
         matched = filter_by_keywords(all_links)
-
         for item in matched:
-            item_id = make_item_id(item["title"], item["url"])
-            if item_id not in seen:
-                seen[item_id] = {
-                    "title": item["title"],
-                    "url": item["url"],
-                    "school": school,
-                    "department": department,
-                    "first_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                }
-                item["school"] = school
-                item["department"] = department
-                new_items.append(item)
+            item["school"] = school
+            item["department"] = department
+        return matched
 
     except requests.exceptions.Timeout:
         logging.error(f"[超时] {school} {department}: {url}")
@@ -405,6 +353,9 @@ def crawl_target(target, seen):
     except requests.exceptions.ConnectionError:
         logging.error(f"[连接失败] {school} {department}: {url}")
         print(f"  [连接失败] {school} - {department}: {url}")
+    except PageRejected as e:
+        logging.error(f"[跳过] {school} {department}: {url} -> {e}")
+        print(f"  [跳过] {school} - {department}: {url} -> {e}")
     except requests.exceptions.HTTPError as e:
         logging.error(f"[HTTP错误] {school} {department}: {url} -> {e}")
         print(f"  [HTTP错误] {school} - {department}: {url} -> {e}")
@@ -412,59 +363,195 @@ def crawl_target(target, seen):
         logging.error(f"[未知错误] {school} {department}: {url} -> {type(e).__name__}: {e}")
         print(f"  [错误] {school} - {department}: {url} -> {type(e).__name__}: {e}")
 
+    return []
+
+
+def record_new_items(matched, seen):
+    """对照已见条目筛出新条目并记录（须在写入锁内调用），返回新条目列表"""
+    new_items = []
+    present = []
+    for item in matched:
+        item_id = make_item_id(item["title"], item["url"])
+        present.append(item_id)
+        if item_id not in seen:
+            seen.add(item_id, {
+                "title": item["title"],
+                "url": item["url"],
+                "school": item["school"],
+                "department": item["department"],
+                "first_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            new_items.append(item)
+    # 记录仍在页面上的条目，过期压缩据此判断
+    seen.touch(present)
     return new_items
 
 
+@contextmanager
+def file_lock(path, waiting_message):
+    """基于 flock 的跨进程独占锁（进程退出时自动释放）"""
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(waiting_message)
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def store_lock():
+    """已见条目与通知文件的写入锁"""
+    return file_lock(STORE_LOCK, "等待其他爬虫进程写入完成...")
+
+
+def harvest_attachments(new_items):
+    """下载新通知中的附件到对应学校文件夹"""
+    source_map = load_source_map()
+    notices = []
+    for item in new_items:
+        source = f"{item['school']} - {item['department']}"
+        school_id = harvest.resolve_school_id(source_map, source, item["title"])
+        if school_id:
+            notices.append({"title": item["title"], "url": item["url"], "school_id": school_id})
+    counts = harvest.harvest(notices, fetch_links, {"User-Agent": USER_AGENT})
+    if counts:
+        summary = "，".join(f"{k} {v}" for k, v in sorted(counts.items()))
+        print(f"附件: {summary}")
+
+
+def open_seen_store():
+    """打开已见条目存储；ID 规则变化后先重算，避免旧通知被当成新通知"""
+    store = SeenStore(SEEN_DB, SEEN_BLOOM, migrate_from=SEEN_FILE)
+    if store.id_version() != ITEM_ID_VERSION:
+        merged = store.rekey(make_item_id, ITEM_ID_VERSION)
+        print(f"已按 ID 规则版本 {ITEM_ID_VERSION} 重算已见条目（合并重复 {merged} 条）")
+    return store
+
+
+def migrate_seen_command():
+    """--migrate-seen：强制重算已见条目 ID"""
+    store = SeenStore(SEEN_DB, SEEN_BLOOM, migrate_from=SEEN_FILE)
+    before = len(store)
+    merged = store.rekey(make_item_id, ITEM_ID_VERSION)
+    print(f"已见条目: {before} -> {len(store)}（合并重复 {merged} 条）")
+    store.close()
+    return 0
+
+
+def compact_command(ttl_days):
+    """--compact：超过 ttl_days 天未在页面出现的条目压缩为只保留 ID"""
+    store = open_seen_store()
+    expired = store.compact(ttl_days)
+    print(f"已压缩 {expired} 条超过 {ttl_days} 天未出现的条目，保留完整记录 {len(store)} 条")
+    store.close()
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="高校招生通知爬虫")
+    parser.add_argument("--migrate-seen", action="store_true",
+                        help="按当前的 URL 规范化规则重算已见条目 ID 后退出（规则版本变化时也会自动进行）")
+    parser.add_argument("--compact", action="store_true",
+                        help="压缩长期未在页面出现的已见条目后退出")
+    parser.add_argument("--attachments", action="store_true",
+                        help="下载新通知中的附件（申请表、简章等）到对应学校文件夹")
+    parser.add_argument("--revisit", action="store_true",
+                        help="重访仍活跃的已见通知详情页，发现内容变化")
+    parser.add_argument("--revisit-budget", type=int, default=revisit.REVISIT_BUDGET,
+                        help=f"--revisit 每次最多重访的页面数，默认 {revisit.REVISIT_BUDGET}")
+    parser.add_argument("--ttl-days", type=int, default=SEEN_TTL_DAYS,
+                        help=f"--compact 的过期窗口（天），默认 {SEEN_TTL_DAYS}")
+    parser.add_argument("--school-id", action="append", metavar="ID",
+                        help="只抓取该学校（webapp 中的学校 id，如 pku_cs）的目标页面，可重复")
+    parser.add_argument("--school", action="append", metavar="NAME",
+                        help="只抓取学校名包含 NAME 的目标页面，可重复")
+    parser.add_argument("--department", action="append", metavar="NAME",
+                        help="只抓取部门名包含 NAME 的目标页面，可重复")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.migrate_seen:
+        with store_lock():
+            return migrate_seen_command()
+    if args.compact:
+        with store_lock():
+            return compact_command(args.ttl_days)
+
     # 抑制 InsecureRequestWarning（因为 verify=False）
     import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
     setup_logging()
 
+    targets = select_targets(MONITOR_TARGETS, args.school_id, args.school, args.department)
+    if not targets:
+        print("没有匹配的监控目标")
+        sys.exit(2)
+
     print("=" * 60)
     print("高校招生通知爬虫")
     print(f"运行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"监控目标: {len(MONITOR_TARGETS)} 个页面")
+    print(f"监控目标: {len(targets)} 个页面")
     print("=" * 60)
 
-    seen = load_seen_items()
-    all_new_items = []
-
-    for i, target in enumerate(MONITOR_TARGETS):
+    matched = []
+    for i, target in enumerate(targets):
         label = f"{target['school']} - {target['department']}"
-        print(f"\n[{i+1}/{len(MONITOR_TARGETS)}] 正在抓取: {label}")
+        print(f"\n[{i+1}/{len(targets)}] 正在抓取: {label}")
         print(f"  URL: {target['url']}")
 
-        new_items = crawl_target(target, seen)
-
-        if new_items:
-            print(f"  -> 发现 {len(new_items)} 条新通知")
-            for item in new_items:
-                print(f"     - {item['title']}")
-            all_new_items.extend(new_items)
-        else:
-            print(f"  -> 无新通知")
+        items = crawl_target(target)
+        print(f"  -> 匹配 {len(items)} 条")
+        matched.extend(items)
 
         # 礼貌等待
-        if i < len(MONITOR_TARGETS) - 1:
+        if i < len(targets) - 1:
             delay = random.uniform(MIN_DELAY, MAX_DELAY)
             time.sleep(delay)
 
-    # 保存已见条目
-    save_seen_items(seen)
+    with store_lock():
+        ensure_store()
+        seen = open_seen_store()
+        all_new_items = record_new_items(matched, seen)
+        # 保存已见条目
+        seen.save()
 
-    # 输出新条目
-    if all_new_items:
-        append_to_updates(all_new_items)
-        print("\n" + "=" * 60)
-        print(f"本次共发现 {len(all_new_items)} 条新通知")
-        print(f"已追加到: {UPDATES_FILE}")
-    else:
+        # 输出新条目
         print("\n" + "=" * 60)
-        print("本次未发现新通知")
-
-    print(f"已见条目总数: {len(seen)}")
+        if all_new_items:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            append_to_updates(all_new_items, now)
+            append_to_store(all_new_items, now)
+            for item in all_new_items:
+                print(f"  - [{item['school']} - {item['department']}] {item['title']}")
+            print(f"本次共发现 {len(all_new_items)} 条新通知")
+            print(f"已追加到: {UPDATES_FILE}")
+        else:
+            print("本次未发现新通知")
+        total_seen = len(seen)
+        seen.close()
+
+    # 附件下载与重访耗时较长，各用一把锁，不阻塞其他进程写入新通知；
+    # 同时运行的爬虫（如单校刷新）依次处理，不会同时改写待处理队列、.part 文件与更新日志
+    # 上次未完成的附件即使本次没有新通知也继续
+    if args.attachments:
+        with file_lock(HARVEST_LOCK, "等待其他爬虫进程下载附件..."):
+            harvest_attachments(all_new_items)
+
+    if args.revisit:
+        with file_lock(REVISIT_LOCK, "等待其他爬虫进程重访通知..."):
+            events = revisit.revisit(fetch_text, args.revisit_budget,
+                                     delay=lambda: random.uniform(MIN_DELAY, MAX_DELAY))
+        for event in events:
+            summary = event["summary"]
+            print(f"  [已更新] {event['title']} (+{summary['added']} -{summary['removed']})")
+
+    print(f"已见条目总数: {total_seen}")
     print("=" * 60)
 
     return len(all_new_items)
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+通知附件下载（爬虫的可选阶段）
+在新发现的通知页面中查找附件链接（申请表、推荐信、招生简章等 PDF/Word/Excel），
+由有界线程池分块流式写入磁盘：先写到暂存目录的 .part 文件，中断后用 Range 续传，
+完成后按内容哈希去重，放入对应学校的文件夹（webapp 文件列表中立即可见）。
+未完成的通知记录在待处理队列中，下次运行时继续。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urljoin, urlsplit
+
+import requests
+
+from normalize import MONITOR_DIR, REGISTRY_FILE, dispatch_school_id
+
+ROOT_DIR = os.path.dirname(MONITOR_DIR)
+# 下载中的 .part 文件（不放在学校文件夹里，避免未完成的文件出现在文件列表中）
+STAGING_DIR = os.path.join(MONITOR_DIR, ".attachments")
+# 尚未处理完的通知（下次运行时继续）
+PENDING_FILE = os.path.join(MONITOR_DIR, "attachments_pending.json")
+
+# 附件扩展名
+ATTACHMENT_EXTS = (".pdf", ".doc", ".docx", ".xls", ".xlsx", ".zip", ".rar", ".7z")
+# 中科院等站点的附件路径：/202602/P020260205xxx.pdf
+ATTACHMENT_PATH_RE = re.compile(r"/P0\d{5,}\w*\.\w+$", re.I)
+# 附件下载链接（无扩展名）的常见写法
+ATTACHMENT_HREF_RE = re.compile(r"(download|attach|fujian|DownLoad)", re.I)
+
+HARVEST_WORKERS = 4             # 并发下载数
+CHUNK_SIZE = 64 * 1024          # 流式写入的块大小
+MAX_ATTACHMENT_BYTES = 30 * 1024 * 1024
+DOWNLOAD_TIMEOUT = 30           # 秒（连接与两次读取之间的间隔）
+MAX_NAME_LENGTH = 80
+MAX_ATTEMPTS = 3                # 通知页面或附件连续失败这么多次后放弃
+
+# 单个附件的处理结果
+SAVED, DUPLICATE, TOO_LARGE, NOT_ATTACHMENT, FAILED = (
+    "saved", "duplicate", "too_large", "not_attachment", "failed")
+# 这些结果重试也不会改变，通知可以出队
+FINAL_RESULTS = {SAVED, DUPLICATE, TOO_LARGE, NOT_ATTACHMENT}
+
+
+# ========== 附件识别 ==========
+
+def is_attachment_url(url):
+    """按路径判断链接是否指向附件"""
+    path = urlsplit(url).path
+    return path.lower().endswith(ATTACHMENT_EXTS) or bool(ATTACHMENT_PATH_RE.search(path))
+
+
+def find_attachments(links, page_url):
+    """
+    从通知页面的链接 [(链接文字, href), ...] 中挑出附件，
+    返回 [{"title": 链接文字, "url": 绝对链接}, ...]
+    """
+    items = []
+    seen = set()
+    for title, href in links:
+        href = href.strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:")):
+            continue
+        url = urljoin(page_url, href)
+        if url in seen:
+            continue
+        if not (is_attachment_url(url) or ATTACHMENT_HREF_RE.search(href)):
+            continue
+        seen.add(url)
+        items.append({"title": title, "url": url})
+    return items
+
+
+def load_folder_map(registry_path=REGISTRY_FILE):
+    """从院校注册表读取 {学校 id: 文件夹名}"""
+    with open(registry_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {entry["id"]: entry["folder"] for entry in data.get("schools", [])}
+
+
+def resolve_school_id(source_map, source, title):
+    """来源名 → 学校 id（综合来源按标题分配）"""
+    school_id = source_map.get(source)
+    if school_id and school_id.startswith("__"):
+        school_id = dispatch_school_id(school_id, title)
+    return school_id
+
+
+# ========== 下载 ==========
+
+def _safe_name(name):
+    name = re.sub(r'[\\/:*?"<>|\r\n\t]', "_", name).strip().lstrip(".")
+    return name[:MAX_NAME_LENGTH]
+
+
+def _filename_from_headers(headers):
+    """Content-Disposition 中的文件名（支持 filename*=UTF-8''...）"""
+    disposition = headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*\s*=\s*[\w-]+''([^;]+)", disposition, re.I)
+    if match:
+        return unquote(match.group(1).strip().strip('"'))
+    match = re.search(r'filename\s*=\s*"?([^";]+)"?', disposition, re.I)
+    if match:
+        raw = match.group(1).strip()
+        # 许多国内站点直接发送 GBK/UTF-8 字节，requests 按 latin-1 解码
+        try:
+            raw = raw.encode("latin-1").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            try:
+                raw = raw.encode("latin-1").decode("gbk")
+            except (UnicodeEncodeError, UnicodeDecodeError):
+                pass
+        return unquote(raw)
+    return None
+
+
+def choose_filename(title, url, headers):
+    """
+    选择保存的文件名：响应头给出的文件名优先，其次为链接文字（补上扩展名），
+    最后为链接中的文件名（如 P020260205xxx.pdf）
+    """
+    url_name = unquote(os.path.basename(urlsplit(url).path))
+    ext = os.path.splitext(url_name)[1].lower()
+    name = _filename_from_headers(headers)
+    if not name and title:
+        name = title if os.path.splitext(title)[1].lower() in ATTACHMENT_EXTS else title + ext
+    name = _safe_name(name or url_name)
+    return name or "附件" + ext
+
+
+def _content_length(resp):
+    """响应体的完整大小（206 时取 Content-Range 中的总长度），未知时为 None"""
+    content_range = resp.headers.get("Content-Range", "")
+    match = re.search(r"/(\d+)$", content_range)
+    if match:
+        return int(match.group(1))
+    length = resp.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _hash_file(path, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+
+def _find_duplicate(folder_path, size, sha256):
+    """文件夹中是否已有内容相同的文件（先按大小筛选，只对同样大小的文件计算哈希）"""
+    for root, dirs, filenames in os.walk(folder_path):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for fn in filenames:
+            if fn.startswith("."):
+                continue
+            fp = os.path.join(root, fn)
+            try:
+                if os.path.getsize(fp) != size:
+                    continue
+                if _hash_file(fp).hexdigest() == sha256:
+                    return fp
+            except OSError:
+                continue
+    return None
+
+
+# 每个学校文件夹一把锁：并发下载的附件逐个完成去重与落盘，
+# 避免同名附件选中同一个目标路径、或内容相同的附件都被保存
+_folder_locks = {}
+_folder_locks_guard = threading.Lock()
+
+
+def _folder_lock(folder_path):
+    with _folder_locks_guard:
+        return _folder_locks.setdefault(os.path.abspath(folder_path), threading.Lock())
+
+
+def _unique_path(folder_path, name):
+    stem, ext = os.path.splitext(name)
+    path = os.path.join(folder_path, name)
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(folder_path, f"{stem} ({n}){ext}")
+        n += 1
+    return path
+
+
+def download_attachment(attachment, folder_path, headers):
+    """
+    下载单个附件到 folder_path。
+    返回 (结果, 路径)：保存或重复时为对应文件的路径，其余为 None
+    """
+    url = attachment["url"]
+    os.makedirs(STAGING_DIR, exist_ok=True)
+    part_path = os.path.join(STAGING_DIR, hashlib.md5(url.encode("utf-8")).hexdigest() + ".part")
+
+    for _ in range(2):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        req_headers = dict(headers)
+        if offset:
+            req_headers["Range"] = f"bytes={offset}-"
+        with requests.get(url, headers=req_headers, timeout=DOWNLOAD_TIMEOUT,
+                          verify=False, stream=True) as resp:
+            resumed = resp.status_code == 206 and \
+                resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-")
+            if offset and (resp.status_code == 416 or (resp.status_code == 206 and not resumed)):
+                # 本地的部分文件与服务器不一致，从头下载
+                os.remove(part_path)
+                continue
+            resp.raise_for_status()
+
+            # 下载之前先按响应头过滤：网页（多为登录页/错误页）与超过上限的文件
+            content_type = resp.headers.get("Content-Type", "").lower()
+            if content_type.startswith("text/html"):
+                return NOT_ATTACHMENT, None
+            total = _content_length(resp)
+            if total is not None and total > MAX_ATTACHMENT_BYTES:
+                return TOO_LARGE, None
+
+            if offset and resumed:
+                mode, digest = "ab", _hash_file(part_path)
+            else:
+                mode, digest, offset = "wb", hashlib.sha256(), 0
+            size = offset
+            with open(part_path, mode) as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_ATTACHMENT_BYTES:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+            if size > MAX_ATTACHMENT_BYTES:
+                os.remove(part_path)
+                return TOO_LARGE, None
+            if total is not None and size < total:
+                # 连接提前断开，保留 .part 下次续传
+                return FAILED, None
+            name = choose_filename(attachment.get("title"), url, resp.headers)
+        break
+    else:
+        return FAILED, None
+
+    os.makedirs(folder_path, exist_ok=True)
+    with _folder_lock(folder_path):
+        duplicate = _find_duplicate(folder_path, size, digest.hexdigest())
+        if duplicate:
+            os.remove(part_path)
+            return DUPLICATE, duplicate
+        dest = _unique_path(folder_path, name)
+        shutil.move(part_path, dest)
+    return SAVED, dest
+
+
+# ========== 待处理队列 ==========
+
+def load_pending():
+    try:
+        with open(PENDING_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def save_pending(pending):
+    tmp = PENDING_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(pending, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, PENDING_FILE)
+
+
+# ========== 主流程 ==========
+
+def harvest(notices, fetch_links, headers, workers=HARVEST_WORKERS):
+    """
+    下载通知中的附件。notices: [{"title", "url", "school_id"}, ...]，与上次未完成的通知合并处理；
+    fetch_links(url) 返回页面中的链接 [(链接文字, href), ...]。
+    通知本身就是附件链接时直接下载。返回 {结果: 个数}
+    """
+    folders = load_folder_map()
+    pending = load_pending()
+    queued = {n["url"] for n in pending}
+    for notice in notices:
+        if notice.get("school_id") in folders and notice["url"] not in queued:
+            pending.append(notice)
+            queued.add(notice["url"])
+    # 先落盘，中途中断时下次运行继续
+    save_pending(pending)
+    if not pending:
+        return {}
+
+    def discover(notice):
+        if is_attachment_url(notice["url"]):
+            return [{"title": notice["title"], "url": notice["url"]}]
+        try:
+            return find_attachments(fetch_links(notice["url"]), notice["url"])
+        except Exception as e:
+            logging.error(f"[附件] 通知页面抓取失败 {notice['url']}: {type(e).__name__}: {e}")
+            return None
+
+    def fetch(job):
+        attachment, folder_path = job
+        try:
+            return download_attachment(attachment, folder_path, headers)
+        except Exception as e:
+            logging.error(f"[附件] 下载失败 {attachment['url']}: {type(e).__name__}: {e}")
+            return FAILED, None
+
+    counts = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        found = list(pool.map(discover, pending))
+
+        # 同一附件可能被多个通知引用，只下载一次
+        jobs, owners = {}, []
+        for notice, attachments in zip(pending, found):
+            urls = []
+            for attachment in attachments or []:
+                if attachment["url"] not in jobs:
+                    folder = os.path.join(ROOT_DIR, folders[notice["school_id"]])
+                    jobs[attachment["url"]] = (attachment, folder)
+                urls.append(attachment["url"])
+            owners.append(urls)
+
+        results = dict(zip(jobs, pool.map(fetch, jobs.values())))
+
+    remaining = []
+    for notice, attachments, urls in zip(pending, found, owners):
+        statuses = [results[u][0] for u in urls]
+        if attachments is None or any(s not in FINAL_RESULTS for s in statuses):
+            notice["attempts"] = notice.get("attempts", 0) + 1
+            if notice["attempts"] < MAX_ATTEMPTS:
+                remaining.append(notice)
+            else:
+                logging.warning(f"[附件] 多次失败，放弃: {notice['url']}")
+    for status, path in results.values():
+        counts[status] = counts.get(status, 0) + 1
+        if status == SAVED:
+            print(f"     + {os.path.relpath(path, ROOT_DIR)}")
+    save_pending(remaining)
+    return counts
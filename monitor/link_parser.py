@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+流式链接与正文提取
+边下载边解析：按块喂给增量 HTML 解析器，只保留 <a href> 的文字与链接（或正文文字），不构建整棵文档树。
+可指定链接所在的容器（如 "div#list"、"ul.news"），容器闭合后即可停止下载。
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+# 在页面开头多少字节内查找 <meta charset>
+SNIFF_BYTES = 4096
+
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w-]+)""", re.I)
+_HEADER_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w-]+)", re.I)
+
+# 常见的中文编码声明统一按超集解码
+CHARSET_ALIASES = {"gb2312": "gb18030", "gbk": "gb18030", "x-gbk": "gb18030"}
+
+
+def _codec(name):
+    name = CHARSET_ALIASES.get(name.lower(), name.lower())
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def sniff_encoding(head, content_type=""):
+    """
+    确定页面编码：页面内 <meta> 声明优先（与浏览器和原先的处理一致），其次为响应头，
+    都没有时，开头能按 UTF-8 解码即为 UTF-8，否则按 GB18030
+    """
+    match = _META_CHARSET_RE.search(head)
+    if match:
+        codec = _codec(match.group(1).decode("ascii", "ignore"))
+        if codec:
+            return codec
+    match = _HEADER_CHARSET_RE.search(content_type)
+    if match:
+        codec = _codec(match.group(1))
+        if codec:
+            return codec
+    try:
+        # 末尾可能截断在多字节字符中间，交给增量解码器判断
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+
+def parse_container_spec(spec):
+    """容器写法 "tag"、"tag#id"、"tag.class" → (tag, id, class)"""
+    match = re.fullmatch(r"([a-zA-Z][\w-]*)(?:#([\w-]+))?(?:\.([\w-]+))?", spec.strip())
+    if not match:
+        raise ValueError(f"无法识别的容器写法: {spec}")
+    tag, id_, cls = match.groups()
+    return tag.lower(), id_, cls
+
+
+class LinkParser(HTMLParser):
+    """
+    收集 (链接文字, href)，链接文字与 BeautifulSoup 的 get_text(strip=True) 相同。
+    指定 container 时只收集容器内的链接，容器闭合后 done 为 True；
+    整页都没有找到容器时，links 退回为全页链接。
+    """
+
+    def __init__(self, container=None):
+        super().__init__(convert_charrefs=True)
+        self.container = parse_container_spec(container) if container else None
+        self.found_container = False
+        self.done = False
+        self._depth = 0
+        self._href = None
+        self._text = []
+        self._page_links = []
+        self._container_links = []
+
+    @property
+    def links(self):
+        if self.container and self.found_container:
+            return self._container_links
+        return self._page_links
+
+    def _matches(self, tag, attrs):
+        want_tag, want_id, want_class = self.container
+        if tag != want_tag:
+            return False
+        attrs = dict(attrs)
+        if want_id and attrs.get("id") != want_id:
+            return False
+        if want_class and want_class not in (attrs.get("class") or "").split():
+            return False
+        return True
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.container:
+            if self._depth:
+                if tag == self.container[0]:
+                    self._depth += 1
+            elif self._matches(tag, attrs):
+                self.found_container = True
+                self._depth = 1
+        if tag == "a":
+            self._close_link()
+            href = dict(attrs).get("href")
+            if href is not None:
+                self._href = href
+                self._text = []
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == "a":
+            self._close_link()
+        if self._depth and tag == self.container[0]:
+            self._depth -= 1
+            if not self._depth:
+                self._close_link()
+                self.done = True
+
+    def handle_data(self, data):
+        if self._href is not None:
+            text = data.strip()
+            if text:
+                self._text.append(text)
+
+    def _close_link(self):
+        if self._href is None:
+            return
+        link = ("".join(self._text), self._href)
+        self._page_links.append(link)
+        if self._depth:
+            self._container_links.append(link)
+        self._href = None
+        self._text = []
+
+    def close(self):
+        super().close()
+        self._close_link()
+
+
+# 不含正文的元素
+_SKIP_TAGS = {"script", "style", "noscript", "head", "title", "template", "svg"}
+# 块级元素，前后断行
+_BLOCK_TAGS = {"p", "div", "br", "li", "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6",
+               "table", "ul", "ol", "section", "article", "blockquote", "pre", "dd", "dt"}
+
+
+class TextParser(HTMLParser):
+    """
+    提取通知详情页的正文，按块级元素分行。
+    链接文字不计入正文（导航栏、“相关新闻”等列表几乎全是链接，随站点其他页面变化），
+    链接到附件的写成一行 "[附件] 文字 href"，附件增删也能被发现。
+    is_attachment: 判断 href 是否为附件的函数
+    """
+
+    done = False
+
+    def __init__(self, is_attachment=None):
+        super().__init__(convert_charrefs=True)
+        self.is_attachment = is_attachment or (lambda href: False)
+        self.lines = []
+        self._current = []
+        self._skip = 0
+        self._href = None
+        self._link_text = []
+
+    def _break(self):
+        text = " ".join("".join(self._current).split())
+        if text:
+            self.lines.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "a":
+            self._href = dict(attrs).get("href")
+            self._link_text = []
+        elif tag in _BLOCK_TAGS:
+            self._break()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "a":
+            if self._href and self.is_attachment(self._href):
+                self._break()
+                self.lines.append(f"[附件] {''.join(self._link_text).strip()} {self._href.strip()}")
+            self._href = None
+        elif tag in _BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._href is not None:
+            self._link_text.append(data)
+        else:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._break()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知规范化规则（爬虫与 webapp 共用）
+通知在首次抓取时规范化一次：学院分配、排除词/导航链接过滤、日期提取与校验、标题清理、分类，
+结果写入 notices.jsonl，webapp 直接读取，无需逐条重新计算。
+规则修改后运行 reprocess 命令，从原始记录 updates.md 重建 notices.jsonl。
+
+用法:
+    python3 monitor/normalize.py reprocess
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import date as dt_date
+
+MONITOR_DIR = os.path.dirname(os.path.abspath(__file__))
+UPDATES_FILE = os.path.join(MONITOR_DIR, "updates.md")
+NOTICES_FILE = os.path.join(MONITOR_DIR, "notices.jsonl")
+REGISTRY_FILE = os.path.join(os.path.dirname(MONITOR_DIR), "webapp", "schools.json")
+
+# 规则版本：修改下列规则后递增，爬虫发现 notices.jsonl 的版本不一致时自动重建
+RULES_VERSION = 1
+
+# 排除关键词（命中任一则过滤掉）
+EXCLUDE_KEYWORDS = [
+    # 不适用的招生类型
+    "港澳台", "港澳", "台湾地区", "留学生", "国际学生", "来华留学",
+    # 统考相关（用户走推免，不走考研）
+    "网报公告", "网上确认", "初试科目", "考场安排", "条形码", "考点公告",
+    "准考证", "复试分数线", "调剂",
+    # 不相关的学院/专业
+    "医学院", "护理", "口腔", "药学", "公共卫生",
+    "体育系", "体育学", "法学院", "法律硕士", "法律学",
+    "农业与生物", "设计学院", "物流工程", "能源学院",
+    "MBA", "EMBA", "MPA", "MEM", "MTT",
+    # 宣传册类（非通知）
+    "宣传手册", "宣传册", "招生手册",
+]
+
+# 过短的导航链接（非真正通知）
+NAV_LINK_TITLES = {
+    "招生工作", "硕士招生", "博士招生", "招生信息", "留学生招生",
+    "招生简章", "硕士生招生", "招生培养", "招生办公室",
+    "夏令营报名", "预推免报名", "夏令营公示", "预推免公示",
+    "夏令营考生登录", "预推免考生登录", "博士招生公示", "院系招生公示",
+    "研究生招生", "人才培养", "中国研究生招生信息网",
+    "研究生招生管理信息系统", "招生综合信息平台", "招生信息Admissions",
+}
+
+# webapp 读取的通知字段（其余字段只保存在 notices.jsonl 中）
+NOTICE_FIELDS = ("title", "url", "date", "source", "school_id", "category")
+
+
+# ========== 日期 ==========
+
+def extract_date_from_url(url):
+    """从 URL 中提取日期，支持多种高校 URL 格式"""
+    # 中科院格式: /202510/t20251016_xxx.html → 2025-10-16
+    m = re.search(r'/(\d{4})(\d{2})/t(\d{4})(\d{2})(\d{2})_', url)
+    if m:
+        return f"{m.group(3)}-{m.group(4)}-{m.group(5)}"
+    # 部分高校: /2026/0209/ → 2026-02-09
+    m = re.search(r'/(\d{4})/(\d{2})(\d{2})/', url)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    # 中科院 PDF: /202602/P020260205xxx.pdf → 2026-02-05
+    m = re.search(r'/(\d{4})(\d{2})/P\d{3}(\d{4})(\d{2})(\d{2})', url)
+    if m:
+        return f"{m.group(3)}-{m.group(4)}-{m.group(5)}"
+    # 南大格式: /xx/xx/c57656aXXXXXX/page.htm — 无日期但可从标题年份推断
+    # 清华电子/自动化等: /info/1078/4801.htm — 无直接日期
+    # 清华/南大/浙大等: /2025/0528/cXXaXXX/page.htm
+    m = re.search(r'/(\d{4})/(\d{2})(\d{2})/c\d+a\d+/', url)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    # 南大 yzb 格式: /e4/af/c47868a713903/page.htm — 无日期
+    # 中科院月份目录: /202510/ (无日)
+    m = re.search(r'/(\d{4})(\d{2})/c\d+a\d+/', url)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-01"
+    # 通用: URL 路径中的 YYYYMMDD
+    m = re.search(r'/(\d{4})(\d{2})(\d{2})/', url)
+    if m:
+        y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if 2015 <= y <= 2030 and 1 <= mo <= 12 and 1 <= d <= 31:
+            return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    return ""
+
+
+def extract_date_from_title(title):
+    """从标题文本中提取日期"""
+    chinese_months = {
+        '一月': '01', '二月': '02', '三月': '03', '四月': '04',
+        '五月': '05', '六月': '06', '七月': '07', '八月': '08',
+        '九月': '09', '十月': '10', '十一月': '11', '十二月': '12',
+    }
+
+    patterns = [
+        # 2025-06-13
+        (r'(\d{4})-(\d{2})-(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
+        # 202602/09
+        (r'^(\d{4})(\d{2})/(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
+        # 清华自动化格式: "302025-05" → 2025-05-30
+        (r'^(\d{2})(\d{4})-(\d{2})', lambda m: f"{m.group(2)}-{m.group(3)}-{m.group(1)}"),
+        # 2025.12.25
+        (r'(\d{4})\.(\d{2})\.(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
+        # DD2025.MM (如 "152025.12" → 2025-12-15)
+        (r'^(\d{2})(\d{4})\.(\d{2})', lambda m: f"{m.group(2)}-{m.group(3)}-{m.group(1)}"),
+        # MM.DD/YYYY
+        (r'^(\d{2})\.(\d{2})/(\d{4})', lambda m: f"{m.group(3)}-{m.group(1)}-{m.group(2)}"),
+        # "Feb 10, 2026" 英文日期
+        (r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),?\s+(\d{4})',
+         lambda m: "{}-{}-{}".format(m.group(3), dict(Jan='01',Feb='02',Mar='03',Apr='04',May='05',Jun='06',Jul='07',Aug='08',Sep='09',Oct='10',Nov='11',Dec='12')[m.group(1)], m.group(2).zfill(2))),
+        # "2025年6月13日" or "2025年06月"
+        (r'(\d{4})年(\d{1,2})月(\d{1,2})日?', lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)}"),
+        (r'(\d{4})年(\d{1,2})月', lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-01"),
+    ]
+
+    for pattern, formatter in patterns:
+        dm = re.search(pattern, title)
+        if dm:
+            return formatter(dm)
+
+    # 中文月份: "19八月" "06九月"
+    dm = re.match(r'(\d{2})([\u4e00-\u9fff]+月)', title)
+    if dm and dm.group(2) in chinese_months:
+        day = dm.group(1)
+        month = chinese_months[dm.group(2)]
+        # 从标题中提取年份
+        ym = re.search(r'(\d{4})年', title)
+        year = ym.group(1) if ym else "2025"
+        return f"{year}-{month}-{day}"
+
+    return ""
+
+
+def validate_date(date_str):
+    """验证日期字符串的合法性，修正未来日期"""
+    if not date_str:
+        return ""
+    try:
+        parts = date_str.split('-')
+        y, m, d = int(parts[0]), int(parts[1]), int(parts[2])
+        if not (2015 <= y <= 2030 and 1 <= m <= 12 and 1 <= d <= 31):
+            return ""
+        # 如果日期在未来，年份减1（标题里的年份通常是招生年份而非发布年份）
+        today = dt_date.today()
+        try:
+            parsed = dt_date(y, m, d)
+        except ValueError:
+            return ""
+        if parsed > today:
+            y -= 1
+            try:
+                parsed = dt_date(y, m, d)
+            except ValueError:
+                return ""
+            return f"{y:04d}-{m:02d}-{d:02d}"
+        return date_str
+    except (ValueError, IndexError):
+        pass
+    return ""
+
+
+def extract_date(title, url):
+    """提取日期：先从标题提取，再从 URL 提取，最后从标题年份兜底。返回 (日期, 来源)"""
+    date_str = extract_date_from_title(title)
+    date_source = "title"
+    if not date_str:
+        date_str = extract_date_from_url(url)
+        date_source = "url"
+    if not date_str:
+        # 兜底：从标题提取年份，如 "2026年" "2025年" "(2025)" "2026级"
+        ym = re.search(r'(202[4-9])(?:年|级|\)）)', title)
+        if not ym:
+            ym = re.search(r'\(?(202[4-9])\)?', title)
+        if ym:
+            date_str = f"{ym.group(1)}-01-01"
+            date_source = "title_year"
+    date_str = validate_date(date_str)
+    return date_str, (date_source if date_str else "")
+
+
+# ========== 学院分配、标题与分类 ==========
+
+def dispatch_school_id(dispatch_key, title):
+    """对综合来源（研招网、夏令营统一页），根据标题内容分配到具体学院"""
+    title_lower = title.lower()
+
+    if dispatch_key == "__sjtu_dispatch__":
+        if "计算机" in title:
+            return "sjtu_cs"
+        if "人工智能" in title or "AI" in title_lower or "SAI" in title:
+            return "sjtu_ai"
+        # 默认两边都给（归到 sjtu_ai 作为兜底，但也复制到 sjtu_cs）
+        return "sjtu_ai"
+
+    if dispatch_key == "__pku_dispatch__":
+        if "计算机" in title:
+            return "pku_cs"
+        if "智能" in title:
+            return "pku_ai"
+        if "软件" in title or "软微" in title:
+            return "pku_ss"
+        return "pku_cs"
+
+    if dispatch_key == "__thu_dispatch__":
+        if "计算机" in title:
+            return "thu_cs"
+        if "电子" in title:
+            return "thu_ee"
+        if "自动化" in title:
+            return "thu_auto"
+        return "thu_cs"
+
+    return None
+
+
+def clean_title(title):
+    """去掉标题首尾的日期前缀/后缀"""
+    title = re.sub(r'^\d{6}/\d{2}', '', title).strip()
+    title = re.sub(r'^\d{2}\d{4}\.\d{2}', '', title).strip()
+    title = re.sub(r'^\d{4}\.\d{2}\.\d{2}', '', title).strip()
+    title = re.sub(r'^\d{2}\.\d{2}/\d{4}', '', title).strip()
+    title = re.sub(r'^\d{2}[\u4e00-\u9fff]+月', '', title).strip()
+    title = re.sub(r'^\d{4}-\d{2}-\d{2}', '', title).strip()
+    title = re.sub(r'\d{4}-\d{2}-\d{2}$', '', title).strip()
+    return title
+
+
+def categorize_notice(title):
+    """根据标题对通知进行分类"""
+    if any(kw in title for kw in ["夏令营", "暑期学校", "暑期项目", "开放日", "优才计划", "春季营", "冬令营"]):
+        return "夏令营"
+    if any(kw in title for kw in ["公示", "拟录取", "入营名单", "营员", "录取名单"]):
+        return "录取公示"
+    if any(kw in title for kw in ["预推免", "推免", "推荐免试", "接收推免"]):
+        return "预推免"
+    if any(kw in title for kw in ["招生简章", "招生办法", "招生说明", "招收", "考核及录取"]):
+        return "招生简章"
+    if any(kw in title for kw in ["直博", "硕博连读", "博士研究生招生", "申请-考核"]):
+        return "博士招生"
+    return "其他"
+
+
+def normalize_notice(title, url, source, school_id):
+    """
+    规范化一条通知。school_id 为来源对应的学校 id（综合来源为分配键）。
+    返回规范化记录；应被过滤的通知返回 None
+    """
+    # 对综合来源，按标题内容分配到具体学院
+    if school_id and school_id.startswith("__"):
+        school_id = dispatch_school_id(school_id, title)
+
+    # 过滤不相关通知
+    if any(kw in title for kw in EXCLUDE_KEYWORDS):
+        return None
+
+    # 过滤导航链接
+    if title.strip() in NAV_LINK_TITLES:
+        return None
+
+    # 过滤标题过短的泛链接（<=6字且不含年份）
+    if len(title.strip()) <= 6 and not re.search(r'\d{4}', title):
+        return None
+
+    date_str, date_source = extract_date(title, url)
+
+    # 跳过清理后标题为空的
+    cleaned = clean_title(title)
+    if not cleaned:
+        return None
+
+    return {
+        "title": cleaned,
+        "url": url,
+        "date": date_str,
+        "source": source,
+        "school_id": school_id,
+        "category": categorize_notice(cleaned),
+        "date_source": date_source,
+        "raw_title": title,
+    }
+
+
+# ========== updates.md 与 notices.jsonl ==========
+
+def load_source_map(registry_path=REGISTRY_FILE):
+    """从院校注册表读取 {updates.md 来源名: 学校 id 或分配键}"""
+    with open(registry_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    sources = {}
+    for entry in data.get("schools", []):
+        for name in entry.get("sources", []):
+            sources[name] = entry["id"]
+    sources.update(data.get("dispatch_sources", {}))
+    return sources
+
+
+def source_school_ids(registry_path=REGISTRY_FILE):
+    """
+    {来源名: 该来源的通知可能归入的学校 id 集合}。
+    综合来源按标题分配到同一大学的各学院（见 dispatch_school_id），取注册表中该大学的全部学院
+    """
+    with open(registry_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    result = {}
+    by_university = {}
+    for entry in data.get("schools", []):
+        by_university.setdefault(entry["university"], set()).add(entry["id"])
+        for name in entry.get("sources", []):
+            result.setdefault(name, set()).add(entry["id"])
+    for name in data.get("dispatch_sources", {}):
+        university = name.split(" - ", 1)[0]
+        result.setdefault(name, set()).update(by_university.get(university, ()))
+    return result
+
+
+def parse_update_lines(lines, source_map, current_source=None, first_seen=""):
+    """
+    解析 updates.md 的若干行并规范化。
+    返回 (记录列表, 最后所在的来源)，后者用于追加内容的增量解析续接。
+    记录的 first_seen 取所在批次的 "## 时间 更新" 标题
+    """
+    records = []
+    current_school_id = source_map.get(current_source) if current_source else None
+
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith("## "):
+            first_seen = line[3:].split(" 更新", 1)[0].strip()
+
+        # 匹配 ### 学校 - 部门
+        if line.startswith("### "):
+            current_source = line[4:].strip()
+            current_school_id = source_map.get(current_source)
+
+        # 匹配 - [标题](链接)
+        m = re.match(r'-\s+\[(.+?)\]\((.+?)\)', line)
+        if m and current_source:
+            record = normalize_notice(m.group(1), m.group(2), current_source, current_school_id)
+            if record is not None:
+                record["first_seen"] = first_seen
+                records.append(record)
+
+    return records, current_source
+
+
+def append_records(records, path=NOTICES_FILE):
+    """把规范化记录追加到 notices.jsonl（文件不存在时先写版本行）"""
+    if not records:
+        return
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", encoding="utf-8") as f:
+        if new_file:
+            f.write(json.dumps({"_meta": {"rules_version": RULES_VERSION}}) + "\n")
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def store_rules_version(path=NOTICES_FILE):
+    """notices.jsonl 的规则版本；文件不存在或无版本行时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            first = json.loads(f.readline() or "{}")
+    except (OSError, json.JSONDecodeError):
+        return None
+    return first.get("_meta", {}).get("rules_version")
+
+
+def reprocess(updates_path=UPDATES_FILE, store_path=NOTICES_FILE, registry_path=REGISTRY_FILE):
+    """按当前规则从 updates.md 全量重建 notices.jsonl（先写临时文件再替换），返回记录数"""
+    source_map = load_source_map(registry_path)
+    records = []
+    if os.path.exists(updates_path):
+        with open(updates_path, "r", encoding="utf-8") as f:
+            records, _ = parse_update_lines(f.read().split("\n"), source_map)
+    tmp_path = store_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"_meta": {"rules_version": RULES_VERSION}}) + "\n")
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, store_path)
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="通知规范化")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("reprocess", help="按当前规则从 updates.md 重建 notices.jsonl")
+    rp.add_argument("--updates", default=UPDATES_FILE, help="原始记录 updates.md 路径")
+    rp.add_argument("--store", default=NOTICES_FILE, help="notices.jsonl 路径")
+    rp.add_argument("--registry", default=REGISTRY_FILE, help="院校注册表 schools.json 路径")
+    args = parser.parse_args()
+
+    if args.command == "reprocess":
+        count = reprocess(args.updates, args.store, args.registry)
+        print(f"已重建 {args.store}: {count} 条通知（规则版本 {RULES_VERSION}）")
+
+
+if __name__ == "__main__":
+    main()
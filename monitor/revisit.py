@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+已见通知的变化检测（爬虫的可选阶段）
+条目 ID 只由标题与链接决定，学校修改已发布的通知（延长截止日期、补充附件、更新入营名单）时无从发现。
+本阶段按衰减的时间表重新抓取仍“活跃”的通知详情页，保存规范化正文的摘要，
+内容变化时把变化摘要追加到 notice_updates.jsonl（webapp 据此推送“通知已更新”事件），
+首次取得或变化后的正文追加到 notice_details.jsonl（webapp 据此建立正文的全文索引）。
+每次运行最多重访 REVISIT_BUDGET 个页面，开销不随历史通知数增长。
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from harvest import is_attachment_url
+from normalize import MONITOR_DIR, NOTICES_FILE
+
+REVISIT_DB = os.path.join(MONITOR_DIR, "revisit.sqlite3")
+UPDATES_LOG = os.path.join(MONITOR_DIR, "notice_updates.jsonl")
+DETAILS_LOG = os.path.join(MONITOR_DIR, "notice_details.jsonl")
+
+# 活跃通知：最近 RECENT_DAYS 天内首次发现的，或 LIVE_CATEGORIES 中 LIVE_CATEGORY_DAYS 天内的
+RECENT_DAYS = 30
+LIVE_CATEGORIES = ("夏令营", "录取公示")
+LIVE_CATEGORY_DAYS = 180
+
+# 重访间隔：首次 MIN_INTERVAL，内容未变则翻倍直至 MAX_INTERVAL，变化后回到 MIN_INTERVAL
+MIN_INTERVAL = 12 * 3600
+MAX_INTERVAL = 16 * 86400
+REVISIT_BUDGET = 20             # 每次运行最多重访的页面数
+
+MAX_TEXT_CHARS = 50000          # 保存的正文上限（用于下次比较）
+DETAIL_TEXT_CHARS = 5000        # 写入 notice_details.jsonl 的正文上限（webapp 只索引开头部分）
+PREVIEW_LINES = 5               # 变化摘要中最多列出的行数
+PREVIEW_CHARS = 120
+
+# 与通知内容无关、每次访问都可能不同的片段
+NOISE_PATTERNS = [
+    re.compile(r"(浏览|阅读|点击|访问)(次数|量|数)?\s*[:：]?\s*\d+\s*次?"),
+    re.compile(r"(当前|今天|今日)(时间|日期)?\s*[:：]\s*[\d\-/年月日: ]+"),
+]
+
+
+# ========== 正文规范化与比较 ==========
+
+def normalize_lines(lines):
+    """去掉噪声片段与空行，返回规范化后的正文行"""
+    result = []
+    for line in lines:
+        for pattern in NOISE_PATTERNS:
+            line = pattern.sub("", line)
+        line = " ".join(line.split())
+        if line:
+            result.append(line)
+    return result
+
+
+def digest_lines(lines):
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def diff_summary(old_lines, new_lines):
+    """正文变化摘要：增删行数与前几行变化内容（"+ " 为新增，"- " 为删除）"""
+    added, removed, preview = 0, 0, []
+    for line in difflib.unified_diff(old_lines, new_lines, lineterm="", n=0):
+        if line.startswith(("+++", "---", "@@")):
+            continue
+        if line.startswith("+"):
+            added += 1
+        elif line.startswith("-"):
+            removed += 1
+        else:
+            continue
+        if len(preview) < PREVIEW_LINES:
+            text = line[1:].strip()
+            if len(text) > PREVIEW_CHARS:
+                text = text[:PREVIEW_CHARS] + "…"
+            preview.append(f"{line[0]} {text}")
+    return {"added": added, "removed": removed, "preview": preview}
+
+
+# ========== 候选通知 ==========
+
+def live_notices(now, store_path=NOTICES_FILE):
+    """从 notices.jsonl 中选出仍活跃的通知（跳过写了一半等无法解析的行）"""
+    recent = (now - timedelta(days=RECENT_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+    live_since = (now - timedelta(days=LIVE_CATEGORY_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+    notices = {}
+    try:
+        with open(store_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"[重访] 跳过无法解析的行: {line[:80]!r}")
+                    continue
+                if "url" not in record and "_meta" not in record:
+                    continue
+                first_seen = record.get("first_seen") or ""
+                # 通知本身是附件（PDF 等）时没有可比较的正文
+                if "_meta" in record or not first_seen or is_attachment_url(record["url"]):
+                    continue
+                if first_seen >= recent or (
+                        record.get("category") in LIVE_CATEGORIES and first_seen >= live_since):
+                    notices[record["url"]] = record
+    except FileNotFoundError:
+        pass
+    return notices
+
+
+# ========== 重访记录 ==========
+
+class RevisitStore:
+    """每个重访页面的正文摘要、上次的正文与下次重访时间"""
+
+    def __init__(self, path=REVISIT_DB):
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, digest TEXT, body TEXT,"
+            " checked_at REAL, next_check REAL NOT NULL, interval REAL NOT NULL,"
+            " changes INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_next_check ON pages (next_check)")
+        self._conn.commit()
+
+    def due(self, urls, now, limit):
+        """到期的页面（最久未访问的在前），新加入的活跃通知立即到期"""
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO pages (url, next_check, interval) VALUES (?, 0, ?)",
+            [(url, MIN_INTERVAL) for url in urls])
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT url FROM pages WHERE next_check <= ? ORDER BY next_check", (now,))
+        due = []
+        for (url,) in rows:
+            if url in urls:
+                due.append(url)
+                if len(due) >= limit:
+                    break
+        return due
+
+    def get(self, url):
+        return self._conn.execute(
+            "SELECT digest, body, interval FROM pages WHERE url = ?", (url,)).fetchone()
+
+    def record(self, url, digest, body, changed, now):
+        """记录一次访问：内容变化时回到最短间隔，否则间隔翻倍"""
+        interval = self.get(url)[2]
+        interval = MIN_INTERVAL if changed else min(interval * 2, MAX_INTERVAL)
+        self._conn.execute(
+            "UPDATE pages SET digest = ?, body = ?, checked_at = ?, next_check = ?, interval = ?,"
+            " changes = changes + ? WHERE url = ?",
+            (digest, body, now, now + interval, interval, int(changed), url))
+        self._conn.commit()
+
+    def postpone(self, url, now):
+        """抓取失败：按当前间隔顺延，不改变间隔"""
+        self._conn.execute(
+            "UPDATE pages SET next_check = ? + interval WHERE url = ?", (now, url))
+        self._conn.commit()
+
+    def prune(self, urls):
+        """不再活跃的通知不再重访"""
+        kept = set(urls)
+        stale = [(url,) for (url,) in self._conn.execute("SELECT url FROM pages")
+                 if url not in kept]
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", stale)
+        self._conn.commit()
+        return len(stale)
+
+    def bodies(self):
+        """已保存正文的全部页面 (url, 正文)"""
+        return self._conn.execute("SELECT url, body FROM pages WHERE body IS NOT NULL").fetchall()
+
+    def close(self):
+        self._conn.close()
+
+
+# ========== 主流程 ==========
+
+def append_jsonl(records, path):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def detail_record(url, body):
+    return {"url": url, "text": body[:DETAIL_TEXT_CHARS]}
+
+
+def revisit(fetch_text, budget=REVISIT_BUDGET, delay=None):
+    """
+    重访到期的活跃通知。fetch_text(url) 返回详情页正文行列表；delay() 返回两次请求间的等待秒数。
+    首次访问只建立基线。返回内容有变化的通知事件列表（已追加到 UPDATES_LOG）；
+    首次取得或有变化的正文追加到 DETAILS_LOG
+    """
+    now = datetime.now()
+    notices = live_notices(now, NOTICES_FILE)
+    store = RevisitStore(REVISIT_DB)
+    store.prune(notices)
+    due = store.due(notices, time.time(), budget)
+
+    # 正文记录文件尚不存在（如升级前已建立基线）时，先补写已保存的全部正文
+    details = [] if os.path.exists(DETAILS_LOG) else [
+        detail_record(url, body) for url, body in store.bodies()]
+    events = []
+    for i, url in enumerate(due):
+        if i and delay:
+            time.sleep(delay())
+        notice = notices[url]
+        try:
+            lines = normalize_lines(fetch_text(url))
+        except Exception as e:
+            logging.error(f"[重访失败] {url}: {type(e).__name__}: {e}")
+            store.postpone(url, time.time())
+            continue
+
+        body = "\n".join(lines)[:MAX_TEXT_CHARS]
+        lines = body.split("\n")
+        digest = digest_lines(lines)
+        old_digest, old_body, _ = store.get(url)
+        changed = old_digest is not None and old_digest != digest
+        store.record(url, digest, body, changed, time.time())
+        if old_digest != digest:
+            details.append(detail_record(url, body))
+        if changed:
+            events.append({
+                "url": url,
+                "title": notice["title"],
+                "source": notice.get("source"),
+                "school_id": notice.get("school_id"),
+                "category": notice.get("category"),
+                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "summary": diff_summary(old_body.split("\n") if old_body else [], lines),
+            })
+    store.close()
+    if details:
+        append_jsonl(details, DETAILS_LOG)
+    if events:
+        append_jsonl(events, UPDATES_LOG)
+    print(f"重访 {len(due)}/{len(notices)} 个活跃通知，{len(events)} 个有变化")
+    return events
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+已见条目存储
+完整记录保存在 SQLite 中，"是否新条目"先查磁盘持久化的 Bloom 过滤器：
+过滤器判定不存在即为新条目（无需访问数据库），只有可能命中时才查库确认。
+长期未在任何页面出现的条目可压缩为只保留 ID 的墓碑记录，常驻内存只有过滤器本身。
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import struct
+import time
+
+# 过滤器文件头：魔数、位数、哈希函数个数、已加入个数、对应的数据库写入代数
+_BLOOM_HEADER = struct.Struct("<4sQIQQ")
+_BLOOM_MAGIC = b"CBF1"
+
+# 过滤器默认容量与误判率；条目数超过容量时按两倍重建
+DEFAULT_CAPACITY = 100000
+FALSE_POSITIVE_RATE = 0.001
+
+
+class BloomFilter:
+    """标准 Bloom 过滤器，k 个位置由 MD5 双重哈希导出"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=FALSE_POSITIVE_RATE,
+                 num_bits=None, num_hashes=None, bits=None, count=0):
+        self.capacity = capacity
+        if num_bits is None:
+            num_bits = max(64, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key):
+        digest = hashlib.md5(key.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path, generation):
+        """原子写入（先写临时文件再替换）"""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, self.num_bits, self.num_hashes,
+                                       self.count, generation))
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """读取过滤器，返回 (过滤器, 写入代数)；文件缺失或损坏时返回 (None, None)"""
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_BLOOM_HEADER.size)
+                magic, num_bits, num_hashes, count, generation = _BLOOM_HEADER.unpack(header)
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None, None
+        if magic != _BLOOM_MAGIC or len(bits) != (num_bits + 7) // 8:
+            return None, None
+        capacity = max(1, round(num_bits * (math.log(2) ** 2) / -math.log(FALSE_POSITIVE_RATE)))
+        return cls(capacity, num_bits=num_bits, num_hashes=num_hashes,
+                   bits=bits, count=count), generation
+
+
+class SeenStore:
+    """
+    已见条目存储。
+    seen 表保存完整记录（含最近一次在页面上出现的时间），expired 表为压缩后只留 ID 的墓碑。
+    用法与原来的 seen 字典一致：`item_id in store`、`store.add(item_id, entry)`，结束时 save()。
+    """
+
+    def __init__(self, db_path, bloom_path, migrate_from=None):
+        """
+        db_path: SQLite 文件路径
+        bloom_path: 过滤器文件路径
+        migrate_from: 旧的 seen_items.json，首次创建时导入（原文件保留不动）
+        """
+        self.db_path = db_path
+        self.bloom_path = bloom_path
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS seen (
+                id TEXT PRIMARY KEY,
+                title TEXT, url TEXT, school TEXT, department TEXT,
+                first_seen TEXT, last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS seen_last_seen ON seen (last_seen);
+            CREATE TABLE IF NOT EXISTS expired (id TEXT PRIMARY KEY, expired_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (name, value) VALUES ('generation', 0);
+        """)
+        self._conn.commit()
+        self._dirty = False
+        if migrate_from:
+            self._migrate(migrate_from)
+        self._bloom = self._load_bloom()
+
+    # ---------- 过滤器 ----------
+
+    def _generation(self):
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()[0]
+
+    def _total(self):
+        return self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM seen) + (SELECT COUNT(*) FROM expired)").fetchone()[0]
+
+    def _load_bloom(self):
+        """读取过滤器；与数据库写入代数不一致（如上次未正常保存）时从数据库重建"""
+        bloom, generation = BloomFilter.load(self.bloom_path)
+        if bloom is not None and generation == self._generation():
+            return bloom
+        return self.rebuild_filter()
+
+    def rebuild_filter(self):
+        """按数据库中的全部 ID（含墓碑）重建过滤器，容量取当前条目数的两倍"""
+        bloom = BloomFilter(max(DEFAULT_CAPACITY, 2 * self._total()))
+        for table in ("seen", "expired"):
+            for (item_id,) in self._conn.execute(f"SELECT id FROM {table}"):
+                bloom.add(item_id)
+        bloom.save(self.bloom_path, self._generation())
+        self._bloom = bloom
+        return bloom
+
+    # ---------- 查询与写入 ----------
+
+    def __contains__(self, item_id):
+        if item_id not in self._bloom:
+            return False
+        # 可能命中（含误判），查库确认
+        row = self._conn.execute(
+            "SELECT 1 FROM seen WHERE id = ? UNION ALL SELECT 1 FROM expired WHERE id = ?",
+            (item_id, item_id)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def add(self, item_id, entry):
+        """记录新条目（save() 时提交）"""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO seen (id, title, url, school, department, first_seen, last_seen)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (item_id, entry.get("title"), entry.get("url"), entry.get("school"),
+             entry.get("department"), entry.get("first_seen"), time.time()))
+        self._conn.execute("DELETE FROM expired WHERE id = ?", (item_id,))
+        self._bloom.add(item_id)
+        self._dirty = True
+
+    def touch(self, item_ids):
+        """更新条目最近一次在页面上出现的时间（用于过期压缩）"""
+        self._conn.executemany("UPDATE seen SET last_seen = ? WHERE id = ?",
+                               [(time.time(), item_id) for item_id in item_ids])
+
+    def save(self):
+        """提交本次的写入；有新条目时保存过滤器（过滤器过满时按更大容量重建）"""
+        if self._dirty:
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+        self._conn.commit()
+        if self._dirty:
+            if self._bloom.count > self._bloom.capacity:
+                self.rebuild_filter()
+            else:
+                self._bloom.save(self.bloom_path, self._generation())
+            self._dirty = False
+
+    def close(self):
+        self._conn.close()
+
+    # ---------- 维护 ----------
+
+    def compact(self, ttl_days):
+        """
+        过期压缩：超过 ttl_days 天未在任何页面出现的条目只保留 ID（墓碑），
+        这些 ID 仍在过滤器中，不会再被当作新条目。返回压缩的条目数
+        """
+        cutoff = time.time() - ttl_days * 86400
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO expired (id, expired_at)"
+                " SELECT id, ? FROM seen WHERE last_seen < ?", (now, cutoff))
+            expired = self._conn.execute(
+                "DELETE FROM seen WHERE last_seen < ?", (cutoff,)).rowcount
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+        self._conn.execute("VACUUM")
+        self.rebuild_filter()
+        return expired
+
+    def id_version(self):
+        """当前记录所用的 ID 规则版本（从未重算过时为 None）"""
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'id_version'").fetchone()
+        return row[0] if row else None
+
+    def rekey(self, make_id, version):
+        """
+        按新的 ID 规则重算完整记录的 ID（幂等），同一通知的多条记录合并、保留最早的发现时间，
+        并记下规则版本。墓碑没有标题和链接，保持原样。返回合并掉的条目数
+        """
+        merged = 0
+        rows = self._conn.execute(
+            "SELECT id, title, url, first_seen, last_seen FROM seen").fetchall()
+        with self._conn:
+            for item_id, title, url, first_seen, last_seen in rows:
+                if not title or not url:
+                    continue
+                new_id = make_id(title, url)
+                if new_id == item_id:
+                    continue
+                kept = self._conn.execute(
+                    "SELECT first_seen, last_seen FROM seen WHERE id = ?", (new_id,)).fetchone()
+                if kept is None:
+                    self._conn.execute("UPDATE seen SET id = ? WHERE id = ?", (new_id, item_id))
+                    continue
+                earliest = min(v for v in (kept[0], first_seen) if v is not None) \
+                    if kept[0] is not None or first_seen is not None else None
+                self._conn.execute(
+                    "UPDATE seen SET first_seen = ?, last_seen = ? WHERE id = ?",
+                    (earliest, max(kept[1], last_seen), new_id))
+                self._conn.execute("DELETE FROM seen WHERE id = ?", (item_id,))
+                merged += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('id_version', ?)", (version,))
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+        self.rebuild_filter()
+        return merged
+
+    def _migrate(self, path):
+        """首次使用时导入旧的 seen_items.json（只导入一次）"""
+        done = self._conn.execute("SELECT value FROM meta WHERE name = 'migrated'").fetchone()
+        if done or not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                seen = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            logging.warning("%s 读取失败，跳过导入", path)
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (id, title, url, school, department, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(item_id, e.get("title"), e.get("url"), e.get("school"), e.get("department"),
+                  e.get("first_seen"), now) for item_id, e in seen.items()])
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('migrated', 1)")
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
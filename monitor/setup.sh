@@ -30,9 +30,9 @@ fi
 
 # 检查 Python 依赖
 echo "[1/4] 检查 Python 依赖..."
-python3 -c "import requests, bs4" 2>/dev/null || {
+python3 -c "import requests" 2>/dev/null || {
     echo "  正在安装缺失的 Python 包..."
-    pip3 install requests beautifulsoup4
+    pip3 install requests
 }
 echo "  依赖检查通过。"
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控目标（爬虫与 webapp 共用）
+只含目标列表与筛选逻辑，不依赖 requests：webapp 在请求中据此判断学校是否有可刷新的目标，
+导入时不会触发爬虫模块的依赖安装。
+"""
+
+from normalize import REGISTRY_FILE, source_school_ids
+
+# 需要监控的 URL 列表
+# 可选 "container"：通知列表所在的元素（"tag"、"tag#id" 或 "tag.class"），
+# 只提取其中的链接，读到该元素结束即停止下载
+MONITOR_TARGETS = [
+    # 上海交通大学
+    {
+        "school": "上海交通大学",
+        "department": "AI学院",
+        "url": "https://sai.sjtu.edu.cn/cn/list/qs",
+    },
+    {
+        "school": "上海交通大学",
+        "department": "计算机学院",
+        "url": "https://www.cs.sjtu.edu.cn/bsyjs_zsgz.html",
+    },
+    {
+        "school": "上海交通大学",
+        "department": "研究生招生网",
+        "url": "https://yzb.sjtu.edu.cn/",
+    },
+    # 中科院
+    {
+        "school": "中科院",
+        "department": "自动化所通知",
+        "url": "http://www.ia.cas.cn/qtgn/tzgg/",
+    },
+    {
+        "school": "中科院",
+        "department": "自动化所硕士招生",
+        "url": "https://ia.cas.cn/yjsjy/zs/sszs/",
+    },
+    {
+        "school": "中科院",
+        "department": "计算所通知",
+        "url": "http://www.ict.ac.cn/xwgg/tzgg/",
+    },
+    {
+        "school": "中科院",
+        "department": "计算所招生",
+        "url": "https://ict.cas.cn/yjsjy/zsxx/",
+    },
+    # 北京大学
+    {
+        "school": "北京大学",
+        "department": "智能学院",
+        "url": "https://sai.pku.edu.cn/rcpy/yjszs.htm",
+    },
+    {
+        "school": "北京大学",
+        "department": "计算机学院",
+        "url": "https://cs.pku.edu.cn/zsxx/yjszs.htm",
+    },
+    {
+        "school": "北京大学",
+        "department": "软微学院",
+        "url": "https://ss.pku.edu.cn/zsxx/zstz/index.htm",
+    },
+    {
+        "school": "北京大学",
+        "department": "夏令营统一页",
+        "url": "https://admission.pku.edu.cn/xly/index.htm",
+    },
+    # 南京大学
+    {
+        "school": "南京大学",
+        "department": "智科院",
+        "url": "https://is.nju.edu.cn/yjszs/list.htm",
+    },
+    {
+        "school": "南京大学",
+        "department": "计算机学院夏令营",
+        "url": "https://yzb.nju.edu.cn/xlyxx/main.htm",
+    },
+    # 浙江大学
+    {
+        "school": "浙江大学",
+        "department": "计算机学院通知",
+        "url": "http://www.cs.zju.edu.cn/csen/26994/list.htm",
+    },
+    {
+        "school": "浙江大学",
+        "department": "计算机学院招生",
+        "url": "http://www.cs.zju.edu.cn/csen/26697/list.htm",
+    },
+    # 清华大学
+    {
+        "school": "清华大学",
+        "department": "电子系动态",
+        "url": "https://www.ee.tsinghua.edu.cn/dzxw/dtxx.htm",
+    },
+    {
+        "school": "清华大学",
+        "department": "自动化系通知",
+        "url": "http://www.au.tsinghua.edu.cn/tzgg.htm",
+    },
+    {
+        "school": "清华大学",
+        "department": "自动化系研招",
+        "url": "https://www.au.tsinghua.edu.cn/zsjy/yjszs.htm",
+    },
+    {
+        "school": "清华大学",
+        "department": "计算机系通知",
+        "url": "https://www.cs.tsinghua.edu.cn/index/tzgg.htm",
+    },
+    {
+        "school": "清华大学",
+        "department": "计算机系招生",
+        "url": "https://www.cs.tsinghua.edu.cn/zszp/zsxx.htm",
+    },
+    {
+        "school": "清华大学",
+        "department": "夏令营统一页",
+        "url": "https://yz.tsinghua.edu.cn/xlyxx.htm",
+    },
+]
+
+
+def select_targets(targets, school_ids=None, schools=None, departments=None,
+                   registry_path=REGISTRY_FILE):
+    """
+    按学校 id、学校名、部门名筛选监控目标（同一选项的多个值取并集，不同选项取交集）。
+    学校 id 经院校注册表的来源映射解析，综合来源（研招网、夏令营统一页）在其可能分配到的各学院下都会被选中
+    """
+    if school_ids:
+        mapping = source_school_ids(registry_path)
+        wanted = set(school_ids)
+        targets = [t for t in targets
+                   if mapping.get(f"{t['school']} - {t['department']}", set()) & wanted]
+    if schools:
+        targets = [t for t in targets if any(name in t["school"] for name in schools)]
+    if departments:
+        targets = [t for t in targets if any(name in t["department"] for name in departments)]
+    return targets
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""crawler 的 URL 规范化、条目 ID 与跨进程写入锁"""
+
+import threading
+
+import pytest
+
+from crawler import canonicalize_url, file_lock, make_item_id
+
+BASE = "https://cs.pku.edu.cn/info/1234.htm"
+
+
+@pytest.mark.parametrize("url", [
+    "http://cs.pku.edu.cn/info/1234.htm",
+    "https://www.cs.pku.edu.cn/info/1234.htm",
+    "https://CS.PKU.EDU.CN/info/1234.htm",
+    "https://cs.pku.edu.cn:443/info/1234.htm",
+    "http://cs.pku.edu.cn:80/info/1234.htm",
+    "https://cs.pku.edu.cn//info///1234.htm",
+    "https://cs.pku.edu.cn/info/1234.htm#content",
+    "https://cs.pku.edu.cn/info/1234.htm?utm_source=wechat&spm=a.b",
+    "https://cs.pku.edu.cn/info/1234.htm?from=timeline&_t=1718000000",
+    "  https://cs.pku.edu.cn/info/1234.htm  ",
+])
+def test_same_page_variants(url):
+    assert canonicalize_url(url) == BASE
+
+
+def test_default_documents_collapse_to_directory():
+    assert canonicalize_url("https://cs.pku.edu.cn/zsxx/index.htm") == "https://cs.pku.edu.cn/zsxx/"
+    assert canonicalize_url("https://cs.pku.edu.cn/zsxx/Default.aspx") == "https://cs.pku.edu.cn/zsxx/"
+    assert canonicalize_url("https://cs.pku.edu.cn") == "https://cs.pku.edu.cn/"
+    assert canonicalize_url("https://cs.pku.edu.cn/zsxx/list.htm") == "https://cs.pku.edu.cn/zsxx/list.htm"
+
+
+def test_query_sorted_and_meaningful_params_kept():
+    assert (canonicalize_url("https://yz.example.edu.cn/view?b=2&a=1&utm_medium=x")
+            == "https://yz.example.edu.cn/view?a=1&b=2")
+    assert canonicalize_url("https://a.edu.cn/p?id=1") != canonicalize_url("https://a.edu.cn/p?id=2")
+
+
+def test_host_alias_and_custom_port():
+    assert canonicalize_url("http://www.ict.ac.cn/yjsjy/") == "https://ict.cas.cn/yjsjy/"
+    assert canonicalize_url("http://a.edu.cn:8080/x") == "https://a.edu.cn:8080/x"
+
+
+def test_non_http_urls_untouched():
+    assert canonicalize_url(" mailto:yz@pku.edu.cn ") == "mailto:yz@pku.edu.cn"
+    assert canonicalize_url("javascript:void(0)") == "javascript:void(0)"
+
+
+def test_item_id_uses_canonical_url():
+    assert make_item_id("2025年夏令营通知", "http://www.cs.pku.edu.cn/info/1234.htm#top") \
+        == make_item_id(" 2025年夏令营通知 ", BASE)
+    assert make_item_id("2025年夏令营通知", BASE) != make_item_id("2025年预推免通知", BASE)
+
+
+def test_file_lock_serializes_holders(tmp_path, capsys):
+    path = str(tmp_path / ".crawler.lock")
+    order = []
+    acquired = threading.Event()
+
+    def second():
+        with file_lock(path, "等待中"):
+            order.append("second")
+
+    with file_lock(path, "等待中"):
+        worker = threading.Thread(target=lambda: (acquired.set(), second()))
+        worker.start()
+        acquired.wait()
+        worker.join(0.2)
+        # 第二个持有者在锁释放前一直等待
+        assert worker.is_alive()
+        order.append("first")
+    worker.join(5)
+    assert order == ["first", "second"]
+    assert "等待中" in capsys.readouterr().out
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""附件下载：附件识别、文件名、流式下载与续传、去重，以及待处理队列"""
+
+import json
+import os
+
+import pytest
+
+import harvest
+
+PDF = b"%PDF-1.4 " + bytes(range(256)) * 8
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status_code = status
+        self.body = body
+        self.headers = {"Content-Length": str(len(body)), **(headers or {})}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class FakeServer:
+    """按 URL 返回固定内容，支持 Range；记录每次请求的头"""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        body, extra = self.files[url]
+        if "Range" in headers:
+            start = int(headers["Range"][len("bytes="):].rstrip("-"))
+            return FakeResponse(206, body[start:], {
+                **extra, "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"})
+        return FakeResponse(200, body, extra)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    srv = FakeServer({})
+    monkeypatch.setattr(harvest.requests, "get", srv.get)
+    monkeypatch.setattr(harvest, "STAGING_DIR", str(tmp_path / ".attachments"))
+    monkeypatch.setattr(harvest, "PENDING_FILE", str(tmp_path / "attachments_pending.json"))
+    monkeypatch.setattr(harvest, "ROOT_DIR", str(tmp_path))
+    return srv
+
+
+def test_find_attachments():
+    links = [("报名表", "/upload/报名表.docx"), ("报名表", "/upload/报名表.docx"),
+             ("附件1", "/202602/P020260205123456.pdf"), ("下载", "download.jsp?id=3"),
+             ("首页", "/index.htm"), ("", "javascript:void(0)")]
+    found = harvest.find_attachments(links, "https://cs.pku.edu.cn/info/1.htm")
+    assert [a["url"] for a in found] == [
+        "https://cs.pku.edu.cn/upload/报名表.docx",
+        "https://cs.pku.edu.cn/202602/P020260205123456.pdf",
+        "https://cs.pku.edu.cn/info/download.jsp?id=3"]
+
+
+def test_choose_filename():
+    url = "https://x.edu.cn/202602/P020260205123456.pdf"
+    assert harvest.choose_filename("推荐信模板", url, {}) == "推荐信模板.pdf"
+    assert harvest.choose_filename("", url, {}) == "P020260205123456.pdf"
+    utf8 = {"Content-Disposition": "attachment; filename*=UTF-8''%E7%94%B3%E8%AF%B7%E8%A1%A8.doc"}
+    assert harvest.choose_filename("链接文字", url, utf8) == "申请表.doc"
+    # 按 latin-1 解码的 GBK 字节
+    gbk = {"Content-Disposition": 'attachment; filename="' +
+           "简章.pdf".encode("gbk").decode("latin-1") + '"'}
+    assert harvest.choose_filename("", url, gbk) == "简章.pdf"
+    assert harvest.choose_filename("../a/b:c", url, {}) == "_a_b_c.pdf"
+
+
+def test_download_saves_then_dedups(server, tmp_path):
+    folder = str(tmp_path / "北大计算机")
+    server.files["https://x.edu.cn/a.pdf"] = (PDF, {"Content-Type": "application/pdf"})
+    server.files["https://x.edu.cn/copy.pdf"] = (PDF, {"Content-Type": "application/pdf"})
+    status, path = harvest.download_attachment({"title": "简章", "url": "https://x.edu.cn/a.pdf"},
+                                               folder, {})
+    assert status == harvest.SAVED and os.path.basename(path) == "简章.pdf"
+    with open(path, "rb") as f:
+        assert f.read() == PDF
+    status, dup = harvest.download_attachment({"title": "副本", "url": "https://x.edu.cn/copy.pdf"},
+                                              folder, {})
+    assert (status, dup) == (harvest.DUPLICATE, path)
+    assert os.listdir(folder) == ["简章.pdf"]
+
+
+def test_download_filters_by_headers(server, tmp_path, monkeypatch):
+    folder = str(tmp_path / "f")
+    server.files["https://x.edu.cn/login"] = (b"<html>", {"Content-Type": "text/html; charset=utf-8"})
+    assert harvest.download_attachment({"url": "https://x.edu.cn/login"}, folder, {}) == (
+        harvest.NOT_ATTACHMENT, None)
+    monkeypatch.setattr(harvest, "MAX_ATTACHMENT_BYTES", 100)
+    server.files["https://x.edu.cn/big.zip"] = (PDF, {})
+    assert harvest.download_attachment({"url": "https://x.edu.cn/big.zip"}, folder, {}) == (
+        harvest.TOO_LARGE, None)
+    assert not os.path.exists(folder)
+
+
+def test_download_resumes_partial_file(server, tmp_path):
+    url = "https://x.edu.cn/form.pdf"
+    server.files[url] = (PDF, {})
+    os.makedirs(harvest.STAGING_DIR)
+    part = os.path.join(harvest.STAGING_DIR,
+                        harvest.hashlib.md5(url.encode("utf-8")).hexdigest() + ".part")
+    with open(part, "wb") as f:
+        f.write(PDF[:1000])
+    status, path = harvest.download_attachment({"title": "表格", "url": url},
+                                               str(tmp_path / "f"), {})
+    assert status == harvest.SAVED
+    assert server.requests[-1][1]["Range"] == "bytes=1000-"
+    with open(path, "rb") as f:
+        assert f.read() == PDF
+
+
+def test_harvest_queue(server, tmp_path):
+    server.files["https://x.edu.cn/shared.pdf"] = (PDF, {})
+    pages = {"https://cs.pku.edu.cn/1.htm": [("简章", "https://x.edu.cn/shared.pdf")],
+             "https://cs.pku.edu.cn/2.htm": [("简章", "https://x.edu.cn/shared.pdf")]}
+
+    def fetch_links(url):
+        if url not in pages:
+            raise OSError("连接超时")
+        return pages[url]
+
+    notices = [{"title": t, "url": u, "school_id": "pku_cs"} for t, u in [
+        ("通知一", "https://cs.pku.edu.cn/1.htm"), ("通知二", "https://cs.pku.edu.cn/2.htm"),
+        ("抓取失败", "https://cs.pku.edu.cn/3.htm")]]
+    notices.append({"title": "未知学校", "url": "https://x.edu.cn/4.htm", "school_id": "nope"})
+    counts = harvest.harvest(notices, fetch_links, {}, workers=2)
+    # 两个通知引用同一附件，只下载一次
+    assert counts == {harvest.SAVED: 1}
+    assert [u for u, _ in server.requests] == ["https://x.edu.cn/shared.pdf"]
+
+    with open(harvest.PENDING_FILE, encoding="utf-8") as f:
+        pending = json.load(f)
+    assert [(n["url"], n["attempts"]) for n in pending] == [("https://cs.pku.edu.cn/3.htm", 1)]
+    # 连续失败 MAX_ATTEMPTS 次后出队
+    for _ in range(harvest.MAX_ATTEMPTS - 1):
+        harvest.harvest([], fetch_links, {})
+    assert harvest.load_pending() == []
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""流式链接/正文提取与分块抓取：编码识别、容器内链接、提前停止下载与大小上限"""
+
+import pytest
+
+import crawler
+from link_parser import LinkParser, TextParser, parse_container_spec, sniff_encoding
+
+LIST_PAGE = """<html><head><meta charset="gbk"><title>通知</title></head><body>
+<div id="nav"><a href="/">首页</a></div>
+<ul class="news list"><li><a href="/info/1.htm"><span>2025年</span> 夏令营通知</a></li>
+<li><ul><li><a href="/info/2.htm">预推免通知</a></li></ul></li></ul>
+<div id="footer"><a href="/about">关于我们</a></div>
+</body></html>"""
+
+
+def feed(parser, text, size=7):
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    parser.close()
+    return parser
+
+
+@pytest.mark.parametrize("head, content_type, expected", [
+    (b'<meta charset="gb2312">', "text/html; charset=utf-8", "gb18030"),
+    (b"<html>", "text/html; charset=GBK", "gb18030"),
+    ("<p>中文</p>".encode("utf-8"), "", "utf-8"),
+    ("<p>中文</p>".encode("gbk"), "", "gb18030"),
+    ("中文".encode("utf-8")[:-1], "", "utf-8"),
+    (b'<meta charset="bogus">', "", "utf-8"),
+])
+def test_sniff_encoding(head, content_type, expected):
+    assert sniff_encoding(head, content_type) == expected
+
+
+def test_container_spec():
+    assert parse_container_spec("ul.news") == ("ul", None, "news")
+    assert parse_container_spec("div#list") == ("div", "list", None)
+    with pytest.raises(ValueError):
+        parse_container_spec("div > a")
+
+
+def test_links_in_container_and_stop():
+    parser = feed(LinkParser("ul.news"), LIST_PAGE)
+    assert parser.found_container and parser.done
+    # 嵌套的同名元素不会提前结束容器
+    assert parser.links == [("2025年夏令营通知", "/info/1.htm"), ("预推免通知", "/info/2.htm")]
+
+
+def test_missing_container_falls_back_to_page_links():
+    parser = feed(LinkParser("div#list"), LIST_PAGE)
+    assert not parser.found_container
+    assert [href for _, href in parser.links] == ["/", "/info/1.htm", "/info/2.htm", "/about"]
+
+
+def test_text_parser():
+    page = ("<html><head><script>var a = 1;</script></head><body><nav><a href='/'>首页</a></nav>"
+            "<p>报名截止：<b>6月20日</b></p><div>材料见<a href='/f/表格.docx'>报名表</a>下载</div>"
+            "</body></html>")
+    lines = feed(TextParser(lambda href: href.endswith(".docx")), page).lines
+    assert lines == ["报名截止：6月20日", "材料见", "[附件] 报名表 /f/表格.docx", "下载"]
+
+
+class FakeResponse:
+    def __init__(self, body, content_type="text/html"):
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+        self.chunks_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            self.chunks_read += 1
+            yield self.body[i:i + size]
+
+
+@pytest.fixture
+def respond(monkeypatch):
+    holder = {}
+
+    def get(url, **kwargs):
+        assert kwargs.get("stream") is True
+        return holder["resp"]
+
+    def set_response(body, content_type="text/html"):
+        holder["resp"] = FakeResponse(body, content_type)
+        return holder["resp"]
+
+    monkeypatch.setattr(crawler.requests, "get", get)
+    monkeypatch.setattr(crawler, "PAGE_CHUNK_SIZE", 256)
+    return set_response
+
+
+def test_stream_decodes_across_chunks(respond):
+    respond(LIST_PAGE.encode("gbk") + b" " * 2000)
+    assert crawler.fetch_links("https://x.edu.cn/", "ul.news")[0] == ("2025年夏令营通知", "/info/1.htm")
+
+
+def test_stream_stops_after_container(respond):
+    resp = respond((LIST_PAGE + "<p>" + "无关内容" * 5000 + "</p>").encode("utf-8"))
+    crawler.fetch_links("https://x.edu.cn/", "ul.news")
+    total_chunks = -(-len(resp.body) // 256)
+    assert resp.chunks_read < total_chunks // 10
+
+
+def test_stream_byte_cap(respond, monkeypatch):
+    monkeypatch.setattr(crawler, "MAX_PAGE_BYTES", 8192)
+    resp = respond(("<a href='/x'>x</a>" * 10000).encode("utf-8"))
+    links = crawler.fetch_links("https://x.edu.cn/")
+    assert resp.chunks_read == 8192 // 256
+    assert 0 < len(links) < 10000
+
+
+def test_non_html_rejected(respond):
+    respond(b"%PDF-1.4", content_type="application/pdf")
+    with pytest.raises(crawler.PageRejected):
+        crawler.fetch_links("https://x.edu.cn/a.pdf")
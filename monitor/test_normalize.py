@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""抓取时的通知规范化：日期、过滤、学院分配、分类与 notices.jsonl 重建"""
+
+import json
+
+import pytest
+
+import normalize
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://cs.pku.edu.cn/info/2025/0601/1001.htm", "2025-06-01"),
+    ("https://example.edu.cn/news/20250315/a.htm", "2025-03-15"),
+    ("https://example.edu.cn/news/1001.htm", ""),
+])
+def test_extract_date_from_url(url, expected):
+    assert normalize.extract_date_from_url(url) == expected
+
+
+def test_extract_date_prefers_title():
+    assert normalize.extract_date("2024-05-20 夏令营通知", "https://x.edu.cn/2024/0601/a.htm") == (
+        "2024-05-20", "title")
+    assert normalize.extract_date("夏令营通知", "https://x.edu.cn/2024/0601/a.htm") == (
+        "2024-06-01", "url")
+    assert normalize.extract_date("2024年夏令营通知", "https://x.edu.cn/a.htm") == (
+        "2024-01-01", "title_year")
+
+
+def test_validate_date_rejects_out_of_range():
+    assert normalize.validate_date("2010-01-01") == ""
+    assert normalize.validate_date("2024-13-01") == ""
+    assert normalize.validate_date("2024-02-30") == ""
+    assert normalize.validate_date("2024-02-29") == "2024-02-29"
+
+
+def test_normalize_filters_and_classifies():
+    record = normalize.normalize_notice(
+        "2025年优秀大学生夏令营通知", "https://cs.pku.edu.cn/camp", "北京大学 - 计算机学院", "pku_cs")
+    assert record["category"] == "夏令营" and record["school_id"] == "pku_cs"
+    assert record["raw_title"] == "2025年优秀大学生夏令营通知"
+    assert set(normalize.NOTICE_FIELDS) <= set(record)
+    # 导航链接与标题过短的泛链接被过滤
+    nav = next(iter(normalize.NAV_LINK_TITLES))
+    assert normalize.normalize_notice(nav, "https://x.edu.cn/", "s", "pku_cs") is None
+    assert normalize.normalize_notice("更多", "https://x.edu.cn/", "s", "pku_cs") is None
+    excluded = normalize.EXCLUDE_KEYWORDS[0]
+    assert normalize.normalize_notice(f"2025年{excluded}通知", "https://x.edu.cn/", "s",
+                                      "pku_cs") is None
+
+
+def test_dispatch_source_assigned_by_title():
+    record = normalize.normalize_notice(
+        "2025年软件与微电子学院夏令营通知", "https://x.pku.edu.cn/a", "北京大学研招网",
+        "__pku_dispatch__")
+    assert record["school_id"] == "pku_ss"
+
+
+@pytest.mark.parametrize("title, category", [
+    ("2025年拟录取名单公示", "录取公示"),
+    ("2026年推荐免试研究生预报名", "预推免"),
+    ("2026年博士研究生招生简章", "招生简章"),
+    ("2026年直博生申请", "博士招生"),
+    ("学术讲座预告", "其他"),
+])
+def test_categorize_notice(title, category):
+    assert normalize.categorize_notice(title) == category
+
+
+def test_reprocess_writes_versioned_store(tmp_path):
+    registry = tmp_path / "schools.json"
+    registry.write_text(json.dumps({"schools": [
+        {"id": "pku_cs", "university": "北京大学", "sources": ["北京大学 - 计算机学院"]}]},
+        ensure_ascii=False), encoding="utf-8")
+    updates = tmp_path / "updates.md"
+    updates.write_text("## 2025-06-01 10:00:00 更新\n\n### 北京大学 - 计算机学院\n\n"
+                       "- [2025年夏令营通知](https://cs.pku.edu.cn/camp)\n"
+                       "- [首页](https://cs.pku.edu.cn/)\n", encoding="utf-8")
+    store = tmp_path / "notices.jsonl"
+    assert normalize.reprocess(str(updates), str(store), str(registry)) == 1
+    assert normalize.store_rules_version(str(store)) == normalize.RULES_VERSION
+    record = json.loads(store.read_text(encoding="utf-8").splitlines()[1])
+    assert record["first_seen"] == "2025-06-01 10:00:00"
+    assert record["school_id"] == "pku_cs"
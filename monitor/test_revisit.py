@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""revisit 的活跃通知选择、正文摘要比较、重访间隔、变化事件与详情正文记录"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import revisit
+
+URL = "https://cs.pku.edu.cn/info/1001.htm"
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    notices = tmp_path / "notices.jsonl"
+    record = {"title": "2025年夏令营通知", "url": URL, "date": "2025-06-01",
+              "source": "北京大学 - 计算机学院", "school_id": "pku_cs", "category": "夏令营",
+              "first_seen": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    notices.write_text(json.dumps(record, ensure_ascii=False) + "\n", encoding="utf-8")
+    monkeypatch.setattr(revisit, "NOTICES_FILE", str(notices))
+    monkeypatch.setattr(revisit, "REVISIT_DB", str(tmp_path / "revisit.sqlite3"))
+    monkeypatch.setattr(revisit, "UPDATES_LOG", str(tmp_path / "notice_updates.jsonl"))
+    monkeypatch.setattr(revisit, "DETAILS_LOG", str(tmp_path / "notice_details.jsonl"))
+    return tmp_path
+
+
+def read_jsonl(path):
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def make_due(tmp_path):
+    with sqlite3.connect(tmp_path / "revisit.sqlite3") as conn:
+        conn.execute("UPDATE pages SET next_check = 0")
+
+
+def test_details_written_on_first_visit_and_change(paths):
+    page = ["报名截止：6月20日", "需提交成绩单"]
+    revisit.revisit(lambda url: page)
+    details = read_jsonl(paths / "notice_details.jsonl")
+    assert details == [{"url": URL, "text": "报名截止：6月20日\n需提交成绩单"}]
+
+    # 内容不变：不重复写入
+    make_due(paths)
+    revisit.revisit(lambda url: page)
+    assert len(read_jsonl(paths / "notice_details.jsonl")) == 1
+
+    make_due(paths)
+    revisit.revisit(lambda url: ["报名截止：6月30日", "需提交成绩单"])
+    details = read_jsonl(paths / "notice_details.jsonl")
+    assert len(details) == 2
+    assert details[-1]["text"].startswith("报名截止：6月30日")
+
+
+def test_details_backfilled_when_log_missing(paths):
+    revisit.revisit(lambda url: ["正文"])
+    (paths / "notice_details.jsonl").unlink()
+    # 无到期页面，仍补写已保存的正文
+    revisit.revisit(lambda url: pytest.fail("不应重访"))
+    assert read_jsonl(paths / "notice_details.jsonl") == [{"url": URL, "text": "正文"}]
+
+
+def test_detail_text_capped(paths):
+    revisit.revisit(lambda url: ["长" * (revisit.DETAIL_TEXT_CHARS + 100)])
+    text = read_jsonl(paths / "notice_details.jsonl")[0]["text"]
+    assert len(text) == revisit.DETAIL_TEXT_CHARS
+
+
+def notice(url, days_ago, category="预推免"):
+    first_seen = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+    return {"title": f"通知 {url}", "url": url, "date": "", "source": "北京大学 - 计算机学院",
+            "school_id": "pku_cs", "category": category, "first_seen": first_seen}
+
+
+def test_live_notices_selection(tmp_path):
+    store = tmp_path / "notices.jsonl"
+    lines = [json.dumps({"_meta": {"rules_version": 1}}),
+             json.dumps(notice("https://a/recent", 3)),
+             json.dumps(notice("https://a/old", 60)),
+             json.dumps(notice("https://a/old-camp", 60, category="夏令营")),
+             json.dumps(notice("https://a/ancient-camp", 400, category="夏令营")),
+             json.dumps(notice("https://a/form.pdf", 1)),
+             '{"title": "写了一半']
+    store.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert set(revisit.live_notices(datetime.now(), str(store))) == {
+        "https://a/recent", "https://a/old-camp"}
+
+
+def test_noise_ignored_and_interval_backs_off(paths):
+    revisit.revisit(lambda url: ["报名截止：6月20日", "浏览次数：12"])
+    first = sqlite3.connect(paths / "revisit.sqlite3").execute(
+        "SELECT interval FROM pages").fetchone()[0]
+    make_due(paths)
+    assert revisit.revisit(lambda url: ["报名截止：6月20日", "浏览次数：98"]) == []
+    with sqlite3.connect(paths / "revisit.sqlite3") as conn:
+        assert conn.execute("SELECT interval FROM pages").fetchone()[0] == first * 2
+
+
+def test_change_emits_event_with_summary(paths):
+    assert revisit.revisit(lambda url: ["报名截止：6月20日", "需提交成绩单"]) == []
+    make_due(paths)
+    events = revisit.revisit(lambda url: ["报名截止：6月30日", "需提交成绩单", "新增附件"])
+    assert len(events) == 1
+    summary = events[0]["summary"]
+    assert (summary["added"], summary["removed"]) == (2, 1)
+    assert "- 报名截止：6月20日" in summary["preview"] and "+ 新增附件" in summary["preview"]
+    assert read_jsonl(paths / "notice_updates.jsonl")[0]["url"] == URL
+    with sqlite3.connect(paths / "revisit.sqlite3") as conn:
+        interval, changes = conn.execute("SELECT interval, changes FROM pages").fetchone()
+    assert interval == revisit.MIN_INTERVAL and changes == 1
+
+
+def test_fetch_failure_postpones(paths):
+    def fail(url):
+        raise OSError("连接超时")
+
+    assert revisit.revisit(fail) == []
+    with sqlite3.connect(paths / "revisit.sqlite3") as conn:
+        digest, next_check = conn.execute("SELECT digest, next_check FROM pages").fetchone()
+    assert digest is None and next_check > 0
+    # 未到期，不再重访
+    assert revisit.revisit(lambda url: pytest.fail("不应重访")) == []
+
+
+def test_budget_limits_visits(paths):
+    records = [notice(f"https://cs.pku.edu.cn/info/{i}.htm", 1) for i in range(5)]
+    (paths / "notices.jsonl").write_text(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+    visited = []
+    revisit.revisit(lambda url: visited.append(url) or ["正文"], budget=2)
+    assert len(visited) == 2
+    revisit.revisit(lambda url: visited.append(url) or ["正文"], budget=10)
+    assert len(set(visited)) == 5
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""seen_store 的持久化、过期压缩与 ID 重算"""
+
+import json
+import time
+
+import pytest
+
+from seen_store import SeenStore
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "seen.sqlite3"), str(tmp_path / "seen.bloom")
+
+
+def entry(title, url, first_seen="2025-06-01 08:00:00"):
+    return {"title": title, "url": url, "school": "北京大学", "department": "计算机学院",
+            "first_seen": first_seen}
+
+
+def test_add_save_and_reopen(paths):
+    store = SeenStore(*paths)
+    store.add("a", entry("通知A", "https://a.edu.cn/1"))
+    store.add("a", entry("通知A", "https://a.edu.cn/1"))
+    store.save()
+    store.close()
+
+    store = SeenStore(*paths)
+    assert "a" in store
+    assert "b" not in store
+    assert len(store) == 1
+    store.close()
+
+
+def test_unsaved_filter_rebuilt_from_database(paths):
+    store = SeenStore(*paths)
+    store.add("a", entry("通知A", "https://a.edu.cn/1"))
+    store.save()
+    store.add("b", entry("通知B", "https://a.edu.cn/2"))
+    # 模拟提交后、写过滤器前中断：库的代数已前进，过滤器文件仍是旧的
+    store._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+    store._conn.commit()
+    store.close()
+
+    store = SeenStore(*paths)
+    assert "a" in store and "b" in store
+    store.close()
+
+
+def test_compact_keeps_tombstones(paths):
+    store = SeenStore(*paths)
+    store.add("old", entry("旧通知", "https://a.edu.cn/old"))
+    store.add("new", entry("新通知", "https://a.edu.cn/new"))
+    store.save()
+    store._conn.execute("UPDATE seen SET last_seen = ? WHERE id = 'old'",
+                        (time.time() - 100 * 86400,))
+    store._conn.commit()
+
+    assert store.compact(ttl_days=30) == 1
+    assert len(store) == 1
+    assert "old" in store and "new" in store
+    store.close()
+
+    store = SeenStore(*paths)
+    assert "old" in store
+    # 重新出现的墓碑条目恢复为完整记录
+    store.add("old", entry("旧通知", "https://a.edu.cn/old"))
+    store.save()
+    assert len(store) == 2
+    assert store.compact(ttl_days=30) == 0
+    store.close()
+
+
+def test_touch_defers_compaction(paths):
+    store = SeenStore(*paths)
+    store.add("a", entry("通知A", "https://a.edu.cn/1"))
+    store.save()
+    store._conn.execute("UPDATE seen SET last_seen = 0")
+    store.touch(["a"])
+    store.save()
+    assert store.compact(ttl_days=30) == 0
+    store.close()
+
+
+def make_id(title, url):
+    return f"{title}|{url.replace('http://', 'https://')}"
+
+
+def test_rekey_merges_duplicates(paths):
+    store = SeenStore(*paths)
+    store.add("legacy-1", entry("通知A", "http://a.edu.cn/1", "2025-06-02 08:00:00"))
+    store.add("legacy-2", entry("通知A", "https://a.edu.cn/1", "2025-06-01 08:00:00"))
+    store.add("legacy-3", entry("通知B", "https://a.edu.cn/2"))
+    store.add("tombstone-like", {"title": None, "url": None})
+    store.save()
+    assert store.id_version() is None
+
+    assert store.rekey(make_id, 2) == 1
+    assert store.id_version() == 2
+    assert len(store) == 3
+    merged = make_id("通知A", "https://a.edu.cn/1")
+    assert merged in store and "legacy-1" not in store and "legacy-2" not in store
+    assert "tombstone-like" in store
+    first_seen = store._conn.execute(
+        "SELECT first_seen FROM seen WHERE id = ?", (merged,)).fetchone()[0]
+    assert first_seen == "2025-06-01 08:00:00"
+
+    # 幂等
+    assert store.rekey(make_id, 2) == 0
+    assert len(store) == 3
+    store.close()
+
+
+def test_migrate_from_json_once(paths, tmp_path):
+    legacy = tmp_path / "seen_items.json"
+    legacy.write_text(json.dumps({"x": entry("通知X", "https://a.edu.cn/x")}), encoding="utf-8")
+    store = SeenStore(*paths, migrate_from=str(legacy))
+    assert "x" in store
+    store.close()
+
+    legacy.write_text(json.dumps({"y": entry("通知Y", "https://a.edu.cn/y")}), encoding="utf-8")
+    store = SeenStore(*paths, migrate_from=str(legacy))
+    assert "y" not in store
+    store.close()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""监控目标的筛选：学校 id 经注册表解析（含综合来源），以及模块的无副作用导入"""
+
+import json
+import os
+import subprocess
+import sys
+
+from targets import MONITOR_TARGETS, select_targets
+
+
+def sources(targets):
+    return [f"{t['school']} - {t['department']}" for t in targets]
+
+
+def test_select_by_school_id_includes_dispatch_sources():
+    assert sources(select_targets(MONITOR_TARGETS, ["pku_cs"])) == [
+        "北京大学 - 计算机学院", "北京大学 - 夏令营统一页"]
+    both = select_targets(MONITOR_TARGETS, ["pku_cs", "pku_ss"])
+    assert "北京大学 - 软微学院" in sources(both) and len(both) == 3
+    assert select_targets(MONITOR_TARGETS, ["fudan"]) == []
+    assert select_targets(MONITOR_TARGETS, ["no_such_school"]) == []
+
+
+def test_options_intersect():
+    assert sources(select_targets(MONITOR_TARGETS, schools=["清华大学"], departments=["计算机"])) == [
+        "清华大学 - 计算机系通知", "清华大学 - 计算机系招生"]
+    assert select_targets(MONITOR_TARGETS, ["pku_cs"], schools=["清华大学"]) == []
+    assert select_targets(MONITOR_TARGETS) == MONITOR_TARGETS
+
+
+def test_registry_path(tmp_path):
+    registry = tmp_path / "schools.json"
+    registry.write_text(json.dumps({"schools": [
+        {"id": "fudan", "university": "复旦大学", "sources": ["北京大学 - 计算机学院"]}]},
+        ensure_ascii=False), encoding="utf-8")
+    assert sources(select_targets(MONITOR_TARGETS, ["fudan"], registry_path=str(registry))) == [
+        "北京大学 - 计算机学院"]
+
+
+def test_import_has_no_crawler_dependencies():
+    # webapp 在请求中导入本模块，不能带入 requests（及爬虫的自动安装）
+    code = "import sys, targets; print('requests' in sys.modules or 'crawler' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(__file__),
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "False"
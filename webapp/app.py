@@ -6,106 +6,149 @@ Flask 后端：解析 markdown 数据，提供 JSON API
 """
 
 import os
-import re
 import json
+import logging
+import mimetypes
+import pickle
 import subprocess
 import sys
-from datetime import datetime
-from flask import Flask, render_template, jsonify, send_from_directory
+import threading
+import unicodedata
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+from flask import Flask, Response, render_template, jsonify, send_from_directory, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import is_resource_modified
+
+from events import ChangeLog
+from file_index import FileIndex
+from notice_index import NoticeIndex, SORT_ORDERS
+from notice_record import Notice
+from profiling import Profiler
+from registry import load_registry, parse_links_md
+from serializer import Serializer
+from shared_cache import SharedCache, make_version
+from snapshot import MaterializedView
+from state_store import StateStore, KIND_STATUS, KIND_DEADLINE, KIND_NOTE
+from warm_start import SNAPSHOT_FORMAT, WarmStart
+from watcher import InputWatcher, stat_fingerprint, tree_fingerprint
+
+# 通知规范化规则、监控目标与爬虫共用（monitor/normalize.py、monitor/targets.py）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "monitor"))
+from normalize import NOTICE_FIELDS, parse_update_lines  # noqa: E402
+from targets import MONITOR_TARGETS, select_targets  # noqa: E402
 
 app = Flask(__name__)
 
 # ========== 路径配置 ==========
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 数据根目录（院校文件夹、updates.md 等所在位置），可用 CAMP_BASE_DIR 指向其他目录（如基准测试数据）
+BASE_DIR = os.environ.get("CAMP_BASE_DIR") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SCHOOLS_MD = os.path.join(BASE_DIR, "院校网址汇总.md")
 UPDATES_MD = os.path.join(BASE_DIR, "monitor", "updates.md")
+# 爬虫写入的规范化通知；不存在时退回解析 updates.md
+NOTICES_STORE = os.path.join(BASE_DIR, "monitor", "notices.jsonl")
 CRAWLER_PY = os.path.join(BASE_DIR, "monitor", "crawler.py")
-RESUME_PATH = os.path.join(BASE_DIR, "个人资料", "简历.pdf")
+# 爬虫重访阶段发现的通知内容变化（每行一条）
+NOTICE_UPDATES_LOG = os.path.join(BASE_DIR, "monitor", "notice_updates.jsonl")
+# 爬虫重访得到的通知详情正文（每行一条，同一链接以最后一条为准），用于全文检索
+NOTICE_DETAILS_LOG = os.path.join(BASE_DIR, "monitor", "notice_details.jsonl")
+# 院校注册表（可用 CAMP_SCHOOLS_JSON 指定其他文件）
+SCHOOLS_REGISTRY = os.environ.get("CAMP_SCHOOLS_JSON") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "schools.json")
+PROFILE_FOLDER = "个人资料"
+RESUME_PATH = os.path.join(BASE_DIR, PROFILE_FOLDER, "简历.pdf")
+FILE_INDEX_DB = os.path.join(BASE_DIR, "webapp", ".cache", "file_index.sqlite3")
+STATE_DB = os.path.join(BASE_DIR, "webapp", "state.sqlite3")
+# 热启动快照：重启后先用上次的计算结果响应，再在后台比对输入、按需重建（CAMP_WARM_START=0 关闭）
+WARM_START_PATH = os.path.join(BASE_DIR, "webapp", ".cache", "warm_start.pickle")
+WARM_START_ENABLED = os.environ.get("CAMP_WARM_START", "1") != "0"
+# 旧版的 JSON 状态文件，首次启动时自动导入 STATE_DB
 STATUS_FILE = os.path.join(BASE_DIR, "webapp", "school_status.json")
 DEADLINE_FILE = os.path.join(BASE_DIR, "webapp", "school_deadlines.json")
 
+# 输入文件轮询间隔（秒）
+WATCH_INTERVAL = float(os.environ.get("CAMP_WATCH_INTERVAL", "2"))
+# 推送流的心跳间隔（秒）
+STREAM_KEEPALIVE = 15
+# 每个进程同时保持的推送流上限：每条推送流占用一个服务线程，超出的客户端改用 /api/changes 轮询
+# （serve.py 按每 worker 线程数的一半设置）
+MAX_STREAMS = int(os.environ.get("CAMP_MAX_STREAMS", "4"))
+# /api/changes 单次返回的最多变更数
+CHANGES_LIMIT = 500
+# 内存中保留的最近通知更新条数
+NOTICE_UPDATES_KEEP = 200
+# 跨进程共享缓存（SQLite 文件路径），多 worker 部署时由 serve.py 设置，为空则不启用
+SHARED_CACHE_PATH = os.environ.get("CAMP_SHARED_CACHE", "")
+# 请求性能剖析（CAMP_PROFILE=1 开启），慢请求阈值（毫秒）与 cProfile 采样比例
+PROFILE_ENABLED = os.environ.get("CAMP_PROFILE", "") == "1"
+PROFILE_SLOW_MS = float(os.environ.get("CAMP_PROFILE_SLOW_MS", "200"))
+PROFILE_SAMPLE_RATE = float(os.environ.get("CAMP_PROFILE_SAMPLE", "0.1"))
+
+profiler = Profiler(enabled=PROFILE_ENABLED, slow_ms=PROFILE_SLOW_MS,
+                    sample_rate=PROFILE_SAMPLE_RATE)
+
+
+def _json_default(obj):
+    """通知在内存中为紧凑的 Notice 对象，序列化时才转换为字典"""
+    if isinstance(obj, Notice):
+        return obj.to_dict()
+    return DefaultJSONProvider.default(obj)
+
+
+class _ProfiledJSONProvider(DefaultJSONProvider):
+    """
+    经可插拔的序列化后端（见 serializer.py，默认 orjson）输出 UTF-8 紧凑 JSON，
+    计入 serialize 阶段（jsonify 与预序列化的看板都经过这里）
+    """
+
+    default = staticmethod(_json_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.serializer = Serializer(_json_default)
+
+    def dumps_bytes(self, obj):
+        with profiler.phase("serialize"):
+            return self.serializer.dumps(obj)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {"separators"}:
+            # 指定了缩进等格式参数时按标准库处理
+            with profiler.phase("serialize"):
+                return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+app.json = _ProfiledJSONProvider(app)
+
 # 可选的状态列表
 AVAILABLE_STATUSES = [
     "未开始", "准备中", "已套磁", "材料准备中", "材料已提交",
     "已入营", "已获offer", "已放弃", "待定"
 ]
 
+# 院校注册表：学校信息、文件夹、章节名与来源名的映射（见 schools.json）
+_registry = load_registry(SCHOOLS_REGISTRY)
+
 # 学校文件夹映射 (id -> 文件夹名)
-SCHOOL_FOLDERS = {
-    "sjtu_ai": "上交AI",
-    "sjtu_cs": "上交计算机",
-    "cas_auto": "中科院自动化所",
-    "cas_ict": "中科院计算所",
-    "pku_ai": "北大智能",
-    "pku_cs": "北大计算机",
-    "pku_ss": "北大软微",
-    "nju_is": "南大智科",
-    "nju_cs": "南大计算机",
-    "zju_cs": "浙大计算机",
-    "thu_ee": "清华电子",
-    "thu_auto": "清华自动化",
-    "thu_cs": "清华计算机",
-    "thu_sz": "清华深圳",
-    "fudan": "复旦",
-    "ruc_ai": "人大高瓴",
-}
+SCHOOL_FOLDERS = _registry["folders"]
 
 # 学校信息 (id -> 完整信息)
-SCHOOL_INFO = {
-    "sjtu_ai": {"university": "上海交通大学", "department": "人工智能学院", "short": "上交AI"},
-    "sjtu_cs": {"university": "上海交通大学", "department": "计算机学院", "short": "上交计算机"},
-    "cas_auto": {"university": "中国科学院", "department": "自动化研究所", "short": "中科院自动化所"},
-    "cas_ict": {"university": "中国科学院", "department": "计算技术研究所", "short": "中科院计算所"},
-    "pku_ai": {"university": "北京大学", "department": "智能学院", "short": "北大智能"},
-    "pku_cs": {"university": "北京大学", "department": "计算机学院", "short": "北大计算机"},
-    "pku_ss": {"university": "北京大学", "department": "软件与微电子学院", "short": "北大软微"},
-    "nju_is": {"university": "南京大学", "department": "智能科学与技术学院", "short": "南大智科"},
-    "nju_cs": {"university": "南京大学", "department": "计算机学院", "short": "南大计算机"},
-    "zju_cs": {"university": "浙江大学", "department": "计算机科学与技术学院", "short": "浙大计算机"},
-    "thu_ee": {"university": "清华大学", "department": "电子工程系", "short": "清华电子"},
-    "thu_auto": {"university": "清华大学", "department": "自动化系", "short": "清华自动化"},
-    "thu_cs": {"university": "清华大学", "department": "计算机科学与技术系", "short": "清华计算机"},
-    "thu_sz": {"university": "清华大学", "department": "深圳国际研究生院", "short": "清华深圳"},
-    "fudan": {"university": "复旦大学", "department": "计算机学院", "short": "复旦"},
-    "ruc_ai": {"university": "中国人民大学", "department": "高瓴人工智能学院", "short": "人大高瓴"},
-}
+SCHOOL_INFO = _registry["info"]
 
-# 学校到 id 的模糊映射 (updates.md 中的名称 -> school_id)
-# 排除关键词（与 crawler.py 保持一致，用于过滤已抓取的历史通知）
-EXCLUDE_KEYWORDS = [
-    "港澳台", "港澳", "台湾地区", "留学生", "国际学生", "来华留学",
-    "网报公告", "网上确认", "初试科目", "考场安排", "条形码", "考点公告",
-    "准考证", "复试分数线", "调剂",
-    "医学院", "护理", "口腔", "药学", "公共卫生",
-    "体育系", "体育学", "法学院", "法律硕士", "法律学",
-    "农业与生物", "设计学院", "物流工程", "能源学院",
-    "MBA", "EMBA", "MPA", "MEM", "MTT",
-    "宣传手册", "宣传册", "招生手册",
-]
+# 院校网址汇总.md 章节名 -> school_id
+SCHOOL_SECTION_MAP = _registry["sections"]
 
-SCHOOL_NAME_MAP = {
-    "上海交通大学 - AI学院": "sjtu_ai",
-    "上海交通大学 - 计算机学院": "sjtu_cs",
-    "上海交通大学 - 研究生招生网": "__sjtu_dispatch__",  # 按标题内容分配
-    "中科院 - 自动化所通知": "cas_auto",
-    "中科院 - 自动化所硕士招生": "cas_auto",
-    "中科院 - 计算所通知": "cas_ict",
-    "中科院 - 计算所招生": "cas_ict",
-    "北京大学 - 智能学院": "pku_ai",
-    "北京大学 - 计算机学院": "pku_cs",
-    "北京大学 - 软微学院": "pku_ss",
-    "北京大学 - 夏令营统一页": "__pku_dispatch__",  # 按标题内容分配
-    "南京大学 - 智科院": "nju_is",
-    "南京大学 - 计算机学院夏令营": "nju_cs",
-    "浙江大学 - 计算机学院通知": "zju_cs",
-    "浙江大学 - 计算机学院招生": "zju_cs",
-    "清华大学 - 电子系动态": "thu_ee",
-    "清华大学 - 自动化系通知": "thu_auto",
-    "清华大学 - 自动化系研招": "thu_auto",
-    "清华大学 - 计算机系通知": "thu_cs",
-    "清华大学 - 计算机系招生": "thu_cs",
-    "清华大学 - 夏令营统一页": "__thu_dispatch__",  # 按标题内容分配
-}
+# 导师子目录中套磁/回复相关文件的关键词（小写匹配）
+PROF_FILE_KEYWORDS = ["陶瓷", "套词", "套磁", "reply", "回复"]
+
+# 学校到 id 的映射 (updates.md 中的来源名 -> school_id，综合来源为分配键)
+SCHOOL_NAME_MAP = _registry["sources"]
 
 
 # ========== 数据解析 ==========
@@ -114,206 +157,20 @@ def parse_schools_md():
     """解析院校网址汇总.md，提取每个学校的链接"""
     if not os.path.exists(SCHOOLS_MD):
         return {}
+    return parse_links_md(SCHOOLS_MD, SCHOOL_SECTION_MAP)
 
-    with open(SCHOOLS_MD, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    schools = {}
-    # 按 ## 数字. 学校名 分割
-    sections = re.split(r'\n## \d+\.\s+', content)
-
-    for section in sections[1:]:  # 跳过第一段（标题部分）
-        lines = section.strip().split("\n")
-        school_name = lines[0].strip()
 
-        links = []
-        for line in lines[1:]:
-            # 匹配 - **标签**: URL 或 - **标签**: [文本](URL) 格式
-            m = re.match(r'-\s+\*\*(.+?)\*\*:\s*(https?://\S+)', line)
-            if m:
-                links.append({"label": m.group(1), "url": m.group(2)})
-            else:
-                # 匹配  - 另一入口: URL 格式
-                m2 = re.match(r'\s+-\s+(.+?):\s*(https?://\S+)', line)
-                if m2:
-                    links.append({"label": m2.group(1).strip(), "url": m2.group(2)})
-
-        # 精确映射表（优先级最高）
-        name_to_id = {
-            "上海交通大学 人工智能学院": "sjtu_ai",
-            "上海交通大学 计算机科学与工程系（现计算机学院）": "sjtu_cs",
-            "中国科学院 自动化研究所": "cas_auto",
-            "中国科学院 计算技术研究所": "cas_ict",
-            "北京大学 智能学院": "pku_ai",
-            "北京大学 计算机学院": "pku_cs",
-            "北京大学 软件与微电子学院": "pku_ss",
-            "南京大学 智能科学与技术学院": "nju_is",
-            "南京大学 计算机科学与技术系（现计算机学院）": "nju_cs",
-            "浙江大学 计算机科学与技术学院": "zju_cs",
-            "清华大学 电子工程系": "thu_ee",
-            "清华大学 自动化系": "thu_auto",
-            "清华大学 计算机科学与技术系": "thu_cs",
-        }
-        school_id = name_to_id.get(school_name)
-
-        if school_id:
-            schools[school_id] = links
-
-    return schools
-
-
-def _extract_date_from_url(url):
-    """从 URL 中提取日期，支持多种高校 URL 格式"""
-    # 中科院格式: /202510/t20251016_xxx.html → 2025-10-16
-    m = re.search(r'/(\d{4})(\d{2})/t(\d{4})(\d{2})(\d{2})_', url)
-    if m:
-        return f"{m.group(3)}-{m.group(4)}-{m.group(5)}"
-    # 部分高校: /2026/0209/ → 2026-02-09
-    m = re.search(r'/(\d{4})/(\d{2})(\d{2})/', url)
-    if m:
-        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
-    # 中科院 PDF: /202602/P020260205xxx.pdf → 2026-02-05
-    m = re.search(r'/(\d{4})(\d{2})/P\d{3}(\d{4})(\d{2})(\d{2})', url)
-    if m:
-        return f"{m.group(3)}-{m.group(4)}-{m.group(5)}"
-    # 南大格式: /xx/xx/c57656aXXXXXX/page.htm — 无日期但可从标题年份推断
-    # 清华电子/自动化等: /info/1078/4801.htm — 无直接日期
-    # 清华/南大/浙大等: /2025/0528/cXXaXXX/page.htm
-    m = re.search(r'/(\d{4})/(\d{2})(\d{2})/c\d+a\d+/', url)
-    if m:
-        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
-    # 南大 yzb 格式: /e4/af/c47868a713903/page.htm — 无日期
-    # 中科院月份目录: /202510/ (无日)
-    m = re.search(r'/(\d{4})(\d{2})/c\d+a\d+/', url)
-    if m:
-        return f"{m.group(1)}-{m.group(2)}-01"
-    # 通用: URL 路径中的 YYYYMMDD
-    m = re.search(r'/(\d{4})(\d{2})(\d{2})/', url)
-    if m:
-        y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        if 2015 <= y <= 2030 and 1 <= mo <= 12 and 1 <= d <= 31:
-            return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
-    return ""
-
-
-def _extract_date_from_title(title):
-    """从标题文本中提取日期"""
-    chinese_months = {
-        '一月': '01', '二月': '02', '三月': '03', '四月': '04',
-        '五月': '05', '六月': '06', '七月': '07', '八月': '08',
-        '九月': '09', '十月': '10', '十一月': '11', '十二月': '12',
-    }
+# 院校链接缓存：院校网址汇总.md 未变化时不再重新解析
+_school_links = {"fp": None, "links": {}}
 
-    patterns = [
-        # 2025-06-13
-        (r'(\d{4})-(\d{2})-(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
-        # 202602/09
-        (r'^(\d{4})(\d{2})/(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
-        # 清华自动化格式: "302025-05" → 2025-05-30
-        (r'^(\d{2})(\d{4})-(\d{2})', lambda m: f"{m.group(2)}-{m.group(3)}-{m.group(1)}"),
-        # 2025.12.25
-        (r'(\d{4})\.(\d{2})\.(\d{2})', lambda m: f"{m.group(1)}-{m.group(2)}-{m.group(3)}"),
-        # DD2025.MM (如 "152025.12" → 2025-12-15)
-        (r'^(\d{2})(\d{4})\.(\d{2})', lambda m: f"{m.group(2)}-{m.group(3)}-{m.group(1)}"),
-        # MM.DD/YYYY
-        (r'^(\d{2})\.(\d{2})/(\d{4})', lambda m: f"{m.group(3)}-{m.group(1)}-{m.group(2)}"),
-        # "Feb 10, 2026" 英文日期
-        (r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),?\s+(\d{4})',
-         lambda m: "{}-{}-{}".format(m.group(3), dict(Jan='01',Feb='02',Mar='03',Apr='04',May='05',Jun='06',Jul='07',Aug='08',Sep='09',Oct='10',Nov='11',Dec='12')[m.group(1)], m.group(2).zfill(2))),
-        # "2025年6月13日" or "2025年06月"
-        (r'(\d{4})年(\d{1,2})月(\d{1,2})日?', lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)}"),
-        (r'(\d{4})年(\d{1,2})月', lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-01"),
-    ]
-
-    for pattern, formatter in patterns:
-        dm = re.search(pattern, title)
-        if dm:
-            return formatter(dm)
-
-    # 中文月份: "19八月" "06九月"
-    dm = re.match(r'(\d{2})([\u4e00-\u9fff]+月)', title)
-    if dm and dm.group(2) in chinese_months:
-        day = dm.group(1)
-        month = chinese_months[dm.group(2)]
-        # 从标题中提取年份
-        ym = re.search(r'(\d{4})年', title)
-        year = ym.group(1) if ym else "2025"
-        return f"{year}-{month}-{day}"
-
-    return ""
-
-
-def _validate_date(date_str):
-    """验证日期字符串的合法性，修正未来日期"""
-    if not date_str:
-        return ""
-    try:
-        from datetime import date as dt_date
-        parts = date_str.split('-')
-        y, m, d = int(parts[0]), int(parts[1]), int(parts[2])
-        if not (2015 <= y <= 2030 and 1 <= m <= 12 and 1 <= d <= 31):
-            return ""
-        # 如果日期在未来，年份减1（标题里的年份通常是招生年份而非发布年份）
-        today = dt_date.today()
-        try:
-            parsed = dt_date(y, m, d)
-        except ValueError:
-            return ""
-        if parsed > today:
-            y -= 1
-            try:
-                parsed = dt_date(y, m, d)
-            except ValueError:
-                return ""
-            return f"{y:04d}-{m:02d}-{d:02d}"
-        return date_str
-    except (ValueError, IndexError):
-        pass
-    return ""
-
-
-# 过短的导航链接（非真正通知）
-NAV_LINK_TITLES = {
-    "招生工作", "硕士招生", "博士招生", "招生信息", "留学生招生",
-    "招生简章", "硕士生招生", "招生培养", "招生办公室",
-    "夏令营报名", "预推免报名", "夏令营公示", "预推免公示",
-    "夏令营考生登录", "预推免考生登录", "博士招生公示", "院系招生公示",
-    "研究生招生", "人才培养", "中国研究生招生信息网",
-    "研究生招生管理信息系统", "招生综合信息平台", "招生信息Admissions",
-}
 
-
-def _dispatch_school_id(dispatch_key, title):
-    """对综合来源（研招网、夏令营统一页），根据标题内容分配到具体学院"""
-    title_lower = title.lower()
-
-    if dispatch_key == "__sjtu_dispatch__":
-        if "计算机" in title:
-            return "sjtu_cs"
-        if "人工智能" in title or "AI" in title_lower or "SAI" in title:
-            return "sjtu_ai"
-        # 默认两边都给（归到 sjtu_ai 作为兜底，但也复制到 sjtu_cs）
-        return "sjtu_ai"
-
-    if dispatch_key == "__pku_dispatch__":
-        if "计算机" in title:
-            return "pku_cs"
-        if "智能" in title:
-            return "pku_ai"
-        if "软件" in title or "软微" in title:
-            return "pku_ss"
-        return "pku_cs"
-
-    if dispatch_key == "__thu_dispatch__":
-        if "计算机" in title:
-            return "thu_cs"
-        if "电子" in title:
-            return "thu_ee"
-        if "自动化" in title:
-            return "thu_auto"
-        return "thu_cs"
-
-    return None
+def get_school_links():
+    """{学校 id: 链接列表}，按文件指纹缓存"""
+    fp = stat_fingerprint(SCHOOLS_MD)
+    if fp is None or fp != _school_links["fp"]:
+        with profiler.phase("parse_schools_md"):
+            _school_links.update(fp=fp, links=parse_schools_md())
+    return _school_links["links"]
 
 
 def parse_updates_md():
@@ -324,92 +181,228 @@ def parse_updates_md():
     with open(UPDATES_MD, "r", encoding="utf-8") as f:
         content = f.read()
 
+    notices, _ = _parse_update_lines(content.split("\n"))
+    return notices
+
+
+def _parse_update_lines(lines, current_source=None):
+    """
+    解析 updates.md 的若干行（规范化规则见 monitor/normalize.py）。
+    返回 (通知列表, 最后所在的来源)，后者用于追加内容的增量解析续接。
+    """
+    records, current_source = parse_update_lines(lines, SCHOOL_NAME_MAP, current_source)
+    return [Notice.from_record(r) for r in records], current_source
+
+
+def _parse_store_lines(lines):
+    """
+    解析 notices.jsonl 的若干行：记录已在抓取时规范化，这里只做 JSON 解码。
+    损坏的行（如爬虫写入中途被终止）跳过并记录警告
+    """
     notices = []
-    current_source = None
-    current_school_id = None
-
-    for line in content.split("\n"):
-        line = line.strip()
-
-        # 匹配 ### 学校 - 部门
-        if line.startswith("### "):
-            current_source = line[4:].strip()
-            current_school_id = SCHOOL_NAME_MAP.get(current_source)
-
-        # 匹配 - [标题](链接)
-        m = re.match(r'-\s+\[(.+?)\]\((.+?)\)', line)
-        if m and current_source:
-            title = m.group(1)
-            url = m.group(2)
-
-            # 对综合来源，按标题内容分配到具体学院
-            notice_school_id = current_school_id
-            if current_school_id and current_school_id.startswith("__"):
-                notice_school_id = _dispatch_school_id(current_school_id, title)
-
-            # 过滤不相关通知
-            if any(kw in title for kw in EXCLUDE_KEYWORDS):
+    skipped = 0
+    for line in lines:
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if "_meta" in record:
                 continue
+            notices.append(Notice.from_record(record))
+        except (ValueError, TypeError, KeyError):
+            skipped += 1
+    if skipped:
+        logging.warning("%s 有 %d 行无法解析，已跳过", NOTICES_STORE, skipped)
+    return notices
 
-            # 过滤导航链接
-            if title.strip() in NAV_LINK_TITLES:
-                continue
 
-            # 过滤标题过短的泛链接（<=6字且不含年份）
-            if len(title.strip()) <= 6 and not re.search(r'\d{4}', title):
-                continue
+# 变更事件（新通知、学校状态/截止日期等变化），供推送流续传
+change_log = ChangeLog()
 
-            # 提取日期：先从标题提取，再从 URL 提取，最后从标题年份兜底
-            date_str = _extract_date_from_title(title)
-            if not date_str:
-                date_str = _extract_date_from_url(url)
-            if not date_str:
-                # 兜底：从标题提取年份，如 "2026年" "2025年" "(2025)" "2026级"
-                ym = re.search(r'(202[4-9])(?:年|级|\)）)', title)
-                if not ym:
-                    ym = re.search(r'\(?(202[4-9])\)?', title)
-                if ym:
-                    date_str = f"{ym.group(1)}-01-01"
-            date_str = _validate_date(date_str)
-
-            # 清理标题
-            clean_title = title
-            clean_title = re.sub(r'^\d{6}/\d{2}', '', clean_title).strip()
-            clean_title = re.sub(r'^\d{2}\d{4}\.\d{2}', '', clean_title).strip()
-            clean_title = re.sub(r'^\d{4}\.\d{2}\.\d{2}', '', clean_title).strip()
-            clean_title = re.sub(r'^\d{2}\.\d{2}/\d{4}', '', clean_title).strip()
-            clean_title = re.sub(r'^\d{2}[\u4e00-\u9fff]+月', '', clean_title).strip()
-            clean_title = re.sub(r'^\d{4}-\d{2}-\d{2}', '', clean_title).strip()
-            clean_title = re.sub(r'\d{4}-\d{2}-\d{2}$', '', clean_title).strip()
-
-            # 跳过清理后标题为空的
-            if not clean_title:
-                continue
+shared_cache = SharedCache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
 
-            notices.append({
-                "title": clean_title,
-                "url": url,
-                "date": date_str,
-                "source": current_source,
-                "school_id": notice_school_id,
-                "category": _categorize_notice(clean_title),
-            })
+# 通知索引缓存：通知文件只追加不改写，文件变长时只解析新增部分
+_notice_lock = threading.Lock()
+_notice_cache = {"stat": None, "offset": 0, "source": None, "tail": b"", "index": NoticeIndex(),
+                 "details": {"stat": None, "offset": 0, "texts": {}}}
+# 增量解析前校验已解析部分末尾的字节，不一致说明文件被改写（而非追加），需全量重建
+TAIL_CHECK_BYTES = 64
 
-    return notices
+
+def _notice_file():
+    """当前的通知来源文件：优先读爬虫写入的规范化记录，没有时退回 updates.md"""
+    return NOTICES_STORE if os.path.exists(NOTICES_STORE) else UPDATES_MD
+
+
+def _read_tail(path, end):
+    """读取文件中 end 之前的最后 TAIL_CHECK_BYTES 个字节"""
+    start = max(0, end - TAIL_CHECK_BYTES)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _parse_notices_tail(path, offset, source):
+    """从字节偏移处解析通知文件，返回 (通知列表, 最后所在来源, 消费的字节数)"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # 只消费到最后一个换行，避免读到爬虫写了一半的行
+    end = data.rfind(b"\n") + 1
+    lines = data[:end].decode("utf-8", errors="replace").split("\n")
+    if path == NOTICES_STORE:
+        return _parse_store_lines(lines), None, end
+    notices, source = _parse_update_lines(lines, source)
+    return notices, source, end
+
+
+def _load_all_notices(path, stat_key):
+    """全量解析通知文件；启用共享缓存时直接复用其他 worker 的解析结果"""
+    if shared_cache is None:
+        return _parse_notices_tail(path, 0, None)
+    return shared_cache.get_or_build(
+        "notices", make_version(SNAPSHOT_FORMAT, stat_key), lambda: _parse_notices_tail(path, 0, None))
+
+
+def _read_notice_details():
+    """
+    增量读取详情正文记录，返回新读入的 {链接: 正文}（同时并入已读入的全部正文）。
+    调用方持有 _notice_lock
+    """
+    details = _notice_cache["details"]
+    try:
+        st = os.stat(NOTICE_DETAILS_LOG)
+    except OSError:
+        return {}
+    stat = (st.st_ino, st.st_size)
+    if details["stat"] == stat:
+        return {}
+    appended = details["stat"] is not None and details["stat"][0] == st.st_ino \
+        and st.st_size >= details["offset"]
+    offset = details["offset"] if appended else 0
+    with open(NOTICE_DETAILS_LOG, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # 只消费到最后一个换行，写了一半的行留到下次
+    end = data.rfind(b"\n") + 1
+    texts = {}
+    for line in data[:end].decode("utf-8", errors="replace").split("\n"):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logging.warning("%s 有无法解析的行，已跳过", NOTICE_DETAILS_LOG)
+            continue
+        texts[record["url"]] = record["text"]
+    details["texts"].update(texts)
+    details.update(stat=stat, offset=offset + end)
+    return texts
+
+
+def get_notice_index():
+    """
+    返回与通知文件同步的通知索引（追加内容增量解析，其他变化全量重建）。
+    详情正文记录有新增时，更新对应通知的全文索引
+    """
+    path = _notice_file()
+    try:
+        st = os.stat(path)
+    except OSError:
+        with _notice_lock:
+            _notice_cache.update(stat=None, offset=0, source=None, tail=b"", index=NoticeIndex())
+            return _notice_cache["index"]
+
+    stat_key = (path, st.st_ino, st.st_size, st.st_mtime_ns)
+    with _notice_lock:
+        cache = _notice_cache
+        new_details = _read_notice_details()
+        if new_details:
+            with profiler.phase("index_details"):
+                cache["index"].set_details(new_details)
+        if cache["stat"] == stat_key:
+            return cache["index"]
+
+        appended = cache["stat"] is not None and cache["stat"][:2] == stat_key[:2] \
+            and st.st_size >= cache["offset"] and _read_tail(path, cache["offset"]) == cache["tail"]
+        if appended:
+            offset = cache["offset"]
+            with profiler.phase("parse_notices"):
+                notices, source, consumed = _parse_notices_tail(path, offset, cache["source"])
+        else:
+            offset = 0
+            with profiler.phase("parse_notices"):
+                notices, source, consumed = _load_all_notices(path, stat_key)
+
+        loaded = cache["stat"] is not None
+        index = cache["index"] if appended else NoticeIndex()
+        index.add(notices, cache["details"]["texts"])
+        cache.update(stat=stat_key, offset=offset + consumed, source=source,
+                     tail=_read_tail(path, offset + consumed), index=index)
+
+        if appended:
+            for notice in notices:
+                change_log.append("notice", notice.to_dict())
+        elif loaded:
+            # 通知文件被改写（或重建），客户端需要全量同步
+            change_log.append("resync", {"reason": "notices"})
+        return index
+
+
+# 通知更新记录：只追加，按偏移增量读取
+_notice_updates_lock = threading.Lock()
+_notice_updates = {"stat": None, "offset": 0, "recent": deque(maxlen=NOTICE_UPDATES_KEEP)}
+
+
+def get_notice_updates():
+    """最近的通知更新（旧的在前）；文件有新增时增量读取，并为新增记录发出 notice_updated 事件"""
+    with _notice_updates_lock:
+        cache = _notice_updates
+        try:
+            st = os.stat(NOTICE_UPDATES_LOG)
+        except OSError:
+            # 文件尚不存在：记为空文件，之后新建的内容都算新增
+            cache.update(stat=(None, 0), offset=0)
+            return list(cache["recent"])
+        loaded = cache["stat"] is not None
+        appended = loaded and cache["stat"][0] in (None, st.st_ino) and st.st_size >= cache["offset"]
+        if appended:
+            offset = cache["offset"]
+        else:
+            offset = 0
+            cache["recent"].clear()
+        with open(NOTICE_UPDATES_LOG, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].decode("utf-8", errors="replace").split("\n"):
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        cache["recent"].extend(records)
+        cache.update(stat=(st.st_ino, st.st_size), offset=offset + end)
+        if appended:
+            for record in records:
+                change_log.append("notice_updated", record)
+        return list(cache["recent"])
 
 
 def _make_file_entry(full, fn, folder_path):
     """构造单个文件条目"""
     rel = os.path.relpath(full, folder_path)
-    size = os.path.getsize(full)
-    mtime = os.path.getmtime(full)
+    st = os.stat(full)
     return {
         "name": fn,
         "path": rel,
         "full_path": full,
-        "size": size,
-        "size_str": format_size(size),
-        "modified": datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M"),
+        "size": st.st_size,
+        "size_str": format_size(st.st_size),
+        "modified": datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M"),
+        # 纳秒精度的修改时间，与大小一起构成 /api/file 的 ETag
+        "mtime_ns": st.st_mtime_ns,
     }
 
 
@@ -454,7 +447,7 @@ def _get_professor_dir_names(folder_path):
         # 检查子目录内是否有陶瓷/套词/回复相关文件
         for fn in os.listdir(sub):
             fn_lower = fn.lower()
-            if any(kw in fn_lower for kw in ["陶瓷", "套词", "套磁", "reply", "回复"]):
+            if any(kw in fn_lower for kw in PROF_FILE_KEYWORDS):
                 prof_dirs.append(name)
                 break
     return prof_dirs
@@ -511,61 +504,40 @@ def format_size(size):
     return f"{size:.1f} TB"
 
 
-def load_manual_status():
-    """加载手动设置的状态"""
-    if os.path.exists(STATUS_FILE):
-        try:
-            with open(STATUS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return {}
+# 手动状态与截止日期的事务存储（进程内读缓存，写入后自动失效）
+state_store = StateStore(STATE_DB, migrate_from={
+    KIND_STATUS: STATUS_FILE,
+    KIND_DEADLINE: DEADLINE_FILE,
+})
 
 
-def save_manual_status(data):
-    """保存手动设置的状态"""
-    with open(STATUS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def load_manual_status():
+    """加载手动设置的状态"""
+    return state_store.get_all(KIND_STATUS)
 
 
 def load_deadlines():
     """加载截止日期"""
-    if os.path.exists(DEADLINE_FILE):
-        try:
-            with open(DEADLINE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return {}
-
-
-def save_deadlines(data):
-    """保存截止日期"""
-    with open(DEADLINE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def _categorize_notice(title):
-    """根据标题对通知进行分类"""
-    if any(kw in title for kw in ["夏令营", "暑期学校", "暑期项目", "开放日", "优才计划", "春季营", "冬令营"]):
-        return "夏令营"
-    if any(kw in title for kw in ["公示", "拟录取", "入营名单", "营员", "录取名单"]):
-        return "录取公示"
-    if any(kw in title for kw in ["预推免", "推免", "推荐免试", "接收推免"]):
-        return "预推免"
-    if any(kw in title for kw in ["招生简章", "招生办法", "招生说明", "招收", "考核及录取"]):
-        return "招生简章"
-    if any(kw in title for kw in ["直博", "硕博连读", "博士研究生招生", "申请-考核"]):
-        return "博士招生"
-    return "其他"
-
-
-def determine_status(school_id):
+    return state_store.get_all(KIND_DEADLINE)
+
+
+def load_notes():
+    """加载备注"""
+    return state_store.get_all(KIND_NOTE)
+
+
+def determine_status(school_id, manual=None):
     """根据手动设置或文件夹内容判断申请状态（手动优先）"""
-    manual = load_manual_status()
+    if manual is None:
+        manual = load_manual_status()
     if school_id in manual:
         return manual[school_id]
+    with profiler.phase("status"):
+        return _detect_status(school_id)
+
 
+def _detect_status(school_id):
+    """根据文件夹内容自动判断申请状态"""
     folder_name = SCHOOL_FOLDERS.get(school_id)
     if not folder_name:
         return "未开始"
@@ -605,56 +577,142 @@ def determine_status(school_id):
         return "未开始"
 
 
-# ========== API 路由 ==========
+# ========== 看板快照 ==========
+
+# 看板的全部输入由一个后台线程统一轮询
+input_watcher = InputWatcher(interval=WATCH_INTERVAL)
+input_watcher.add_input("schools_md", lambda: stat_fingerprint(SCHOOLS_MD))
+input_watcher.add_input(
+    "notices", lambda: (stat_fingerprint(NOTICES_STORE), stat_fingerprint(UPDATES_MD)))
+input_watcher.add_input("state", state_store.version)
+input_watcher.add_input("notice_updates", lambda: stat_fingerprint(NOTICE_UPDATES_LOG))
+for _sid, _folder in SCHOOL_FOLDERS.items():
+    input_watcher.add_input(
+        f"folder:{_sid}",
+        lambda folder=_folder: tree_fingerprint(os.path.join(BASE_DIR, folder)),
+    )
+
+input_watcher.add_input(
+    "folder:profile", lambda: tree_fingerprint(os.path.join(BASE_DIR, PROFILE_FOLDER)))
+
+# 构建看板时重新取指纹的输入（单个 stat 或查询，开销可忽略）；文件夹指纹要遍历目录树，
+# 取轮询线程最近一次的结果，文件夹变化由轮询线程发现后重建
+DIRECT_INPUTS = ("schools_md", "notices", "state", "notice_updates")
+
+# 申请材料内容哈希索引（学校文件夹 + 个人资料），文件夹变化时后台增量重扫
+file_index = FileIndex(
+    BASE_DIR, {**SCHOOL_FOLDERS, "profile": PROFILE_FOLDER}, FILE_INDEX_DB,
+    reference="profile", private_keywords=PROF_FILE_KEYWORDS)
+
+# 学校文件夹扫描结果缓存: school_id -> (文件夹指纹, 扫描结果)
+_folder_cache = {}
+
+
+def _scan_school_folder(school_id):
+    with profiler.phase("fs_scan"):
+        files = get_folder_files(school_id)
+        professors = get_professors(school_id)
+    with profiler.phase("status"):
+        auto_status = _detect_status(school_id)
+    return {"files": files, "professors": professors, "auto_status": auto_status}
+
+
+def get_folder_snapshot(school_id, fp=None):
+    """学校文件夹的扫描结果（文件、导师、自动状态），文件夹指纹未变时复用"""
+    if fp is None:
+        fp = input_watcher.fingerprint(f"folder:{school_id}")
+    cached = _folder_cache.get(school_id)
+    if cached is not None and fp is not None and cached[0] == fp:
+        return cached[1]
+    if fp is not None and shared_cache is not None:
+        data = shared_cache.get_or_build(
+            f"folder:{school_id}", make_version(SNAPSHOT_FORMAT, fp),
+            lambda: _scan_school_folder(school_id))
+    else:
+        data = _scan_school_folder(school_id)
+    _folder_cache[school_id] = (fp, data)
+    return data
+
+
+# 学校文件的路径表: school_id -> (文件夹扫描结果, {相对路径: 文件条目})
+_file_tables = {}
+
+
+def _file_table(school_id, snapshot):
+    cached = _file_tables.get(school_id)
+    if cached is not None and cached[0] is snapshot:
+        return cached[1]
+    table = {f["path"]: f for f in snapshot["files"]}
+    for prof in snapshot["professors"]:
+        table.update((f["path"], f) for f in prof["files"])
+    _file_tables[school_id] = (snapshot, table)
+    return table
+
+
+def get_school_file(school_id, path):
+    """
+    按相对路径从文件夹扫描结果中查找文件条目（学院级文件与导师文件），不逐个探测文件系统。
+    查不到时按当前的文件夹指纹再确认一次（轮询间隔内新增的文件），仍没有则返回 None
+    """
+    entry = _file_table(school_id, get_folder_snapshot(school_id)).get(path)
+    if entry is None:
+        fp = tree_fingerprint(os.path.join(BASE_DIR, SCHOOL_FOLDERS[school_id]))
+        entry = _file_table(school_id, get_folder_snapshot(school_id, fp)).get(path)
+    return entry
+
+
+def current_status(school_id, manual=None):
+    """当前状态（手动优先），自动检测部分复用文件夹扫描缓存"""
+    if manual is None:
+        manual = load_manual_status()
+    if school_id in manual:
+        return manual[school_id]
+    return get_folder_snapshot(school_id)["auto_status"]
 
-@app.route("/")
-def index():
-    return render_template("index.html")
 
+def _to_json_bytes(obj):
+    """序列化为 UTF-8 JSON 字节"""
+    return app.json.dumps_bytes(obj)
 
-@app.route("/api/profile")
-def api_profile():
-    """返回用户基本信息"""
-    # TODO: 修改为你的个人信息
-    return jsonify({
-        "name": "你的名字",
-        "university": "你的大学",
-        "major": "你的专业",
-        "gpa": "X.XX / 4.0",
-        "rank": "X / XX",
-        "papers": [
-            {"title": "论文1", "status": "Accept", "note": ""},
-            {"title": "论文2", "status": "Under Review", "note": ""},
-        ],
-        "resume_available": os.path.exists(RESUME_PATH),
-    })
 
+def build_dashboard():
+    """
+    构建完整看板：学校列表与各校详情，均预序列化为 JSON 字节。
+    耗时的部分（通知解析、文件夹扫描）经共享缓存在 worker 间复用；看板本身每个 worker 各自组装：
+    每次状态写入都会产生新的输入指纹，序列化整份看板写入共享缓存比在本进程重新组装更慢。
+    """
+    fingerprints = input_watcher.current_fingerprints(fresh=DIRECT_INPUTS)
+    data = _compute_dashboard(fingerprints)
+    # 看板对应的输入指纹，热启动时据此判断快照是否过期
+    data["inputs"] = fingerprints
+    _publish_school_changes(data["rows"])
+    warm_start.schedule(lambda: _dump_warm_start(data))
+    return data
 
-@app.route("/api/schools")
-def api_schools():
-    """返回所有学校信息（含链接、状态、最新通知）"""
-    school_links = parse_schools_md()
-    all_notices = parse_updates_md()
+
+def _compute_dashboard(fingerprints):
+    """按当前输入计算看板数据"""
+    school_links = get_school_links()
+    notice_index = get_notice_index()
     deadlines = load_deadlines()
+    manual = load_manual_status()
+    notes = load_notes()
 
-    result = []
+    schools = []
+    details = {}
+    professors = []
     for sid, info in SCHOOL_INFO.items():
-        # 该校通知
-        school_notices = [n for n in all_notices if n.get("school_id") == sid]
-        # 按日期排序（有日期的排前面，日期最新的排最前）
-        dated = [n for n in school_notices if n.get("date")]
-        undated = [n for n in school_notices if not n.get("date")]
-        dated.sort(key=lambda x: x["date"], reverse=True)
-        school_notices = dated + undated
+        # 该校通知（有日期的按日期倒序排前面，无日期的在后）
+        school_notices = notice_index.for_school(sid)
 
         latest_notice = None
         if school_notices:
-            # 优先取有日期的通知
-            best = dated[0] if dated else school_notices[0]
+            # 有日期的通知已排在最前
+            best = school_notices[0]
             latest_notice = {
-                "title": best["title"][:60],
-                "date": best.get("date", ""),
-                "url": best["url"],
+                "title": best.title[:60],
+                "date": best.date_text,
+                "url": best.url,
             }
 
         links = school_links.get(sid, [])
@@ -665,36 +723,720 @@ def api_schools():
                 admission_url = lk["url"]
                 break
 
-        status = determine_status(sid)
-        files = get_folder_files(sid)
-        notice_count = len(school_notices)
+        folder = get_folder_snapshot(sid, fingerprints.get(f"folder:{sid}"))
+        status = manual.get(sid, folder["auto_status"])
 
-        profs = get_professors(sid)
-
-        result.append({
+        schools.append({
             "id": sid,
             "university": info["university"],
             "department": info["department"],
             "short": info["short"],
             "status": status,
             "deadline": deadlines.get(sid, ""),
+            "note": notes.get(sid, ""),
             "official_url": official_url,
             "admission_url": admission_url,
             "links": links,
             "latest_notice": latest_notice,
-            "notice_count": notice_count,
-            "file_count": len(files),
-            "professor_count": len(profs),
+            "notice_count": len(school_notices),
+            "file_count": len(folder["files"]),
+            "professor_count": len(folder["professors"]),
         })
+        # 详情按字段分别编码；通知、文件、导师未变化时复用上次构建的片段
+        fp = fingerprints.get(f"folder:{sid}")
+        details[sid] = {
+            "id": _to_json_bytes(sid),
+            "university": _to_json_bytes(info["university"]),
+            "department": _to_json_bytes(info["department"]),
+            "short": _to_json_bytes(info["short"]),
+            "status": _to_json_bytes(status),
+            "deadline": _to_json_bytes(deadlines.get(sid, "")),
+            "note": _to_json_bytes(notes.get(sid, "")),
+            "links": _to_json_bytes(links),
+            "notices": _cached_fragment(sid, "notices", (notice_index, len(school_notices)),
+                                        school_notices),
+            "files": _cached_fragment(sid, "files", fp, folder["files"]),
+            "professors": _cached_fragment(sid, "professors", fp, folder["professors"]),
+        }
+        professors.extend(_professor_row(sid, info, prof) for prof in folder["professors"])
 
-    return jsonify(result)
+    # 全局导师索引，按最近活动倒序（无文件的排在最后）
+    professors.sort(key=lambda p: p["last_activity"], reverse=True)
+    return {
+        "rows": schools,
+        "professors": professors,
+        "schools": _json_array([_cached_fragment(row["id"], "row", row, row) for row in schools]),
+        "summary": _json_array([_cached_fragment(row["id"], "summary", summary, summary)
+                                for row, summary in ((r, _school_summary(r)) for r in schools)]),
+        "details": details,
+    }
+
+
+# ========== JSON 片段与字段投影 ==========
+
+# 已编码的 JSON 片段（学校 id -> {部分: (版本键, 字节)}）：版本键不变的部分在看板重建时直接复用
+_fragments = {}
+_fragments_lock = threading.Lock()
+
+
+def _cached_fragment(sid, part, key, value):
+    """
+    返回 value 编码后的 JSON 字节；key 与上次相同时复用上次的结果。
+    key 为 None 表示无法判断是否变化（如文件夹指纹缺失），总是重新编码
+    """
+    with _fragments_lock:
+        entry = _fragments.setdefault(sid, {}).get(part)
+    if key is not None and entry is not None and entry[0] == key:
+        return entry[1]
+    body = _to_json_bytes(value)
+    with _fragments_lock:
+        _fragments[sid][part] = (key, body)
+    return body
+
+
+def _json_array(fragments):
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def _json_object(fragments, keys):
+    """由各字段已编码的片段拼出 JSON 对象"""
+    return b"{" + b",".join(b'"%s":%s' % (k.encode("utf-8"), fragments[k]) for k in keys) + b"}"
+
+
+def parse_projection(args, fields, collections=()):
+    """
+    解析 fields= / include= 参数，返回 (输出的顶层字段, {字段: 子字段树})；都未指定时返回 (None, {})。
+    fields 为逗号分隔的字段名，"files.name" 这样的写法只取集合元素的部分字段（可多级）；
+    include 为要包含的集合，只指定 include 时返回全部非集合字段加这些集合。
+    字段名不存在时抛出 ValueError
+    """
+    raw_fields = args.get("fields")
+    raw_include = args.get("include")
+    if raw_fields is None and raw_include is None:
+        return None, {}
+
+    selected, whole, nested = set(), set(), {}
+    for item in filter(None, (x.strip() for x in (raw_fields or "").split(","))):
+        head, *rest = item.split(".")
+        if head not in fields:
+            raise ValueError(f"未知字段 {head}，可选: {', '.join(fields)}")
+        selected.add(head)
+        if not rest:
+            whole.add(head)
+            continue
+        node = nested.setdefault(head, {})
+        for part in rest[:-1]:
+            if node.get(part) is True:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[rest[-1]] = True
+    for name in filter(None, (x.strip() for x in (raw_include or "").split(","))):
+        if name not in collections:
+            raise ValueError(f"include 仅支持: {', '.join(collections)}")
+        selected.add(name)
+        whole.add(name)
+    if raw_fields is None:
+        selected.update(f for f in fields if f not in collections)
+    for name in whole:
+        nested.pop(name, None)
+    return tuple(f for f in fields if f in selected), nested
+
+
+def project(value, tree):
+    """按子字段树裁剪：列表逐项裁剪，Notice 先转换为字典，树中的 True 表示整个保留"""
+    if isinstance(value, list):
+        return [project(v, tree) for v in value]
+    if isinstance(value, Notice):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {k: value[k] if sub is True else project(value[k], sub)
+                for k, sub in tree.items() if k in value}
+    return value
+
+
+def project_items(items, keys, nested):
+    """按 parse_projection 的结果裁剪一组记录"""
+    return project(items, {k: nested.get(k, True) for k in keys})
+
+
+# 学校列表概要模式（总览网格）只返回这些字段
+SCHOOL_SUMMARY_FIELDS = ("id", "university", "department", "short", "status", "deadline")
+
+# 可投影的字段（顺序即输出顺序）及可用 include 指定的集合字段
+SCHOOL_ROW_FIELDS = ("id", "university", "department", "short", "status", "deadline", "note",
+                     "official_url", "admission_url", "links", "latest_notice",
+                     "notice_count", "file_count", "professor_count")
+SCHOOL_ROW_COLLECTIONS = ("links", "latest_notice")
+SCHOOL_DETAIL_FIELDS = ("id", "university", "department", "short", "status", "deadline", "note",
+                        "links", "notices", "files", "professors")
+SCHOOL_DETAIL_COLLECTIONS = ("notices", "files", "professors")
+# 详情中可按子字段裁剪的集合及其原始数据
+SCHOOL_DETAIL_SOURCES = {
+    "links": lambda sid: get_school_links().get(sid, []),
+    "notices": lambda sid: get_notice_index().for_school(sid),
+    "files": lambda sid: get_folder_snapshot(sid)["files"],
+    "professors": lambda sid: get_folder_snapshot(sid)["professors"],
+}
+
+# 学校列表的排序方式：名称 -> 排序键（None 表示无值，无论升降序都排在最后）
+SCHOOL_SORTS = {
+    "name": lambda r: (r["university"], r["department"]),
+    "status": lambda r: AVAILABLE_STATUSES.index(r["status"])
+    if r["status"] in AVAILABLE_STATUSES else len(AVAILABLE_STATUSES),
+    "deadline": lambda r: r["deadline"] or None,
+    "latest_notice": lambda r: (r["latest_notice"] or {}).get("date") or None,
+    "notice_count": lambda r: r["notice_count"],
+    "file_count": lambda r: r["file_count"],
+    "professor_count": lambda r: r["professor_count"],
+}
+
+
+# 导师列表的排序方式
+PROFESSOR_SORTS = ("last_activity", "name", "school")
+
+# 回复记录文件的关键词（与 get_professors 判断“已回复”一致）
+REPLY_KEYWORDS = ("reply", "回复")
+
+
+def _professor_row(school_id, info, prof):
+    """
+    全局导师索引中的一行：最近活动取导师目录下文件的最新修改时间，
+    首次联系取最早的修改时间，最近回复取回复记录文件的最新修改时间
+    """
+    modified = [f["modified"] for f in prof["files"]]
+    replies = [f["modified"] for f in prof["files"]
+               if any(kw in f["name"].lower() for kw in REPLY_KEYWORDS)]
+    return {
+        "name": prof["name"],
+        "school_id": school_id,
+        "school": info["short"],
+        "status": prof["status"],
+        "file_count": prof["file_count"],
+        "last_activity": max(modified, default=""),
+        "first_contact": min(modified, default=""),
+        "last_reply": max(replies, default=""),
+    }
+
+
+def _school_summary(row):
+    return {k: row[k] for k in SCHOOL_SUMMARY_FIELDS}
+
+
+def _sorted_school_rows(data, sort, desc):
+    """按指定方式排序的学校概要（结果缓存在看板快照上，快照不变时只排序一次）"""
+    orders = data.setdefault("orders", {})
+    cache_key = (sort, desc)
+    rows = orders.get(cache_key)
+    if rows is None:
+        if not sort:
+            rows = data["rows"][::-1] if desc else data["rows"]
+        else:
+            key = SCHOOL_SORTS[sort]
+            present = [r for r in data["rows"] if key(r) is not None]
+            missing = [r for r in data["rows"] if key(r) is None]
+            # 稳定排序，同值保持注册表顺序
+            rows = sorted(present, key=key, reverse=desc) + missing
+        orders[cache_key] = rows
+    return rows
+
+
+# 上一次构建时各校的概要，用于生成学校变化事件
+_published_schools = {}
+
+
+def _publish_school_changes(schools):
+    """与上一次构建比较，为概要有变化的学校（状态、截止日期、计数等）发出事件"""
+    first_build = not _published_schools
+    for row in schools:
+        if not first_build and _published_schools.get(row["id"]) != row:
+            change_log.append("school", row)
+        _published_schools[row["id"]] = row
+
+
+dashboard_view = MaterializedView(build_dashboard)
+
+
+def _on_inputs_changed(changed):
+    """输入变化时在轮询线程中重建看板，请求线程始终直接取现成结果"""
+    if changed == {"notice_updates"}:
+        # 通知更新不影响看板内容
+        get_notice_updates()
+        return
+    if "notice_updates" in changed:
+        get_notice_updates()
+    dashboard_view.rebuild()
+    folders = [name for name in changed if name.startswith("folder:")]
+    for name in folders:
+        school_id = name.split(":", 1)[1]
+        if school_id in SCHOOL_INFO:
+            folder = get_folder_snapshot(school_id)
+            change_log.append("folder", {
+                "school_id": school_id,
+                "files": folder["files"],
+                "professors": folder["professors"],
+            })
+    if folders:
+        file_index.request_scan()
+
+
+input_watcher.subscribe(_on_inputs_changed)
+
+
+# 本进程最近一次看到的共享写入代数
+_shared_generation = {"value": None}
+
+
+def start_background_tasks():
+    """启动输入轮询与首次文件索引扫描（重复调用无副作用）"""
+    if input_watcher.running:
+        return
+    get_notice_updates()
+    input_watcher.start()
+    file_index.request_scan()
+
+
+def get_dashboard():
+    """
+    返回当前看板快照（首次调用时启动后台任务）。
+    经 API 写入后的快照由写入方在返回前重建，其他 worker 发现写入代数变化时同步重建，
+    写入后的读取总能看到新值；
+    爬虫输出等应用之外的变化由轮询线程重建，重建完成前请求仍取旧快照
+    """
+    start_background_tasks()
+    if shared_cache is not None:
+        # 其他 worker 经 API 写入过状态数据时，本地快照作废
+        generation = shared_cache.generation()
+        if generation != _shared_generation["value"]:
+            _shared_generation["value"] = generation
+            dashboard_view.invalidate()
+    return dashboard_view.get()
+
+
+def mark_state_written(applied=()):
+    """
+    本进程写入了看板的某个输入：在返回前重建本地快照（写入后的读取即可看到新值），再递增写入代数通知其他 worker。
+    applied 为状态存储实际生效的变更，逐条记入变更日志（状态取生效值，清除时为自动检测结果）。
+    """
+    dashboard_view.invalidate()
+    dashboard_view.rebuild(force=False)
+    if shared_cache is not None:
+        _shared_generation["value"] = shared_cache.bump_generation()
+    for kind, school_id, _, new in applied:
+        value = current_status(school_id) if kind == KIND_STATUS else (new or "")
+        change_log.append(kind, {"school_id": school_id, "value": value})
+
+
+def sync_notices():
+    """
+    立即增量读取通知文件与通知更新记录（发出 notice / notice_updated 事件），不等轮询线程发现；
+    通知文件有变化时作废看板快照，下一次 get_dashboard() 同步重建（发出学校变化事件）。
+    返回通知文件是否有变化
+    """
+    before = _notice_cache["stat"]
+    get_notice_index()
+    get_notice_updates()
+    changed = _notice_cache["stat"] != before
+    if changed:
+        dashboard_view.invalidate()
+    return changed
+
+
+def _json_bytes_response(body):
+    return Response(body, mimetype="application/json")
+
+
+# ========== 热启动 ==========
+
+# 快照版本：注册表内容或通知字段变化时旧快照作废
+warm_start = WarmStart(
+    WARM_START_PATH,
+    make_version(BASE_DIR, NOTICE_FIELDS, stat_fingerprint(SCHOOLS_REGISTRY)),
+    enabled=WARM_START_ENABLED)
+
+# 写入快照的看板字段（排序结果等派生缓存不写入）
+WARM_DASHBOARD_KEYS = ("rows", "schools", "summary", "details", "professors", "inputs")
+
+
+def _dump_warm_start(data):
+    """在写入线程中序列化各缓存（持有通知锁，避免与增量解析并发修改索引）"""
+    with _notice_lock:
+        return pickle.dumps({
+            "dashboard": {k: data[k] for k in WARM_DASHBOARD_KEYS},
+            "notices": dict(_notice_cache),
+            "folders": dict(_folder_cache),
+            "links": dict(_school_links),
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _restore_warm_start():
+    """
+    用快照预填各缓存与看板：首个请求直接返回快照，
+    轮询线程以快照中的输入指纹为基线，首次轮询发现变化即在后台重建
+    """
+    payload = warm_start.load()
+    if payload is None:
+        return False
+    dashboard = payload["dashboard"]
+    _notice_cache.update(payload["notices"])
+    _folder_cache.update(payload["folders"])
+    _school_links.update(payload["links"])
+    for row in dashboard["rows"]:
+        _published_schools[row["id"]] = row
+    input_watcher.seed(dashboard["inputs"])
+    dashboard_view.seed(dashboard, built_at=warm_start.loaded_at)
+    if shared_cache is not None:
+        # 快照是否过期由输入指纹（含状态存储版本）判断，无需再按写入代数作废
+        _shared_generation["value"] = shared_cache.generation()
+    return True
+
+
+_restore_warm_start()
+
+
+# ========== 性能剖析 ==========
+
+@app.before_request
+def _profile_begin():
+    profiler.begin_request()
+
+
+def _profile_finish(status):
+    rule = request.url_rule.rule if request.url_rule else "(unmatched)"
+    profiler.end_request(f"{request.method} {rule}", request.full_path.rstrip("?"), status)
+
+
+@app.after_request
+def _profile_end(response):
+    if profiler.enabled:
+        _profile_finish(response.status_code)
+    return response
+
+
+@app.teardown_request
+def _profile_teardown(exc):
+    # 视图抛出异常时 after_request 不会执行，在此收尾（已收尾的请求不会重复计入）
+    if profiler.enabled:
+        _profile_finish(500)
+
+
+@app.route("/api/debug/perf", methods=["GET", "DELETE"])
+def api_debug_perf():
+    """各路由延迟分位数、阶段耗时与最近的慢请求剖析；DELETE 清空统计"""
+    if not profiler.enabled:
+        return jsonify({"error": "性能剖析未开启（启动前设置环境变量 CAMP_PROFILE=1）"}), 404
+    if request.method == "DELETE":
+        profiler.reset()
+        return jsonify({"success": True})
+    return jsonify(profiler.report())
+
+
+# ========== API 路由 ==========
+
+@app.route("/")
+def index():
+    return render_template("index.html")
+
+
+@app.route("/api/profile")
+def api_profile():
+    """返回用户基本信息"""
+    # TODO: 修改为你的个人信息
+    return jsonify({
+        "name": "你的名字",
+        "university": "你的大学",
+        "major": "你的专业",
+        "gpa": "X.XX / 4.0",
+        "rank": "X / XX",
+        "papers": [
+            {"title": "论文1", "status": "Accept", "note": ""},
+            {"title": "论文2", "status": "Under Review", "note": ""},
+        ],
+        "resume_available": os.path.exists(RESUME_PATH),
+    })
+
+
+@app.route("/api/schools")
+def api_schools():
+    """
+    返回学校信息（含链接、状态、最新通知）。
+    不带参数时返回全部学校的数组；指定 limit/offset/sort 时分页返回
+    {"items", "total", "offset", "limit"}，sort 前加 "-" 为降序；
+    view=summary 只返回 id/名称/状态/截止日期；fields/include 指定返回的字段（见 parse_projection）。
+    """
+    args = request.args
+    view = args.get("view", "full")
+    if view not in ("full", "summary"):
+        return jsonify({"error": "view 仅支持: full, summary"}), 400
+    try:
+        keys, nested = parse_projection(args, SCHOOL_ROW_FIELDS, SCHOOL_ROW_COLLECTIONS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if keys is not None and view == "summary":
+        return jsonify({"error": "view=summary 不能与 fields/include 同时使用"}), 400
+    data = get_dashboard().data
+    if not any(k in args for k in ("limit", "offset", "sort")):
+        if keys is not None:
+            return jsonify(project_items(data["rows"], keys, nested))
+        return _json_bytes_response(data["summary"] if view == "summary" else data["schools"])
+
+    sort = args.get("sort", "")
+    desc = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort and sort not in SCHOOL_SORTS:
+        return jsonify({"error": f"sort 仅支持: {', '.join(SCHOOL_SORTS)}（前加 - 为降序）"}), 400
+    try:
+        limit = min(max(int(args.get("limit", 50)), 1), 200)
+        offset = max(int(args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit/offset 必须为整数"}), 400
+
+    rows = _sorted_school_rows(data, sort, desc)
+    items = rows[offset:offset + limit]
+    if view == "summary":
+        items = [_school_summary(row) for row in items]
+    elif keys is not None:
+        items = project_items(items, keys, nested)
+    return jsonify({"items": items, "total": len(rows), "offset": offset, "limit": limit})
+
+
+@app.route("/api/professors")
+def api_professors():
+    """
+    跨学校的导师列表（来自看板快照中的全局导师索引，不扫描文件夹）。
+    status: 套磁状态，多个用逗号分隔；school_id: 限定学校；
+    inactive_days: 只返回最近 N 天内没有回复的导师：按最近回复时间判断，
+    尚未回复的按首次联系时间（无文件的也算）；
+    sort: last_activity（默认，最近的在前）/name/school，前加 "-" 反向；limit/offset 分页
+    """
+    args = request.args
+    sort = args.get("sort", "last_activity")
+    reverse = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort not in PROFESSOR_SORTS:
+        return jsonify({"error": f"sort 仅支持: {', '.join(PROFESSOR_SORTS)}（前加 - 反向）"}), 400
+    try:
+        limit = min(max(int(args.get("limit", 100)), 1), 500)
+        offset = max(int(args.get("offset", 0)), 0)
+        inactive_days = int(args["inactive_days"]) if args.get("inactive_days") else None
+    except ValueError:
+        return jsonify({"error": "limit/offset/inactive_days 必须为整数"}), 400
+
+    rows = get_dashboard().data["professors"]
+    statuses = {s for s in args.get("status", "").split(",") if s}
+    if statuses:
+        rows = [p for p in rows if p["status"] in statuses]
+    school_id = args.get("school_id")
+    if school_id:
+        rows = [p for p in rows if p["school_id"] == school_id]
+    if inactive_days is not None:
+        cutoff = (datetime.now() - timedelta(days=inactive_days)).strftime("%Y-%m-%d %H:%M")
+        rows = [p for p in rows if (p["last_reply"] or p["first_contact"]) < cutoff]
+
+    if sort == "name":
+        rows = sorted(rows, key=lambda p: (p["name"], p["school"]), reverse=reverse)
+    elif sort == "school":
+        # 注册表顺序，同校按最近活动
+        order = {sid: i for i, sid in enumerate(SCHOOL_INFO)}
+        rows = sorted(rows, key=lambda p: order[p["school_id"]], reverse=reverse)
+    elif reverse:
+        rows = rows[::-1]
+    return jsonify({"items": rows[offset:offset + limit], "total": len(rows),
+                    "offset": offset, "limit": limit})
+
+
+@app.route("/api/dashboard/meta")
+def api_dashboard_meta():
+    """返回看板快照的版本、构建时间与已存在时长"""
+    snap = get_dashboard()
+    return jsonify({**snap.meta(), "watching": input_watcher.running})
+
+
+# 全部通知的编码结果，通知索引未变化时复用
+_notices_body = {"key": None, "body": b""}
 
 
 @app.route("/api/notices")
 def api_notices():
-    """返回所有通知"""
-    notices = parse_updates_md()
-    return jsonify(notices)
+    """返回所有通知；fields 指定返回的字段"""
+    try:
+        keys, nested = parse_projection(request.args, NOTICE_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    index = get_notice_index()
+    if keys is not None:
+        return jsonify(project_items(index.notices, keys, nested))
+    key = (index, len(index))
+    cached = _notices_body
+    if cached["key"] != key:
+        cached.update(key=key, body=_to_json_bytes(index.notices))
+    return _json_bytes_response(cached["body"])
+
+
+@app.route("/api/notices/query")
+def api_notices_query():
+    """按学校、分类、日期区间查询通知，游标分页"""
+    args = request.args
+    sort = args.get("sort", "date_desc")
+    if sort not in SORT_ORDERS:
+        return jsonify({"error": f"sort 仅支持: {', '.join(SORT_ORDERS)}"}), 400
+    try:
+        limit = min(max(int(args.get("limit", 50)), 1), 200)
+    except ValueError:
+        return jsonify({"error": "limit 必须为整数"}), 400
+
+    try:
+        keys, nested = parse_projection(args, NOTICE_FIELDS)
+        page = get_notice_index().query(
+            school_id=args.get("school_id") or None,
+            category=args.get("category") or None,
+            date_from=args.get("date_from", "").strip(),
+            date_to=args.get("date_to", "").strip(),
+            sort=sort,
+            cursor=args.get("cursor") or None,
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if keys is not None:
+        page["items"] = project_items(page["items"], keys, nested)
+    return jsonify(page)
+
+
+@app.route("/api/notices/updates")
+def api_notice_updates():
+    """
+    爬虫重访发现的通知内容变化（新的在前）：url、标题、来源、更新时间与变化摘要
+    （增删行数和前几行变化内容）。limit 默认 50
+    """
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), NOTICE_UPDATES_KEEP)
+    except ValueError:
+        return jsonify({"error": "limit 必须为整数"}), 400
+    updates = get_notice_updates()
+    return jsonify(updates[::-1][:limit])
+
+
+@app.route("/api/notices/search")
+def api_notices_search():
+    """全文检索通知标题及详情正文（爬虫重访过的通知），可叠加学校、分类过滤；offset 或 cursor 分页"""
+    args = request.args
+    q = args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "q 不能为空"}), 400
+    try:
+        limit = min(max(int(args.get("limit", 50)), 1), 500)
+        offset = max(int(args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit/offset 必须为整数"}), 400
+
+    try:
+        keys, nested = parse_projection(args, NOTICE_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        result = get_notice_index().search(
+            q,
+            school_id=args.get("school_id") or None,
+            category=args.get("category") or None,
+            limit=limit,
+            offset=offset,
+            cursor=args.get("cursor") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if keys is not None:
+        result["items"] = project_items(result["items"], keys, nested)
+    return jsonify(result)
+
+
+# 推送流名额（每个进程独立计数）
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+
+@app.route("/api/stream")
+def api_stream():
+    """
+    Server-Sent Events 推送流：与 /api/changes 相同的变更事件；支持 Last-Event-ID 续传。
+    事件 id 为与 /api/changes 相同的游标（带日志实例标识），重连到其他 worker 或服务重启后
+    旧 id 判为失效，先推送 resync。
+    本进程的推送流达到 MAX_STREAMS 时返回 503，客户端改用 /api/changes 定时轮询
+    """
+    if not _stream_slots.acquire(blocking=False):
+        # 推送流已占满本进程的名额，留出线程处理普通请求
+        rv = jsonify({"error": "推送连接已满，请改用 /api/changes 轮询", "poll": "/api/changes"})
+        rv.headers["Retry-After"] = str(STREAM_KEEPALIVE * 4)
+        return rv, 503
+    try:
+        # 确保有事件来源：输入轮询已启动、通知索引与看板已完成首次加载
+        get_dashboard()
+    except Exception:
+        _stream_slots.release()
+        raise
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    cursor = change_log.parse_cursor(last_event_id) if last_event_id else change_log.last_id
+
+    def generate(cursor):
+        yield "retry: 3000\n\n"
+        while True:
+            if cursor is None:
+                valid = False
+            else:
+                events, valid = change_log.wait(cursor, timeout=STREAM_KEEPALIVE)
+            if not valid:
+                # 游标已失效（缓冲区淘汰、来自其他 worker 或服务重启），通知客户端全量刷新
+                cursor = change_log.last_id
+                yield f"id: {change_log.cursor(cursor)}\nevent: resync\ndata: {{}}\n\n"
+                continue
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for ev in events:
+                data = json.dumps(ev.data, ensure_ascii=False)
+                yield f"id: {change_log.cursor(ev.id)}\nevent: {ev.kind}\ndata: {data}\n\n"
+                cursor = ev.id
+
+    rv = Response(generate(cursor), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # 客户端断开（下一次写心跳失败）或服务端关闭响应时归还名额
+    rv.call_on_close(_stream_slots.release)
+    return rv
+
+
+@app.route("/api/changes")
+def api_changes():
+    """
+    增量同步：返回游标之后的变更（通知、学校概要、状态/截止日期/备注、文件夹）。
+    返回 {"cursor", "changes", "more", "resync"}，下次以返回的 cursor 继续；
+    more 为 true 时还有未取完的变更。resync 为 true 表示游标已失效（过旧、来自其他 worker
+    或服务已重启）或通知文件被改写，客户端应全量拉取，之后从返回的 cursor 继续。
+    不带 since 时即返回当前游标。
+    """
+    # 先让待处理的输入变化落地：读入爬虫刚写入的通知，看板重建时产生学校变化事件
+    start_background_tasks()
+    sync_notices()
+    get_dashboard()
+
+    cursor = change_log.parse_cursor(request.args.get("since"))
+    if cursor is not None:
+        events, valid = change_log.since(cursor)
+    else:
+        events, valid = [], False
+    if not valid or any(ev.kind == "resync" for ev in events):
+        return jsonify({"cursor": change_log.cursor(), "changes": [], "more": False, "resync": True})
+
+    more = len(events) > CHANGES_LIMIT
+    events = events[:CHANGES_LIMIT]
+    return jsonify({
+        "cursor": change_log.cursor(events[-1].id if events else cursor),
+        "changes": [ev.to_dict() for ev in events],
+        "more": more,
+        "resync": False,
+    })
 
 
 @app.route("/api/statuses")
@@ -709,22 +1451,17 @@ def api_update_status(school_id):
     if school_id not in SCHOOL_INFO:
         return jsonify({"error": "未找到该学校"}), 404
 
-    from flask import request
     data = request.get_json()
     new_status = data.get("status", "").strip()
 
     if not new_status:
         return jsonify({"error": "状态不能为空"}), 400
 
-    manual = load_manual_status()
-    if new_status == "__auto__":
-        # 特殊值：删除手动状态，恢复自动检测
-        manual.pop(school_id, None)
-    else:
-        manual[school_id] = new_status
-    save_manual_status(manual)
+    # 特殊值 __auto__：删除手动状态，恢复自动检测
+    applied = state_store.set(KIND_STATUS, school_id, None if new_status == "__auto__" else new_status)
+    mark_state_written(applied)
 
-    return jsonify({"success": True, "status": determine_status(school_id)})
+    return jsonify({"success": True, "status": current_status(school_id)})
 
 
 @app.route("/api/school/<school_id>/deadline", methods=["PUT"])
@@ -733,66 +1470,125 @@ def api_update_deadline(school_id):
     if school_id not in SCHOOL_INFO:
         return jsonify({"error": "未找到该学校"}), 404
 
-    from flask import request
     data = request.get_json()
     deadline = data.get("deadline", "").strip()
 
-    dl = load_deadlines()
-    if deadline:
-        dl[school_id] = deadline
-    else:
-        dl.pop(school_id, None)
-    save_deadlines(dl)
+    applied = state_store.set(KIND_DEADLINE, school_id, deadline or None)
+    mark_state_written(applied)
 
     return jsonify({"success": True, "deadline": deadline})
 
 
-@app.route("/api/school/<school_id>")
-def api_school_detail(school_id):
-    """返回单个学校详情"""
-    if school_id not in SCHOOL_INFO:
-        return jsonify({"error": "未找到该学校"}), 404
-
-    info = SCHOOL_INFO[school_id]
-    school_links = parse_schools_md()
-    all_notices = parse_updates_md()
-
-    school_notices = [n for n in all_notices if n.get("school_id") == school_id]
-    school_notices.sort(key=lambda x: x.get("date", ""), reverse=True)
+# 批量接口中各字段对应的存储种类，及表示“清除”的取值
+BATCH_FIELDS = {
+    "status": (KIND_STATUS, "__auto__"),
+    "deadline": (KIND_DEADLINE, ""),
+    "note": (KIND_NOTE, ""),
+}
 
-    links = school_links.get(school_id, [])
-    files = get_folder_files(school_id)
-    status = determine_status(school_id)
 
-    profs = get_professors(school_id)
+@app.route("/api/batch", methods=["POST"])
+def api_batch_update():
+    """
+    批量修改多所学校的状态、截止日期、备注，一个事务完成。
+    请求体: {"changes": [{"school_id": "...", "status": "...", "deadline": "...", "note": "..."}, ...]}
+    每项可只含部分字段；status 为 "__auto__"、deadline/note 为空串表示清除。
+    返回受影响学校的最新状态。
+    """
+    data = request.get_json(silent=True) or {}
+    entries = data.get("changes")
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "changes 必须为非空列表"}), 400
+
+    changes = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            return jsonify({"error": f"第 {i + 1} 项格式错误"}), 400
+        school_id = entry.get("school_id")
+        if school_id not in SCHOOL_INFO:
+            return jsonify({"error": f"第 {i + 1} 项: 未找到该学校 {school_id}"}), 404
+        fields = [f for f in BATCH_FIELDS if f in entry]
+        if not fields:
+            return jsonify({"error": f"第 {i + 1} 项没有可修改的字段"}), 400
+        for field in fields:
+            value = entry[field]
+            if not isinstance(value, str):
+                return jsonify({"error": f"第 {i + 1} 项: {field} 必须为字符串"}), 400
+            value = value.strip()
+            if field == "status" and not value:
+                return jsonify({"error": f"第 {i + 1} 项: 状态不能为空"}), 400
+            kind, clear_value = BATCH_FIELDS[field]
+            changes.append((kind, school_id, None if value == clear_value else value))
+
+    applied = state_store.apply(changes, source="batch")
+    if applied:
+        mark_state_written(applied)
 
+    manual = load_manual_status()
+    deadlines = load_deadlines()
+    notes = load_notes()
+    affected = list(dict.fromkeys(school_id for _, school_id, _ in changes))
     return jsonify({
-        "id": school_id,
-        "university": info["university"],
-        "department": info["department"],
-        "short": info["short"],
-        "status": status,
-        "links": links,
-        "notices": school_notices,
-        "files": files,
-        "professors": profs,
+        "success": True,
+        "changed": len(applied),
+        "schools": [{
+            "id": sid,
+            "status": current_status(sid, manual),
+            "deadline": deadlines.get(sid, ""),
+            "note": notes.get(sid, ""),
+        } for sid in affected],
     })
 
 
-@app.route("/api/refresh", methods=["POST"])
-def api_refresh():
-    """触发爬虫运行"""
+@app.route("/api/school/<school_id>/history")
+def api_school_history(school_id):
+    """返回学校状态、截止日期、备注的修改历史"""
+    if school_id not in SCHOOL_INFO:
+        return jsonify({"error": "未找到该学校"}), 404
+    return jsonify(state_store.history(school_id))
+
+
+@app.route("/api/school/<school_id>")
+def api_school_detail(school_id):
+    """返回单个学校详情；fields/include 指定返回的字段（见 parse_projection）"""
+    if school_id not in SCHOOL_INFO:
+        return jsonify({"error": "未找到该学校"}), 404
+    try:
+        keys, nested = parse_projection(request.args, SCHOOL_DETAIL_FIELDS, SCHOOL_DETAIL_COLLECTIONS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    fragments = get_dashboard().data["details"][school_id]
+    if keys is None:
+        return _json_bytes_response(_json_object(fragments, SCHOOL_DETAIL_FIELDS))
+    # 只取部分子字段的集合从缓存中的原始数据裁剪后编码，其余字段直接拼接已编码的片段
+    fragments = dict(fragments)
+    for name, tree in nested.items():
+        if name in SCHOOL_DETAIL_SOURCES:
+            fragments[name] = _to_json_bytes(project(SCHOOL_DETAIL_SOURCES[name](school_id), tree))
+    return _json_bytes_response(_json_object(fragments, keys))
+
+
+# 爬虫运行超时（秒）：全量抓取与单校刷新
+CRAWLER_TIMEOUT = 120
+SCHOOL_REFRESH_TIMEOUT = 60
+
+
+def _run_crawler(extra_args, timeout):
+    """运行爬虫子进程，返回 JSON 响应"""
     if not os.path.exists(CRAWLER_PY):
         return jsonify({"success": False, "message": "爬虫脚本不存在"}), 500
 
     try:
         result = subprocess.run(
-            [sys.executable, CRAWLER_PY],
+            [sys.executable, CRAWLER_PY, *extra_args],
             capture_output=True,
             text=True,
-            timeout=120,
+            timeout=timeout,
             cwd=os.path.dirname(CRAWLER_PY),
         )
+        # 返回前读入本次抓取的结果，客户端随后的 /api/changes 即可取到新通知
+        sync_notices()
+        mark_state_written()
         output = result.stdout + result.stderr
         return jsonify({
             "success": result.returncode == 0,
@@ -800,11 +1596,60 @@ def api_refresh():
             "output": output[-2000:] if len(output) > 2000 else output,  # 限制输出长度
         })
     except subprocess.TimeoutExpired:
-        return jsonify({"success": False, "message": "爬虫运行超时（120秒）"}), 504
+        return jsonify({"success": False, "message": f"爬虫运行超时（{timeout}秒）"}), 504
     except Exception as e:
         return jsonify({"success": False, "message": f"运行失败: {str(e)}"}), 500
 
 
+def _has_crawl_targets(school_id):
+    """该学校是否有监控目标（与爬虫 --school-id 的筛选相同），没有时不必启动爬虫"""
+    return bool(select_targets(MONITOR_TARGETS, [school_id], registry_path=SCHOOLS_REGISTRY))
+
+
+@app.route("/api/refresh", methods=["POST"])
+def api_refresh():
+    """触发爬虫运行"""
+    return _run_crawler([], CRAWLER_TIMEOUT)
+
+
+@app.route("/api/school/<school_id>/refresh", methods=["POST"])
+def api_school_refresh(school_id):
+    """只抓取该学校的监控页面（含可能分配到该校的综合来源）"""
+    if school_id not in SCHOOL_INFO:
+        return jsonify({"error": "未找到该学校"}), 404
+    if not _has_crawl_targets(school_id):
+        return jsonify({"error": "该学校未配置爬取目标"}), 404
+    return _run_crawler(["--school-id", school_id], SCHOOL_REFRESH_TIMEOUT)
+
+
+@app.route("/api/files/dedup")
+def api_files_dedup():
+    """申请材料对照：各校相同/过期/缺失的材料，以及内容重复的文件组"""
+    start_background_tasks()
+    if file_index.last_scan is None:
+        file_index.scan()
+    return jsonify({
+        "last_scan": datetime.fromtimestamp(file_index.last_scan).strftime("%Y-%m-%d %H:%M:%S"),
+        "documents": file_index.document_report(),
+        "duplicates": file_index.duplicates(),
+    })
+
+
+@app.route("/api/files/lookup")
+def api_files_lookup():
+    """按哈希 (sha256)、文件路径 (path，相对项目根目录) 或文件名 (name) 反查全部副本"""
+    args = request.args
+    if not any(args.get(k) for k in ("sha256", "path", "name")):
+        return jsonify({"error": "需要 sha256、path 或 name 参数"}), 400
+    if file_index.last_scan is None:
+        file_index.scan()
+    result = file_index.lookup(
+        sha256=args.get("sha256"), path=args.get("path"), name=args.get("name"))
+    if not result or not result["copies"]:
+        return jsonify({"error": "索引中没有该文件"}), 404
+    return jsonify(result)
+
+
 @app.route("/api/resume")
 def api_resume():
     """提供简历 PDF 下载"""
@@ -815,29 +1660,135 @@ def api_resume():
     return jsonify({"error": "简历文件不存在"}), 404
 
 
-@app.route("/api/file/<school_id>/<path:filepath>")
-def api_file(school_id, filepath):
-    """提供学校文件夹下文件的访问"""
-    folder_name = SCHOOL_FOLDERS.get(school_id)
-    if not folder_name:
-        return jsonify({"error": "未找到该学校"}), 404
+# ========== 文件下载 ==========
+
+# 无 wsgi.file_wrapper 时按块读取的块大小
+FILE_BLOCK_SIZE = 64 * 1024
+
+
+def _file_etag(size, mtime_ns):
+    return f"{size:x}-{mtime_ns:x}"
 
-    folder_path = os.path.join(BASE_DIR, folder_name)
-    full_path = os.path.normpath(os.path.join(folder_path, filepath))
 
-    # 安全检查：防止路径穿越
-    if not full_path.startswith(folder_path):
-        return jsonify({"error": "非法路径"}), 403
+def _file_last_modified(mtime_ns):
+    return datetime.fromtimestamp(mtime_ns // 1_000_000_000, timezone.utc)
 
-    if os.path.exists(full_path) and os.path.isfile(full_path):
-        return send_from_directory(os.path.dirname(full_path), os.path.basename(full_path))
 
-    return jsonify({"error": "文件不存在"}), 404
+def _content_disposition(name):
+    """inline 的 Content-Disposition 参数，非 ASCII 文件名按 RFC 5987 编码"""
+    try:
+        name.encode("ascii")
+        return {"filename": name}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        return {"filename": simple, "filename*": "UTF-8''" + quote(name, safe="!#$&+-.^_`|~")}
+
+
+def _read_blocks(f, length):
+    try:
+        while length > 0:
+            block = f.read(min(FILE_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+def _file_body(f, length, whole):
+    """
+    从文件当前位置发送 length 字节。整个文件（200）且有 wsgi.file_wrapper 时交给服务器
+    （gunicorn 以 sendfile 零拷贝发送）；Range 响应一律按块读取到 length 为止，
+    不依赖服务器按 Content-Length 截断（wsgiref 等的 file_wrapper 会一直读到文件末尾）
+    """
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    if whole and file_wrapper is not None:
+        return file_wrapper(f, FILE_BLOCK_SIZE)
+    return _read_blocks(f, length)
+
+
+def send_indexed_file(entry):
+    """
+    发送文件夹扫描结果中的文件。
+    强 ETag 由大小与纳秒修改时间构成；If-None-Match / If-Modified-Since 命中时不打开文件直接返回 304，
+    浏览器每次重新验证（no-cache），文件未变时不再重新下载。
+    支持单段 Range（206，If-Range 的 ETag 不符时返回整个文件），多段 Range 按整个文件返回。
+    文件已被删除时返回 None
+    """
+    size, mtime_ns = entry["size"], entry["mtime_ns"]
+    if not is_resource_modified(request.environ, _file_etag(size, mtime_ns),
+                                last_modified=_file_last_modified(mtime_ns)):
+        rv = app.response_class(status=304)
+        rv.set_etag(_file_etag(size, mtime_ns))
+        rv.cache_control.private = True
+        rv.cache_control.no_cache = True
+        return rv
+
+    f = None
+    if request.method == "GET":
+        try:
+            f = open(entry["full_path"], "rb")
+        except OSError:
+            return None
+        # 扫描结果可能晚于文件修改一个轮询间隔，以打开后的实际大小与修改时间为准
+        st = os.fstat(f.fileno())
+        size, mtime_ns = st.st_size, st.st_mtime_ns
+    etag = _file_etag(size, mtime_ns)
+
+    rv = app.response_class(
+        mimetype=mimetypes.guess_type(entry["name"])[0] or "application/octet-stream",
+        direct_passthrough=True)
+    rv.headers.set("Content-Disposition", "inline", **_content_disposition(entry["name"]))
+    rv.set_etag(etag)
+    rv.last_modified = _file_last_modified(mtime_ns)
+    rv.cache_control.private = True
+    rv.cache_control.no_cache = True
+    rv.accept_ranges = "bytes"
+
+    start, length = 0, size
+    ranges = request.range
+    if_range = request.if_range
+    # If-Range 只按强 ETag 比较，给出日期或旧 ETag 时返回整个文件
+    range_valid = (if_range.etag is None and if_range.date is None) or if_range.etag == etag
+    if size and ranges is not None and len(ranges.ranges) == 1 and range_valid:
+        span = ranges.range_for_length(size)
+        if span is None:
+            if f is not None:
+                f.close()
+            rv = jsonify({"error": "请求的范围超出文件大小"})
+            rv.status_code = 416
+            rv.headers["Content-Range"] = f"bytes */{size}"
+            return rv
+        start, stop = span
+        length = stop - start
+        rv.status_code = 206
+        rv.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+
+    rv.content_length = length
+    if f is not None:
+        f.seek(start)
+        rv.response = _file_body(f, length, whole=rv.status_code == 200)
+    return rv
+
+
+@app.route("/api/file/<school_id>/<path:filepath>")
+def api_file(school_id, filepath):
+    """提供学校文件夹下文件的访问（只提供扫描结果中的文件，路径无法越出学校文件夹）"""
+    if school_id not in SCHOOL_FOLDERS:
+        return jsonify({"error": "未找到该学校"}), 404
+    start_background_tasks()
+    entry = get_school_file(school_id, filepath)
+    response = send_indexed_file(entry) if entry is not None else None
+    if response is None:
+        return jsonify({"error": "文件不存在"}), 404
+    return response
 
 
 if __name__ == "__main__":
+    port = int(os.environ.get("CAMP_PORT", "5208"))
     print("=" * 50)
     print("  保研夏令营信息展示系统")
-    print("  访问地址: http://localhost:5208")
+    print(f"  访问地址: http://localhost:{port}")
     print("=" * 50)
-    app.run(host="0.0.0.0", port=5208, debug=False)
+    app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+webapp 测试的公共环境：app 在导入时按环境变量确定数据目录，须在任何测试导入 app 之前
+指向临时目录。启用共享缓存，与 serve.py 的多 worker 部署走同一条路径
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="camp-test-")
+os.environ["CAMP_BASE_DIR"] = DATA_DIR
+os.environ["CAMP_WARM_START"] = "0"
+os.environ["CAMP_WATCH_INTERVAL"] = "3600"
+os.environ["CAMP_SHARED_CACHE"] = os.path.join(DATA_DIR, "shared_cache.sqlite3")
+os.makedirs(os.path.join(DATA_DIR, "webapp"))
+os.makedirs(os.path.join(DATA_DIR, "monitor"))
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def data_dir():
+    """app 使用的数据根目录（CAMP_BASE_DIR）"""
+    return DATA_DIR
+
+
+@pytest.fixture(scope="session")
+def webapp():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(webapp):
+    return webapp.app.test_client()
+
+
+def notice_record(title, **fields):
+    """一条规范化通知记录（与 monitor/notices.jsonl 的行相同）"""
+    record = {"title": title, "url": f"https://cs.pku.edu.cn/{title}", "date": "2025-06-01",
+              "source": "北京大学 - 计算机学院", "school_id": "pku_cs", "category": "夏令营"}
+    record.update(fields)
+    return record
+
+
+def _append_jsonl(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@pytest.fixture
+def notices_file(webapp, data_dir):
+    """空的 monitor/notices.jsonl；结束时删除通知与详情正文记录，并让 app 重新同步"""
+    path = os.path.join(data_dir, "monitor", "notices.jsonl")
+    open(path, "w").close()
+    yield path
+    for name in (path, webapp.NOTICE_DETAILS_LOG):
+        if os.path.exists(name):
+            os.remove(name)
+    webapp._notice_cache["details"] = {"stat": None, "offset": 0, "texts": {}}
+    webapp.sync_notices()
+
+
+@pytest.fixture
+def add_notices(notices_file):
+    """向 notices.jsonl 追加通知，参数为标题或完整记录"""
+    def add(*items):
+        _append_jsonl(notices_file, [notice_record(i) if isinstance(i, str) else i for i in items])
+    return add
+
+
+@pytest.fixture
+def add_details(webapp, notices_file):
+    """向 notice_details.jsonl 追加详情正文：add_details({链接: 正文})"""
+    def add(texts):
+        _append_jsonl(webapp.NOTICE_DETAILS_LOG, [{"url": u, "text": t} for u, t in texts.items()])
+    return add
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+变更事件日志
+进程内的有界环形缓冲区，事件 id 单调递增且连续，支持按 id 续传。
+起始 id 取启动时的毫秒时间戳，重启后旧客户端的 id 必然落在缓冲区之外，会被要求全量同步。
+对外的游标字符串另带日志实例标识，来自其他进程（多 worker）或重启前的游标一律判为失效。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+class Event:
+    __slots__ = ("id", "kind", "data", "ts")
+
+    def __init__(self, event_id, kind, data):
+        self.id = event_id
+        self.kind = kind
+        self.data = data
+        self.ts = time.time()
+
+    def to_dict(self):
+        return {"id": self.id, "type": self.kind, "data": self.data}
+
+
+class ChangeLog:
+    """有界变更日志；since()/wait() 返回 (事件列表, 游标是否仍有效)"""
+
+    def __init__(self, capacity=1000):
+        self._events = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._last_id = int(time.time() * 1000)
+        # 日志实例标识：起始 id + 进程号
+        self.epoch = f"{self._last_id:x}{os.getpid():x}"
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def cursor(self, event_id=None):
+        """对外的游标字符串（默认为当前最新位置）"""
+        return f"{self.epoch}.{self._last_id if event_id is None else event_id}"
+
+    def parse_cursor(self, cursor):
+        """解析游标字符串为事件 id；格式错误或不属于本日志实例时返回 None"""
+        epoch, _, event_id = (cursor or "").partition(".")
+        if epoch != self.epoch or not event_id.isdigit():
+            return None
+        return int(event_id)
+
+    def append(self, kind, data):
+        """追加一个事件并唤醒所有等待者，返回事件 id"""
+        with self._cond:
+            self._last_id += 1
+            self._events.append(Event(self._last_id, kind, data))
+            self._cond.notify_all()
+            return self._last_id
+
+    def since(self, cursor):
+        """返回 id 大于 cursor 的事件；游标过旧（已被淘汰）或来自未来时第二项为 False"""
+        with self._cond:
+            return self._since_locked(cursor)
+
+    def wait(self, cursor, timeout):
+        """阻塞直到有 id 大于 cursor 的事件或超时"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_id != cursor, timeout)
+            return self._since_locked(cursor)
+
+    def _since_locked(self, cursor):
+        if cursor == self._last_id:
+            return [], True
+        if cursor > self._last_id or not self._events:
+            return [], False
+        first_id = self._events[0].id
+        if cursor < first_id - 1:
+            return [], False
+        # id 连续，可直接按偏移切片
+        start = cursor - first_id + 1
+        return [self._events[i] for i in range(start, len(self._events))], True
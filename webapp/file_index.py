@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+申请材料内容哈希索引
+后台扫描各学校文件夹与个人资料目录，按块流式计算 SHA-256，
+(大小, 修改时间) 未变的文件直接跳过。索引持久化在 SQLite 中，
+用于找出相同文件、过期副本、各校缺失的材料，以及按版本反查文件位置。
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# 流式哈希的块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """按块读取计算 SHA-256，内存占用与文件大小无关"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FileIndex:
+    """
+    文件内容哈希索引。
+    folders: {分组 id: 相对 base_dir 的文件夹名}，如学校 id -> 学校文件夹；
+    reference: 参考材料所在分组 id（如个人资料），其中的文件视为各校应有的材料；
+    private_keywords: 文件名含这些关键词的文件（如套磁邮件）各校各不相同，不参与材料对照。
+    """
+
+    def __init__(self, base_dir, folders, db_path, reference=None, private_keywords=()):
+        self.base_dir = base_dir
+        self.folders = dict(folders)
+        self.reference = reference
+        self.private_keywords = tuple(private_keywords)
+        self.db_path = db_path
+        self.last_scan = None
+        self._local = threading.local()
+        self._scan_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, owner TEXT NOT NULL, name TEXT NOT NULL,"
+            " size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256)")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_name ON files (name)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    # ---------- 扫描 ----------
+
+    def _walk(self):
+        """遍历所有分组文件夹下的非隐藏文件，产出 (分组 id, 相对路径, stat)"""
+        for owner, folder in self.folders.items():
+            root_dir = os.path.join(self.base_dir, folder)
+            for root, dirs, files in os.walk(root_dir):
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                for fn in files:
+                    if fn.startswith('.'):
+                        continue
+                    full = os.path.join(root, fn)
+                    try:
+                        st = os.stat(full)
+                    except OSError:
+                        continue
+                    yield owner, os.path.relpath(full, self.base_dir), st
+
+    def scan(self):
+        """增量扫描一次，返回 {"files", "hashed", "removed", "elapsed_ms"}"""
+        with self._scan_lock:
+            start = time.perf_counter()
+            conn = self._conn()
+            known = {path: (size, mtime_ns) for path, size, mtime_ns in
+                     conn.execute("SELECT path, size, mtime_ns FROM files")}
+            present = set()
+            hashed = 0
+            for owner, rel, st in self._walk():
+                present.add(rel)
+                if known.get(rel) == (st.st_size, st.st_mtime_ns):
+                    continue
+                try:
+                    digest = hash_file(os.path.join(self.base_dir, rel))
+                except OSError as e:
+                    logging.warning("文件哈希失败 %s: %s", rel, e)
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, owner, name, size, mtime_ns, sha256)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (rel, owner, os.path.basename(rel), st.st_size, st.st_mtime_ns, digest))
+                hashed += 1
+            removed = [p for p in known if p not in present]
+            conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+            conn.commit()
+            self.last_scan = time.time()
+            return {
+                "files": len(present),
+                "hashed": hashed,
+                "removed": len(removed),
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+
+    def request_scan(self):
+        """请求后台扫描（启动后台线程；多次请求合并为一次）"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-indexer", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                self.scan()
+            except Exception:
+                logging.exception("文件索引扫描失败")
+
+    # ---------- 查询 ----------
+
+    def _rows(self, sql, params=()):
+        cols = ("path", "owner", "name", "size", "mtime_ns", "sha256")
+        return [dict(zip(cols, row)) for row in self._conn().execute(sql, params)]
+
+    def lookup(self, sha256=None, path=None, name=None):
+        """
+        反查文件位置：按哈希、按某个文件（取其当前版本的哈希）或按文件名。
+        返回 {"sha256": ..., "copies": [...]}（按文件名时为该名字的全部版本）
+        """
+        if path:
+            row = self._conn().execute(
+                "SELECT sha256 FROM files WHERE path = ?", (path,)).fetchone()
+            if not row:
+                return None
+            sha256 = row[0]
+        if sha256:
+            return {"sha256": sha256, "copies": self._rows(
+                "SELECT * FROM files WHERE sha256 = ? ORDER BY path", (sha256,))}
+        if name:
+            return {"name": name, "copies": self._rows(
+                "SELECT * FROM files WHERE name = ? ORDER BY mtime_ns DESC", (name,))}
+        return None
+
+    def duplicates(self):
+        """内容完全相同的文件组（至少两份）"""
+        groups = {}
+        for row in self._rows(
+                "SELECT * FROM files WHERE sha256 IN"
+                " (SELECT sha256 FROM files GROUP BY sha256 HAVING COUNT(*) > 1)"
+                " ORDER BY sha256, path"):
+            groups.setdefault(row["sha256"], []).append(row)
+        return [{"sha256": sha, "size": rows[0]["size"], "paths": [r["path"] for r in rows]}
+                for sha, rows in groups.items()]
+
+    def document_report(self):
+        """
+        各校材料版本对照。
+        材料以文件名区分：参考目录中的文件，或出现在两个及以上学校的文件名。
+        最新版本取修改时间最新的副本；每校状态为 identical（有最新版本，含改名副本）、
+        outdated（只有旧版本）或 missing（没有该材料）。
+        """
+        rows = self._rows("SELECT * FROM files")
+        by_name = {}
+        by_owner_hashes = {}
+        for row in rows:
+            by_name.setdefault(row["name"], []).append(row)
+            by_owner_hashes.setdefault(row["owner"], set()).add(row["sha256"])
+
+        schools = [owner for owner in self.folders if owner != self.reference]
+        documents = []
+        for name, copies in sorted(by_name.items()):
+            if any(kw in name.lower() for kw in self.private_keywords):
+                continue
+            owners = {c["owner"] for c in copies}
+            if self.reference not in owners and len(owners - {self.reference}) < 2:
+                continue
+            latest = max(copies, key=lambda c: c["mtime_ns"])
+            per_school = {}
+            for sid in schools:
+                mine = [c for c in copies if c["owner"] == sid]
+                if latest["sha256"] in by_owner_hashes.get(sid, ()):
+                    state = "identical"
+                elif mine:
+                    state = "outdated"
+                else:
+                    state = "missing"
+                per_school[sid] = {"state": state, "paths": [c["path"] for c in mine]}
+            documents.append({
+                "name": name,
+                "latest": {
+                    "path": latest["path"],
+                    "sha256": latest["sha256"],
+                    "modified": time.strftime(
+                        "%Y-%m-%d %H:%M", time.localtime(latest["mtime_ns"] / 1e9)),
+                },
+                "schools": per_school,
+            })
+        return documents
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+通知二级索引
+按学校、分类、学校+分类维护按日期排序的键列表，
+查询时用二分定位日期区间，配合游标分页，耗时与通知总数基本无关。
+"""
+
+import base64
+import binascii
+import calendar
+import json
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date as dt_date
+
+from notice_record import NO_DATE, date_to_ordinal, ordinal_to_date
+from search_index import SearchIndex
+
+# 支持的排序方式
+SORT_ORDERS = ("date_desc", "date_asc")
+
+# 排序键为单个整数：高位为日期序数，低 SEQ_BITS 位为 SEQ_MASK - seq，
+# 与 (date, -seq) 的顺序相同，但不必为每条通知保存元组和日期字符串
+SEQ_BITS = 32
+SEQ_MASK = (1 << SEQ_BITS) - 1
+
+# 无日期的通知序数为 0，在升序键列表中排在最前
+_DATED_START = (NO_DATE + 1) << SEQ_BITS
+
+# 缓存最近几次检索的全部命中，按游标翻页时不必重新检索
+SEARCH_CACHE_SIZE = 16
+
+# 日期区间参数：YYYY、YYYY-MM 或 YYYY-MM-DD
+_DATE_BOUND_RE = re.compile(r"(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?")
+
+
+def make_key(ordinal, seq):
+    return (ordinal << SEQ_BITS) | (SEQ_MASK - seq)
+
+
+def key_seq(key):
+    return SEQ_MASK - (key & SEQ_MASK)
+
+
+def date_bound(text, upper=False):
+    """
+    日期区间端点 → 序数：下界取该年/月/日的第一天，上界取最后一天，
+    使 "2025-06" 这类前缀能包含整月。格式错误抛出 ValueError
+    """
+    match = _DATE_BOUND_RE.fullmatch(text)
+    if not match:
+        raise ValueError(f"日期格式应为 YYYY、YYYY-MM 或 YYYY-MM-DD: {text}")
+    y = int(match.group(1))
+    m = int(match.group(2) or (12 if upper else 1))
+    if match.group(3):
+        d = int(match.group(3))
+    else:
+        d = calendar.monthrange(y, m)[1] if upper and 1 <= m <= 12 else 1
+    try:
+        return dt_date(y, m, d).toordinal()
+    except ValueError as e:
+        raise ValueError(f"无效日期: {text}") from e
+
+
+def encode_cursor(key):
+    """将排序键编码为不透明游标（内容为 [日期, -seq]）"""
+    raw = json.dumps([ordinal_to_date(key >> SEQ_BITS), -key_seq(key)],
+                     ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """解码游标为排序键，非法游标抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, neg = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(date, str) or not isinstance(neg, int) or not -SEQ_MASK <= neg <= 0:
+            raise TypeError(neg)
+        return make_key(date_to_ordinal(date), -neg)
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"非法游标: {cursor}") from e
+
+
+def encode_search_cursor(hit):
+    """检索结果的游标：最后一条命中的 [得分, seq]"""
+    raw = json.dumps(list(hit)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, seq = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(score, (int, float)) or not isinstance(seq, int):
+            raise TypeError(seq)
+        return (float(score), seq)
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"非法游标: {cursor}") from e
+
+
+class NoticeIndex:
+    """
+    通知列表（Notice 对象）及其二级索引。
+    键按 (date, -seq) 排序（见 make_key），seq 为通知在文件中的顺序；取负使日期倒序时同日期的通知保持文件顺序。
+    """
+
+    def __init__(self, notices=None, details=None):
+        self.notices = []
+        self._all = []
+        self._by_school = {}
+        self._by_category = {}
+        self._by_school_category = {}
+        self.search_index = SearchIndex()
+        # 检索缓存由多个请求线程读写
+        self._search_cache = {}
+        self._search_lock = threading.Lock()
+        if notices:
+            self.add(notices, details)
+
+    def __len__(self):
+        return len(self.notices)
+
+    def __getstate__(self):
+        # 检索缓存与锁不写入热启动快照
+        state = self.__dict__.copy()
+        state["_search_cache"] = {}
+        del state["_search_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._search_lock = threading.Lock()
+
+    def add(self, notices, details=None):
+        """
+        追加一批通知并维护索引（批量追加后统一排序，近乎有序时为线性时间）。
+        details: 可选的 {链接: 详情正文}，有正文的通知连同正文一起建立全文索引
+        """
+        touched = []
+        for notice in notices:
+            seq = len(self.notices)
+            self.notices.append(notice)
+            self.search_index.add(seq, notice.title, details.get(notice.url, "") if details else "")
+            key = make_key(notice.date, seq)
+            for keys in self._lists_for(notice):
+                keys.append(key)
+                touched.append(keys)
+        for keys in {id(k): k for k in touched}.values():
+            keys.sort()
+
+    def set_details(self, details):
+        """更新已有通知的详情正文（{链接: 正文}，如爬虫重访后正文有变化），返回更新的通知数"""
+        updated = 0
+        for seq, notice in enumerate(self.notices):
+            text = details.get(notice.url)
+            if text is not None:
+                self.search_index.set_detail(seq, notice.title, text)
+                updated += 1
+        if updated:
+            with self._search_lock:
+                self._search_cache.clear()
+        return updated
+
+    def _lists_for(self, notice):
+        """返回该通知所属的全部索引列表（不存在则创建）"""
+        sid = notice.school_id
+        cat = notice.category
+        lists = [self._all]
+        if sid:
+            lists.append(self._by_school.setdefault(sid, []))
+        if cat:
+            lists.append(self._by_category.setdefault(cat, []))
+        if sid and cat:
+            lists.append(self._by_school_category.setdefault((sid, cat), []))
+        return lists
+
+    def _select(self, school_id=None, category=None):
+        """选出与过滤条件对应的索引列表"""
+        if school_id and category:
+            return self._by_school_category.get((school_id, category), [])
+        if school_id:
+            return self._by_school.get(school_id, [])
+        if category:
+            return self._by_category.get(category, [])
+        return self._all
+
+    def count(self, school_id=None, category=None):
+        """某学校/分类下的通知数"""
+        return len(self._select(school_id, category))
+
+    def for_school(self, school_id):
+        """某学校的全部通知，有日期的按日期倒序在前，无日期的在后"""
+        keys = self._select(school_id)
+        split = bisect_left(keys, _DATED_START)
+        dated = [self.notices[key_seq(k)] for k in reversed(keys[split:])]
+        undated = [self.notices[key_seq(k)] for k in reversed(keys[:split])]
+        return dated + undated
+
+    def search(self, q, school_id=None, category=None, limit=50, offset=0, cursor=None):
+        """
+        全文检索并叠加学校/分类过滤。给出 cursor（上一页的 next_cursor）时从其后继续，忽略 offset。
+        返回 {"items": [...], "total": 命中总数, "next_cursor": 下一页游标或 None}，items 按相关度排序
+        """
+        def accept(seq):
+            notice = self.notices[seq]
+            if school_id and notice.school_id != school_id:
+                return False
+            if category and notice.category != category:
+                return False
+            return True
+
+        # 追加通知后条数变化，旧的缓存项自然失效
+        cache_key = (q, school_id, category, len(self.notices))
+        with self._search_lock:
+            hits = self._search_cache.get(cache_key)
+        if hits is None:
+            hits = self.search_index.search(q, accept if (school_id or category) else None)
+            with self._search_lock:
+                if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                    self._search_cache.clear()
+                self._search_cache[cache_key] = hits
+        if cursor:
+            # 命中按 (得分, seq) 倒序，游标之后即第一个小于它的命中
+            after = decode_search_cursor(cursor)
+            offset = next((i for i, hit in enumerate(hits) if hit < after), len(hits))
+        page = hits[offset:offset + limit]
+        return {
+            "items": [self.notices[seq] for _, seq in page],
+            "total": len(hits),
+            "next_cursor": encode_search_cursor(page[-1]) if page and offset + limit < len(hits) else None,
+        }
+
+    def query(self, school_id=None, category=None, date_from="", date_to="",
+              sort="date_desc", cursor=None, limit=50):
+        """
+        按条件查询一页通知。
+        返回 {"items": [...], "total": 命中总数, "next_cursor": 下一页游标或 None}
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"不支持的排序方式: {sort}")
+
+        keys = self._select(school_id, category)
+        lo, hi = 0, len(keys)
+        if date_from or date_to:
+            # 指定日期区间时排除无日期的通知
+            lo = bisect_left(keys, _DATED_START)
+        if date_from:
+            lo = max(lo, bisect_left(keys, make_key(date_bound(date_from), SEQ_MASK)))
+        if date_to:
+            hi = min(hi, bisect_left(keys, make_key(date_bound(date_to, upper=True) + 1, SEQ_MASK)))
+        total = max(hi - lo, 0)
+
+        after = decode_cursor(cursor) if cursor else None
+        if sort == "date_desc":
+            end = hi if after is None else max(lo, min(hi, bisect_left(keys, after)))
+            start = max(lo, end - limit)
+            page = keys[start:end][::-1]
+            has_more = start > lo
+        else:
+            start = lo if after is None else min(hi, max(lo, bisect_right(keys, after)))
+            end = min(hi, start + limit)
+            page = keys[start:end]
+            has_more = end < hi
+
+        return {
+            "items": [self.notices[key_seq(k)] for k in page],
+            "total": total,
+            "next_cursor": encode_cursor(page[-1]) if page and has_more else None,
+        }
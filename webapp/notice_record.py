@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+通知的紧凑内存表示
+每条通知为一个 __slots__ 对象而非六个键的字典：来源、学校 id、分类等大量重复的字符串经驻留后共享同一对象，
+日期保存为序数（date.toordinal()，无日期为 0）。只在 JSON 序列化时才转换回字典。
+"""
+
+import sys
+from datetime import date as dt_date
+
+# 无日期
+NO_DATE = 0
+
+
+def intern_text(value):
+    """驻留重复出现的短字符串（None 与空串原样返回）"""
+    return sys.intern(value) if value else value
+
+
+# 日期字符串与序数的双向转换结果（不同日期只有几千个，同一日期的通知共享同一个序数对象）
+_date_ordinal = {"": NO_DATE}
+_date_text = {NO_DATE: ""}
+
+
+def date_to_ordinal(text):
+    """"YYYY-MM-DD" → 序数，空串为 NO_DATE"""
+    ordinal = _date_ordinal.get(text or "")
+    if ordinal is None:
+        ordinal = _date_ordinal[text] = dt_date.fromisoformat(text).toordinal()
+    return ordinal
+
+
+def ordinal_to_date(ordinal):
+    text = _date_text.get(ordinal)
+    if text is None:
+        text = _date_text[ordinal] = dt_date.fromordinal(ordinal).isoformat()
+    return text
+
+
+class Notice:
+    """一条通知；字段与 normalize.NOTICE_FIELDS 相同，date 为序数"""
+
+    __slots__ = ("title", "url", "date", "source", "school_id", "category")
+
+    def __init__(self, title, url, date, source, school_id, category):
+        self.title = title
+        self.url = url
+        self.date = date
+        self.source = intern_text(source)
+        self.school_id = intern_text(school_id)
+        self.category = intern_text(category)
+
+    @classmethod
+    def from_record(cls, record):
+        """由规范化记录（字典）构造"""
+        return cls(record["title"], record["url"], date_to_ordinal(record["date"]),
+                   record["source"], record["school_id"], record["category"])
+
+    @property
+    def date_text(self):
+        return ordinal_to_date(self.date)
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "url": self.url,
+            "date": ordinal_to_date(self.date),
+            "source": self.source,
+            "school_id": self.school_id,
+            "category": self.category,
+        }
+
+    def __reduce__(self):
+        # 经 _restore 还原，反序列化（共享缓存、热启动快照）后重复的字符串与日期仍然共享
+        return (_restore, (self.title, self.url, ordinal_to_date(self.date),
+                           self.source, self.school_id, self.category))
+
+    def __repr__(self):
+        return f"Notice({self.title!r}, {self.date_text!r}, {self.source!r})"
+
+
+def _restore(title, url, date_text, source, school_id, category):
+    return Notice(title, url, date_to_ordinal(date_text), source, school_id, category)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+请求性能剖析（可选开启）
+记录每个路由的延迟分布与各阶段耗时（解析通知、解析院校 md、文件扫描、状态判断、序列化），
+并对部分请求做 cProfile 采样，只保留慢请求的剖析结果。
+关闭时 phase() 返回空上下文，几乎没有开销。
+"""
+
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# 延迟直方图的桶上界（毫秒），最后一个桶为溢出桶
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# 后台线程（如看板重建）中的阶段计时归入该名称
+BACKGROUND = "(background)"
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler._record_phase(self._name, (time.perf_counter() - self._start) * 1000)
+        return False
+
+
+def _percentile(sorted_samples, q):
+    if not sorted_samples:
+        return None
+    idx = min(len(sorted_samples) - 1, max(0, int(round(q * (len(sorted_samples) - 1)))))
+    return round(sorted_samples[idx], 3)
+
+
+class _RouteStats:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets", "samples", "phases")
+
+    def __init__(self, window):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.samples = deque(maxlen=window)
+        self.phases = {}
+
+
+class Profiler:
+    """
+    enabled: 是否开启
+    slow_ms: 慢请求阈值
+    sample_rate: 做 cProfile 采样的请求比例（只保留慢请求的结果）
+    """
+
+    def __init__(self, enabled=False, slow_ms=200.0, sample_rate=0.1, keep_slow=20, window=1024):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.window = window
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # cProfile 同一时间只允许一个（Python 3.12 起为进程级钩子）
+        self._profile_lock = threading.Lock()
+        self._routes = {}
+        self._slow = deque(maxlen=keep_slow)
+        self._started_at = time.time()
+
+    # ---------- 计时 ----------
+
+    def phase(self, name):
+        """阶段计时上下文：with profiler.phase("fs_scan"): ..."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def _record_phase(self, name, ms):
+        record = getattr(self._local, "record", None)
+        if record is not None:
+            record["phases"][name] = record["phases"].get(name, 0.0) + ms
+            return
+        with self._lock:
+            stats = self._route_stats(BACKGROUND)
+            self._add_phase(stats, name, ms)
+
+    def _route_stats(self, route):
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = _RouteStats(self.window)
+        return stats
+
+    @staticmethod
+    def _add_phase(stats, name, ms):
+        agg = stats.phases.get(name)
+        if agg is None:
+            agg = stats.phases[name] = [0, 0.0, 0.0]
+        agg[0] += 1
+        agg[1] += ms
+        agg[2] = max(agg[2], ms)
+
+    def begin_request(self):
+        """请求开始：建立本线程的计时记录，按采样率启动 cProfile"""
+        if not self.enabled:
+            return
+        profile = None
+        if random.random() < self.sample_rate and self._profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # 其他剖析工具已占用钩子
+                self._profile_lock.release()
+                profile = None
+        self._local.record = {"start": time.perf_counter(), "phases": {}, "profile": profile}
+
+    def end_request(self, route, path, status):
+        """请求结束：计入路由统计，慢请求保留其阶段耗时与剖析结果"""
+        record = getattr(self._local, "record", None)
+        if record is None:
+            return
+        self._local.record = None
+        ms = (time.perf_counter() - record["start"]) * 1000
+        profile = record["profile"]
+        profile_text = None
+        if profile is not None:
+            profile.disable()
+            self._profile_lock.release()
+            if ms >= self.slow_ms:
+                out = io.StringIO()
+                pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(30)
+                profile_text = out.getvalue()
+
+        with self._lock:
+            stats = self._route_stats(route)
+            stats.count += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+            stats.buckets[bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+            stats.samples.append(ms)
+            for name, phase_ms in record["phases"].items():
+                self._add_phase(stats, name, phase_ms)
+            if ms >= self.slow_ms:
+                self._slow.append({
+                    "route": route,
+                    "path": path,
+                    "status": status,
+                    "ms": round(ms, 3),
+                    "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "phases": {k: round(v, 3) for k, v in record["phases"].items()},
+                    "profile": profile_text,
+                })
+
+    # ---------- 报告 ----------
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
+            self._started_at = time.time()
+
+    def report(self):
+        """聚合报告：各路由的分位数、直方图、阶段耗时，以及最近的慢请求"""
+        with self._lock:
+            routes = {}
+            for route, stats in self._routes.items():
+                samples = sorted(stats.samples)
+                labels = [f"<={b}ms" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+                routes[route] = {
+                    "count": stats.count,
+                    "mean_ms": round(stats.total_ms / stats.count, 3) if stats.count else None,
+                    "max_ms": round(stats.max_ms, 3),
+                    "p50_ms": _percentile(samples, 0.50),
+                    "p90_ms": _percentile(samples, 0.90),
+                    "p99_ms": _percentile(samples, 0.99),
+                    "histogram": dict(zip(labels, stats.buckets)),
+                    "phases": {
+                        name: {
+                            "count": count,
+                            "total_ms": round(total, 3),
+                            "mean_ms": round(total / count, 3),
+                            "max_ms": round(peak, 3),
+                        }
+                        for name, (count, total, peak) in sorted(stats.phases.items())
+                    },
+                }
+            return {
+                "enabled": self.enabled,
+                "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._started_at)),
+                "slow_ms": self.slow_ms,
+                "sample_rate": self.sample_rate,
+                "routes": routes,
+                "slow_requests": list(reversed(self._slow)),
+            }
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+院校注册表
+跟踪的学校由 schools.json 描述，增删院校只需改该文件：
+每校的名称、本地文件夹、院校网址汇总.md 中的章节名、updates.md 中的来源名。
+院校网址汇总.md 按章节名编译为 {学校 id: 链接列表}，正则预先编译。
+"""
+
+import json
+import re
+
+# 每个学校条目的必填字段
+REQUIRED_FIELDS = ("id", "university", "department", "short", "folder")
+
+# 院校网址汇总.md：按 ## 数字. 学校名 分割章节
+_SECTION_SPLIT_RE = re.compile(r'\n## \d+\.\s+')
+# - **标签**: URL
+_LINK_RE = re.compile(r'-\s+\*\*(.+?)\*\*:\s*(https?://\S+)')
+#   - 另一入口: URL
+_ALT_LINK_RE = re.compile(r'\s+-\s+(.+?):\s*(https?://\S+)')
+
+
+def load_registry(path):
+    """
+    读取注册表，返回各查找表：
+    info: {id: {university, department, short}}（保持文件中的顺序）
+    folders: {id: 文件夹名}
+    sections: {院校网址汇总.md 章节名: id}
+    sources: {updates.md 来源名: id 或综合来源的分配键}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    info, folders, sections, sources = {}, {}, {}, {}
+    for entry in data.get("schools", []):
+        missing = [k for k in REQUIRED_FIELDS if not entry.get(k)]
+        if missing:
+            raise ValueError(f"注册表条目缺少字段 {missing}: {entry}")
+        sid = entry["id"]
+        if sid in info:
+            raise ValueError(f"注册表中学校 id 重复: {sid}")
+        info[sid] = {
+            "university": entry["university"],
+            "department": entry["department"],
+            "short": entry["short"],
+        }
+        folders[sid] = entry["folder"]
+        for name in entry.get("sections", []):
+            sections[name] = sid
+        for name in entry.get("sources", []):
+            sources[name] = sid
+    sources.update(data.get("dispatch_sources", {}))
+    return {"info": info, "folders": folders, "sections": sections, "sources": sources}
+
+
+def parse_links_md(path, sections):
+    """
+    解析院校网址汇总.md，返回 {学校 id: [{label, url}, ...]}。
+    sections 为注册表中的 {章节名: 学校 id}，不在其中的章节忽略
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    schools = {}
+    for section in _SECTION_SPLIT_RE.split(content)[1:]:  # 跳过第一段（标题部分）
+        lines = section.strip().split("\n")
+        school_id = sections.get(lines[0].strip())
+        if not school_id:
+            continue
+
+        links = []
+        for line in lines[1:]:
+            m = _LINK_RE.match(line)
+            if m:
+                links.append({"label": m.group(1), "url": m.group(2)})
+            else:
+                m2 = _ALT_LINK_RE.match(line)
+                if m2:
+                    links.append({"label": m2.group(1).strip(), "url": m2.group(2)})
+        schools[school_id] = links
+    return schools
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+通知全文检索
+倒排索引的词项为中文单字与连续字符的二元组（bigram）以及 ASCII 单词，
+覆盖规范化后的通知标题，以及可用时的详情正文（爬虫重访详情页得到的正文）。
+ASCII 查询词可匹配包含它的索引单词（"sum" 命中 "summer"），候选单词由单词的 n-gram 表查出，不遍历词表。
+"""
+
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+# 中文字符串与 ASCII 单词
+_CJK_RUN_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+_ASCII_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# 打分权重
+TITLE_TERM_WEIGHT = 2.0
+DETAIL_TERM_WEIGHT = 1.0
+TITLE_PHRASE_BONUS = 10.0
+DETAIL_PHRASE_BONUS = 3.0
+
+# 每条通知索引的正文上限（字符数），开头部分已包含标题、日期、要求等主要信息
+MAX_DETAIL_CHARS = 5000
+# 单词 n-gram 表的最大长度：不超过该长度的查询词直接查表，更长的取其中最少单词的一个 n-gram 再核对
+WORD_GRAM = 3
+
+
+def normalize_text(text):
+    """全角转半角、统一小写"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text):
+    """将文本切分为去重后的词项列表（中文二元组 + 中文单字 + ASCII 单词），用于建立索引"""
+    text = normalize_text(text)
+    terms = []
+    for run in _CJK_RUN_RE.findall(text):
+        terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        terms.extend(run)
+    terms.extend(_ASCII_TOKEN_RE.findall(text))
+    return list(dict.fromkeys(terms))
+
+
+def query_terms(query):
+    """
+    查询切分为 (中文二元组, 中文单字, ASCII 词)，各自去重。
+    单字只取孤立的一个汉字（如 "2025年 夏令营" 中的 "年"），连续的汉字由二元组覆盖
+    """
+    text = normalize_text(query)
+    bigrams, chars = [], []
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            chars.append(run)
+        else:
+            bigrams.extend(run[i:i + 2] for i in range(len(run) - 1))
+    words = _ASCII_TOKEN_RE.findall(text)
+    return list(dict.fromkeys(bigrams)), list(dict.fromkeys(chars)), list(dict.fromkeys(words))
+
+
+def _phrase_key(text):
+    """短语匹配用的紧凑形式（去掉空白与标点）"""
+    return "".join(_CJK_RUN_RE.findall(text) + _ASCII_TOKEN_RE.findall(text))
+
+
+def _word_grams(word):
+    """单词中长度不超过 WORD_GRAM 的全部子串"""
+    return {word[i:i + n] for n in range(1, WORD_GRAM + 1) for i in range(len(word) - n + 1)}
+
+
+def _insert_sorted(plist, seq):
+    pos = bisect_left(plist, seq)
+    if pos == len(plist) or plist[pos] != seq:
+        plist.insert(pos, seq)
+
+
+def _remove_sorted(plist, seq):
+    pos = bisect_left(plist, seq)
+    if pos < len(plist) and plist[pos] == seq:
+        del plist[pos]
+
+
+class SearchIndex:
+    """
+    通知倒排索引（文档 id 为通知在 NoticeIndex 中的 seq，从 0 连续递增、只增不减，倒排表保持有序）。
+    倒排表为 32 位无符号整数数组，每项 4 字节
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._titles = []
+        # seq -> (规范化正文, 短语匹配用的紧凑形式)
+        self._details = {}
+        # ASCII 单词的 n-gram -> 包含它的索引单词，查询词据此找到可匹配的单词
+        self._word_grams = {}
+
+    def add(self, seq, title, detail=""):
+        """索引一条通知（seq 须等于已索引的条数）"""
+        title = normalize_text(title)
+        detail = normalize_text(detail)[:MAX_DETAIL_CHARS]
+        self._titles.append(_phrase_key(title))
+        if detail:
+            self._details[seq] = (detail, _phrase_key(detail))
+        for term in tokenize(title + "\n" + detail):
+            self._postings_for(term).append(seq)
+
+    def set_detail(self, seq, title, detail):
+        """
+        替换已索引通知的正文（如重访后正文有变化）：只增删标题与新旧正文之间有差异的词项，
+        title 为该通知的原始标题
+        """
+        title = normalize_text(title)
+        detail = normalize_text(detail)[:MAX_DETAIL_CHARS]
+        old = self._details.get(seq, ("", ""))[0]
+        if old == detail:
+            return
+        old_terms = set(tokenize(title + "\n" + old))
+        new_terms = set(tokenize(title + "\n" + detail))
+        for term in old_terms - new_terms:
+            _remove_sorted(self._postings[term], seq)
+        for term in new_terms - old_terms:
+            _insert_sorted(self._postings_for(term), seq)
+        if detail:
+            self._details[seq] = (detail, _phrase_key(detail))
+        else:
+            self._details.pop(seq, None)
+
+    def _postings_for(self, term):
+        """词项的倒排表（不存在则创建；新的 ASCII 单词登记到 n-gram 表）"""
+        plist = self._postings.get(term)
+        if plist is None:
+            plist = self._postings[term] = array("I")
+            if term.isascii():
+                for gram in _word_grams(term):
+                    self._word_grams.setdefault(gram, []).append(term)
+        return plist
+
+    def _matching_words(self, word):
+        """包含 word 的全部索引单词"""
+        if len(word) <= WORD_GRAM:
+            return self._word_grams.get(word, [])
+        grams = [word[i:i + WORD_GRAM] for i in range(len(word) - WORD_GRAM + 1)]
+        rarest = min((self._word_grams.get(g, []) for g in grams), key=len)
+        return [w for w in rarest if word in w]
+
+    def _word_postings(self, word):
+        """包含 word 的全部索引单词的倒排表之并（有序）"""
+        matched = [self._postings[w] for w in self._matching_words(word)]
+        if len(matched) <= 1:
+            return matched[0] if matched else array("I")
+        merged = set()
+        for plist in matched:
+            merged.update(plist)
+        return array("I", sorted(merged))
+
+    def search(self, query, accept=None):
+        """
+        检索包含全部词项的通知，返回按得分倒序的 [(score, seq), ...]。
+        accept: 可选的过滤函数 seq -> bool（用于叠加学校/分类过滤）
+        """
+        bigrams, chars, words = query_terms(query)
+        terms = bigrams + chars + words
+        if not terms:
+            return []
+
+        postings = []
+        for term in bigrams + chars:
+            plist = self._postings.get(term)
+            if not plist:
+                return []
+            postings.append(plist)
+        for word in words:
+            plist = self._word_postings(word)
+            if not plist:
+                return []
+            postings.append(plist)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for plist in postings[1:]:
+            candidates.intersection_update(plist)
+            if not candidates:
+                return []
+
+        phrase = _phrase_key(normalize_text(query))
+        results = []
+        for seq in candidates:
+            if accept is not None and not accept(seq):
+                continue
+            title = self._titles[seq]
+            detail = self._details.get(seq, ("", ""))[1]
+            score = 0.0
+            for term in terms:
+                if term in title:
+                    score += TITLE_TERM_WEIGHT
+                elif term in detail:
+                    score += DETAIL_TERM_WEIGHT
+            # 短语式排序：查询作为连续片段出现时显著加分
+            if phrase and phrase in title:
+                score += TITLE_PHRASE_BONUS
+            elif phrase and phrase in detail:
+                score += DETAIL_PHRASE_BONUS
+            results.append((score, seq))
+
+        # 同分时较新的通知（seq 较大）在前
+        results.sort(reverse=True)
+        return results
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化后端
+可插拔：默认在安装了 orjson 时使用 orjson，否则退回标准库 json；
+可用环境变量 CAMP_JSON_BACKEND（orjson / json）指定。各后端的输出格式一致：
+UTF-8 直出（不转义中文）、紧凑分隔符、保持字典的插入顺序，结果为 bytes。
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj, default):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"),
+                      default=default).encode("utf-8")
+
+
+def _orjson_dumps(obj, default):
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+# 后端名 -> dumps(obj, default) -> bytes
+BACKENDS = {"json": _json_dumps}
+if orjson is not None:
+    BACKENDS["orjson"] = _orjson_dumps
+
+
+def register_backend(name, dumps):
+    """注册其他序列化后端（如 ujson、simdjson 的封装）"""
+    BACKENDS[name] = dumps
+
+
+def default_backend():
+    name = os.environ.get("CAMP_JSON_BACKEND", "")
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"未知的 JSON 后端 {name}，可选: {', '.join(BACKENDS)}")
+        return name
+    return "orjson" if "orjson" in BACKENDS else "json"
+
+
+class Serializer:
+    """
+    default: 遇到后端不认识的对象时调用，返回可序列化的值（如 Notice → dict）
+    """
+
+    def __init__(self, default, backend=None):
+        self.backend = backend or default_backend()
+        self._dumps = BACKENDS[self.backend]
+        self._default = default
+
+    def dumps(self, obj):
+        return self._dumps(obj, self._default)
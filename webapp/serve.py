@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产模式启动脚本
+多个 worker 进程 × 每进程多线程提供服务，通知解析与文件夹扫描结果
+经共享缓存（SQLite 文件）在进程间复用，同一版本的输入只解析一次。
+使用 gunicorn（gthread worker）；未安装时退回单进程多线程的 werkzeug 服务器。
+"""
+
+import argparse
+import os
+import sys
+
+WEBAPP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE = os.path.join(WEBAPP_DIR, ".cache", "shared.sqlite3")
+
+
+def run_gunicorn(args):
+    """以 gunicorn gthread worker 启动"""
+    from gunicorn.app.base import BaseApplication
+
+    class CampApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    CampApplication({
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        # /api/refresh 最长运行 120 秒
+        "timeout": 180,
+        # 不预加载：每个 worker 各自打开 SQLite 连接、各自启动输入轮询线程
+        "preload_app": False,
+    }).run()
+
+
+def run_werkzeug(args):
+    """退回方案：单进程多线程"""
+    from app import app
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="保研夏令营信息展示系统 - 生产模式")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5208)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="worker 进程数")
+    parser.add_argument("--threads", type=int, default=8, help="每个 worker 的线程数")
+    parser.add_argument("--max-streams", type=int,
+                        help="每个 worker 同时保持的推送流上限（默认为线程数的一半），超出的客户端改为轮询")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="共享缓存 SQLite 文件路径")
+    args = parser.parse_args()
+
+    # 必须在导入 app 之前设置，app 在导入时据此打开共享缓存、确定推送流上限
+    os.environ["CAMP_SHARED_CACHE"] = args.cache
+    max_streams = args.max_streams if args.max_streams is not None else max(1, args.threads // 2)
+    os.environ["CAMP_MAX_STREAMS"] = str(max_streams)
+    sys.path.insert(0, WEBAPP_DIR)
+
+    print("=" * 50)
+    print("  保研夏令营信息展示系统（生产模式）")
+    print(f"  访问地址: http://localhost:{args.port}")
+    print(f"  共享缓存: {args.cache}")
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("  [警告] 未安装 gunicorn，退回单进程多线程模式")
+        print("         安装: pip install gunicorn")
+        print("=" * 50)
+        run_werkzeug(args)
+        return
+
+    print(f"  worker: {args.workers} 进程 x {args.threads} 线程，每进程最多 {max_streams} 条推送流")
+    print("=" * 50)
+    run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
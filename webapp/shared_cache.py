@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程共享缓存
+多个 worker 进程共用一个 SQLite（WAL 模式）文件，条目按 (key, version) 存取：
+version 由输入文件的指纹计算，版本一致才算命中，因此无需显式失效。
+另有一个全局 generation 计数器，任何进程经 API 写入后递增，其他进程据此丢弃本地快照。
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+def make_version(*parts):
+    """由若干可 repr 的指纹组合出版本号"""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SharedCache:
+    """基于 SQLite 的跨进程缓存，值以 pickle 存储"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, version TEXT NOT NULL,"
+            " value BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('generation', 0)")
+        conn.commit()
+
+    def _conn(self):
+        """每个线程独立的连接（sqlite3 连接不能跨线程共享）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, version):
+        """版本一致时返回缓存值，否则返回 None"""
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND version = ?", (key, version)
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, key, version, value):
+        """写入（覆盖）一个条目"""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, version, value, updated_at) VALUES (?, ?, ?, ?)",
+            (key, version, blob, time.time()),
+        )
+        conn.commit()
+
+    def get_or_build(self, key, version, build_fn):
+        """命中则返回缓存值，否则调用 build_fn 计算并写入"""
+        value = self.get(key, version)
+        if value is None:
+            value = build_fn()
+            self.put(key, version, value)
+        return value
+
+    def generation(self):
+        """当前全局写入代数"""
+        row = self._conn().execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self):
+        """某进程写入了状态数据，通知其他进程丢弃本地快照；返回新的代数"""
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'generation'")
+            return conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()[0]
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+物化视图
+持有一份预先构建、预先序列化的结果，输入变化时整体重建，请求直接返回已有结果。
+"""
+
+import threading
+import time
+
+
+class Snapshot:
+    """一次构建的结果及其元信息"""
+
+    __slots__ = ("data", "version", "built_at", "build_ms")
+
+    def __init__(self, data, version, built_at, build_ms):
+        self.data = data
+        self.version = version
+        self.built_at = built_at
+        self.build_ms = build_ms
+
+    @property
+    def age(self):
+        """距构建完成的秒数"""
+        return time.time() - self.built_at
+
+    def meta(self):
+        return {
+            "version": self.version,
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.built_at)),
+            "age_seconds": round(self.age, 3),
+            "build_ms": round(self.build_ms, 2),
+        }
+
+
+class MaterializedView:
+    """物化视图：get() 返回当前快照，invalidate() 后的下一次 get() 同步重建"""
+
+    def __init__(self, build_fn):
+        self._build_fn = build_fn
+        self._snapshot = None
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def snapshot(self):
+        """当前快照（可能为 None），不触发构建"""
+        return self._snapshot
+
+    def get(self):
+        snap = self._snapshot
+        if snap is None or self._dirty:
+            return self.rebuild(force=False)
+        return snap
+
+    def seed(self, data, built_at=None):
+        """预填一份已有结果（如热启动快照），直到下一次失效或重建"""
+        with self._lock:
+            self._version += 1
+            self._snapshot = Snapshot(data, self._version, built_at or time.time(), 0.0)
+            self._dirty = False
+
+    def invalidate(self):
+        """标记失效（如本进程写入了某个输入），下一次 get() 时重建"""
+        self._dirty = True
+
+    def rebuild(self, force=True):
+        """重建快照；force=False 时若其他线程已完成重建则直接复用"""
+        with self._lock:
+            if not force and not self._dirty and self._snapshot is not None:
+                return self._snapshot
+            # 先清除标记，构建期间到来的 invalidate() 不会丢失
+            self._dirty = False
+            start = time.perf_counter()
+            try:
+                data = self._build_fn()
+            except Exception:
+                self._dirty = True
+                raise
+            build_ms = (time.perf_counter() - start) * 1000
+            self._version += 1
+            self._snapshot = Snapshot(data, self._version, time.time(), build_ms)
+            return self._snapshot
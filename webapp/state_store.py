@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+手动设置的状态数据存储（SQLite, WAL）
+保存各校的手动状态、截止日期、备注等覆盖值，写入在事务中完成，并发写入安全；
+每次写入记录审计历史。读取走进程内缓存，本进程写入或其他进程提交后自动失效。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# 数据种类
+KIND_STATUS = "status"
+KIND_DEADLINE = "deadline"
+KIND_NOTE = "note"
+KINDS = (KIND_STATUS, KIND_DEADLINE, KIND_NOTE)
+
+
+class StateStore:
+    """
+    覆盖值存储。
+    所有写入通过 apply() 完成：一个事务内应用一组 (kind, school_id, value) 变更，
+    value 为 None 表示删除该覆盖值。
+    """
+
+    def __init__(self, path, migrate_from=None):
+        """
+        path: SQLite 文件路径
+        migrate_from: {kind: 旧 JSON 文件路径}，首次创建时自动导入
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache = None
+        self._cache_data_version = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS overrides (
+                kind TEXT NOT NULL,
+                school_id TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, school_id)
+            );
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                school_id TEXT NOT NULL,
+                old_value TEXT,
+                new_value TEXT,
+                source TEXT NOT NULL,
+                changed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS history_school ON history (school_id, id);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (name, value) VALUES ('version', 0);
+        """)
+        if migrate_from:
+            self._migrate(migrate_from)
+
+    # ---------- 读取 ----------
+
+    def _data_version(self):
+        """其他连接提交后 data_version 会变化（本连接的提交不会）"""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load_locked(self):
+        data_version = self._data_version()
+        if self._cache is None or data_version != self._cache_data_version:
+            cache = {kind: {} for kind in KINDS}
+            for kind, school_id, value in self._conn.execute(
+                    "SELECT kind, school_id, value FROM overrides"):
+                cache.setdefault(kind, {})[school_id] = value
+            self._cache = cache
+            self._cache_data_version = data_version
+        return self._cache
+
+    def get_all(self, kind):
+        """某种覆盖值的 {school_id: value}（返回副本）"""
+        with self._lock:
+            return dict(self._load_locked().get(kind, {}))
+
+    def get(self, kind, school_id, default=None):
+        with self._lock:
+            return self._load_locked().get(kind, {}).get(school_id, default)
+
+    def version(self):
+        """写入版本号，每次提交的写入事务加一，可作为输入指纹"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+
+    def history(self, school_id=None, limit=100):
+        """审计历史（新的在前）"""
+        sql = "SELECT kind, school_id, old_value, new_value, source, changed_at FROM history"
+        params = []
+        if school_id:
+            sql += " WHERE school_id = ?"
+            params.append(school_id)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{
+            "kind": kind,
+            "school_id": sid,
+            "old": old,
+            "new": new,
+            "source": source,
+            "changed_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)),
+        } for kind, sid, old, new, source, ts in rows]
+
+    # ---------- 写入 ----------
+
+    def apply(self, changes, source="api"):
+        """
+        在一个事务中应用一组变更 [(kind, school_id, value), ...]。
+        返回实际发生变化的条目 [(kind, school_id, old, new), ...]
+        """
+        now = time.time()
+        applied = []
+        with self._lock:
+            try:
+                # IMMEDIATE：事务开始即取得写锁，避免多进程读后写的丢失更新
+                self._conn.execute("BEGIN IMMEDIATE")
+                for kind, school_id, value in changes:
+                    if kind not in KINDS:
+                        raise ValueError(f"未知的数据种类: {kind}")
+                    row = self._conn.execute(
+                        "SELECT value FROM overrides WHERE kind = ? AND school_id = ?",
+                        (kind, school_id)).fetchone()
+                    old = row[0] if row else None
+                    if old == value:
+                        continue
+                    if value is None:
+                        self._conn.execute(
+                            "DELETE FROM overrides WHERE kind = ? AND school_id = ?",
+                            (kind, school_id))
+                    else:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO overrides (kind, school_id, value, updated_at)"
+                            " VALUES (?, ?, ?, ?)", (kind, school_id, value, now))
+                    self._conn.execute(
+                        "INSERT INTO history (kind, school_id, old_value, new_value, source, changed_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)", (kind, school_id, old, value, source, now))
+                    applied.append((kind, school_id, old, value))
+                if applied:
+                    self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                # 本连接的提交不会改变 data_version，需主动丢弃缓存
+                self._cache = None
+        return applied
+
+    def set(self, kind, school_id, value, source="api"):
+        """设置单个覆盖值（value 为 None 时删除）"""
+        return self.apply([(kind, school_id, value)], source=source)
+
+    # ---------- 迁移 ----------
+
+    def _migrate(self, migrate_from):
+        """首次使用时从旧的 JSON 文件导入（只导入一次，原文件保留不动）"""
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'migrated'").fetchone()
+        if done:
+            return
+        changes = []
+        for kind, path in migrate_from.items():
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                logging.warning("迁移失败，跳过: %s", path)
+                continue
+            for school_id, value in data.items():
+                if value:
+                    changes.append((kind, school_id, str(value)))
+        self.apply(changes, source="migrate")
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('migrated', 1)")
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""/api/batch：多校修改在一个事务中完成，任一项无效时整批不生效"""
+
+import pytest
+
+SCHOOLS = ("pku_cs", "thu_cs")
+
+
+@pytest.fixture(autouse=True)
+def reset_state(client):
+    yield
+    client.post("/api/batch", json={"changes": [
+        {"school_id": sid, "status": "__auto__", "deadline": "", "note": ""} for sid in SCHOOLS]})
+
+
+def batch(client, *changes):
+    return client.post("/api/batch", json={"changes": list(changes)})
+
+
+def test_applies_all_changes(client):
+    rv = batch(client,
+               {"school_id": "pku_cs", "status": "材料已提交", "note": "等面试"},
+               {"school_id": "thu_cs", "deadline": "2025-06-20"})
+    body = rv.get_json()
+    assert rv.status_code == 200 and body["changed"] == 3
+    assert body["schools"] == [
+        {"id": "pku_cs", "status": "材料已提交", "deadline": "", "note": "等面试"},
+        {"id": "thu_cs", "status": body["schools"][1]["status"], "deadline": "2025-06-20",
+         "note": ""},
+    ]
+    history = client.get("/api/school/pku_cs/history").get_json()
+    assert {h["source"] for h in history[:2]} == {"batch"}
+
+    # 重复提交相同的值不产生变更
+    assert batch(client, {"school_id": "thu_cs", "deadline": "2025-06-20"}).get_json()["changed"] == 0
+
+
+def test_clear_values(client):
+    batch(client, {"school_id": "pku_cs", "status": "已入营", "note": "x"})
+    body = batch(client, {"school_id": "pku_cs", "status": "__auto__", "note": "  "}).get_json()
+    assert body["changed"] == 2 and body["schools"][0]["note"] == ""
+    assert body["schools"][0]["status"] != "已入营"
+
+
+@pytest.mark.parametrize("bad, status", [
+    ({"school_id": "no_such_school", "status": "已入营"}, 404),
+    ({"school_id": "thu_cs"}, 400),
+    ({"school_id": "thu_cs", "deadline": 20250620}, 400),
+    ({"school_id": "thu_cs", "status": " "}, 400),
+    ("thu_cs", 400),
+])
+def test_invalid_entry_rejects_whole_batch(client, bad, status):
+    rv = batch(client, {"school_id": "pku_cs", "note": "不应写入"}, bad)
+    assert rv.status_code == status and "error" in rv.get_json()
+    detail = client.get("/api/school/pku_cs?fields=note").get_json()
+    assert detail == {"note": ""}
+
+
+def test_empty_batch(client):
+    assert client.post("/api/batch", json={"changes": []}).status_code == 400
+    assert client.post("/api/batch", data="not json").status_code == 400
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""变更日志的游标与 /api/changes 增量同步"""
+
+import json
+import os
+
+import pytest
+
+from events import ChangeLog
+
+
+def test_cursor_round_trip():
+    log = ChangeLog()
+    first = log.append("notice", {"n": 1})
+    assert log.parse_cursor(log.cursor(first)) == first
+    assert log.parse_cursor(log.cursor()) == log.last_id
+
+
+@pytest.mark.parametrize("cursor", [None, "", "12345", "abc.12", ".12", "x.y"])
+def test_malformed_cursor(cursor):
+    assert ChangeLog().parse_cursor(cursor) is None
+
+
+def test_cursor_from_other_log_rejected():
+    a, b = ChangeLog(), ChangeLog()
+    b.epoch = a.epoch + "0"
+    assert b.parse_cursor(a.cursor()) is None
+
+
+def test_since_returns_following_events():
+    log = ChangeLog()
+    start = log.last_id
+    ids = [log.append("notice", {"n": i}) for i in range(3)]
+    events, valid = log.since(start)
+    assert valid and [ev.id for ev in events] == ids
+    assert log.since(ids[-1]) == ([], True)
+    events, valid = log.since(ids[0])
+    assert valid and [ev.data["n"] for ev in events] == [1, 2]
+
+
+def test_evicted_or_future_cursor_invalid():
+    log = ChangeLog(capacity=2)
+    start = log.last_id
+    for i in range(5):
+        log.append("notice", {"n": i})
+    assert log.since(start) == ([], False)
+    assert log.since(log.last_id + 1) == ([], False)
+    events, valid = log.since(log.last_id - 2)
+    assert valid and len(events) == 2
+
+
+def test_wait_times_out_without_events():
+    log = ChangeLog()
+    assert log.wait(log.last_id, timeout=0.01) == ([], True)
+
+
+def test_changes_without_cursor_requests_resync(client):
+    body = client.get("/api/changes").get_json()
+    assert body["resync"] is True and body["changes"] == []
+    assert client.get("/api/changes?since=bogus").get_json()["resync"] is True
+    assert client.get(f"/api/changes?since={body['cursor'].split('.')[1]}").get_json()["resync"]
+
+
+def test_appended_notices_visible_immediately(client, add_notices):
+    add_notices("已有通知")
+    cursor = client.get("/api/changes").get_json()["cursor"]
+    before = next(r for r in client.get("/api/schools").get_json() if r["id"] == "pku_cs")
+
+    # 爬虫追加通知后，轮询线程尚未发现变化时立即同步
+    add_notices("2025年优秀大学生夏令营通知")
+    body = client.get(f"/api/changes?since={cursor}").get_json()
+    assert body["resync"] is False
+    kinds = [c["type"] for c in body["changes"]]
+    assert "notice" in kinds and "school" in kinds
+    notice = next(c["data"] for c in body["changes"] if c["type"] == "notice")
+    assert notice["title"] == "2025年优秀大学生夏令营通知"
+    school = next(c["data"] for c in body["changes"] if c["type"] == "school")
+    assert school["notice_count"] == before["notice_count"] + 1
+
+    again = client.get(f"/api/changes?since={body['cursor']}").get_json()
+    assert again["changes"] == [] and again["cursor"] == body["cursor"]
+
+
+def test_status_write_emits_change(client):
+    cursor = client.get("/api/changes").get_json()["cursor"]
+    client.put("/api/school/thu_cs/deadline", json={"deadline": "2025-06-20"})
+    changes = client.get(f"/api/changes?since={cursor}").get_json()["changes"]
+    assert {"type": "deadline", "data": {"school_id": "thu_cs", "value": "2025-06-20"}} in [
+        {k: c[k] for k in ("type", "data")} for c in changes]
+    client.put("/api/school/thu_cs/deadline", json={"deadline": ""})
+
+
+def test_refresh_returns_after_notices_loaded(client, webapp, add_notices, notices_file):
+    add_notices("已有通知")
+    client.get("/api/changes")
+    before = next(r for r in client.get("/api/schools").get_json() if r["id"] == "pku_cs")
+    # 代替爬虫的脚本：追加一条通知
+    line = json.dumps({"title": "刷新得到的通知", "url": "https://cs.pku.edu.cn/refresh",
+                       "date": "2025-06-02", "source": "北京大学 - 计算机学院",
+                       "school_id": "pku_cs", "category": "夏令营"}, ensure_ascii=False) + "\n"
+    with open(webapp.CRAWLER_PY, "w", encoding="utf-8") as f:
+        f.write(f"with open({notices_file!r}, 'a', encoding='utf-8') as f:\n"
+                f"    f.write({line!r})\n")
+    try:
+        assert client.post("/api/refresh").get_json()["success"] is True
+    finally:
+        os.remove(webapp.CRAWLER_PY)
+    after = next(r for r in client.get("/api/schools").get_json() if r["id"] == "pku_cs")
+    assert after["notice_count"] == before["notice_count"] + 1
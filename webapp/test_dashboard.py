@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""看板快照：写入后的读取可见性（本进程与其他 worker 的写入）"""
+
+import pytest
+
+from state_store import KIND_DEADLINE
+
+SCHOOL = "pku_cs"
+
+
+def school_row(client):
+    return next(r for r in client.get("/api/schools").get_json() if r["id"] == SCHOOL)
+
+
+@pytest.fixture(autouse=True)
+def reset_state(client):
+    yield
+    client.put(f"/api/school/{SCHOOL}/status", json={"status": "__auto__"})
+    client.put(f"/api/school/{SCHOOL}/deadline", json={"deadline": ""})
+
+
+def test_put_visible_to_next_read(client):
+    client.put(f"/api/school/{SCHOOL}/status", json={"status": "材料已提交"})
+    assert school_row(client)["status"] == "材料已提交"
+
+    rv = client.put(f"/api/school/{SCHOOL}/status", json={"status": "已入营"})
+    assert rv.get_json()["status"] == "已入营"
+    assert school_row(client)["status"] == "已入营"
+    detail = client.get(f"/api/school/{SCHOOL}?fields=status").get_json()
+    assert detail == {"status": "已入营"}
+    summary = client.get("/api/schools?view=summary").get_json()
+    assert next(r for r in summary if r["id"] == SCHOOL)["status"] == "已入营"
+
+
+def test_batch_visible_to_next_read(client):
+    rv = client.post("/api/batch", json={"changes": [
+        {"school_id": SCHOOL, "status": "已获offer", "deadline": "2025-07-01"}]})
+    assert rv.status_code == 200
+    row = school_row(client)
+    assert (row["status"], row["deadline"]) == ("已获offer", "2025-07-01")
+
+
+def test_write_from_other_worker(client, webapp):
+    school_row(client)
+    # 其他 worker：写入状态存储并递增共享写入代数
+    webapp.state_store.set(KIND_DEADLINE, SCHOOL, "2025-06-15")
+    webapp.shared_cache.bump_generation()
+    assert school_row(client)["deadline"] == "2025-06-15"
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""文件内容哈希索引：增量扫描、重复文件、版本反查与各校材料对照"""
+
+import os
+
+import pytest
+
+from file_index import FileIndex, hash_file
+
+
+def write(base, rel, content, mtime=None):
+    path = os.path.join(base, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    base = str(tmp_path / "data")
+    write(base, "个人资料/简历.pdf", b"cv v2", mtime=2_000_000_000)
+    write(base, "个人资料/成绩单.pdf", b"grades")
+    write(base, "北大/简历.pdf", b"cv v2")
+    write(base, "北大/张教授/陶瓷邮件.md", b"mail a")
+    write(base, "清华/简历.pdf", b"cv v1", mtime=1_900_000_000)
+    write(base, "清华/成绩单-盖章.pdf", b"grades")
+    write(base, "清华/李教授/陶瓷邮件.md", b"mail b")
+    write(base, "清华/.DS_Store", b"hidden")
+    index = FileIndex(base, {"profile": "个人资料", "pku": "北大", "thu": "清华"},
+                      str(tmp_path / "index.sqlite3"), reference="profile",
+                      private_keywords=("陶瓷",))
+    return base, index
+
+
+def test_hash_file_streams_in_chunks(tmp_path):
+    path = write(str(tmp_path), "a.bin", b"x" * 1000)
+    assert hash_file(path, chunk_size=7) == hash_file(path)
+
+
+def test_incremental_scan(tree):
+    base, index = tree
+    first = index.scan()
+    assert (first["files"], first["hashed"], first["removed"]) == (7, 7, 0)
+    assert index.scan()["hashed"] == 0
+
+    write(base, "北大/简历.pdf", b"cv v3")
+    os.remove(os.path.join(base, "清华/成绩单-盖章.pdf"))
+    again = index.scan()
+    assert (again["files"], again["hashed"], again["removed"]) == (6, 1, 1)
+
+
+def test_duplicates_and_lookup(tree):
+    _, index = tree
+    index.scan()
+    groups = {tuple(g["paths"]) for g in index.duplicates()}
+    assert (os.path.join("个人资料", "成绩单.pdf"), os.path.join("清华", "成绩单-盖章.pdf")) in groups
+    copies = index.lookup(path=os.path.join("北大", "简历.pdf"))["copies"]
+    assert {c["owner"] for c in copies} == {"profile", "pku"}
+    versions = index.lookup(name="简历.pdf")["copies"]
+    assert versions[0]["owner"] == "profile" and len(versions) == 3
+    assert index.lookup(path="不存在.pdf") is None
+
+
+def test_document_report(tree):
+    _, index = tree
+    index.scan()
+    docs = {d["name"]: d for d in index.document_report()}
+    # 套磁邮件各校不同，不参与对照
+    assert "陶瓷邮件.md" not in docs
+    cv = docs["简历.pdf"]
+    assert cv["latest"]["path"] == os.path.join("个人资料", "简历.pdf")
+    assert cv["schools"]["pku"]["state"] == "identical"
+    assert cv["schools"]["thu"]["state"] == "outdated"
+    grades = docs["成绩单.pdf"]["schools"]
+    # 改名副本内容相同也算已有
+    assert grades["thu"]["state"] == "identical" and grades["pku"]["state"] == "missing"
+
+
+def test_dedup_endpoint(client):
+    body = client.get("/api/files/dedup").get_json()
+    assert set(body) == {"last_scan", "documents", "duplicates"}
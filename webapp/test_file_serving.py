@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""/api/file 的 ETag、条件请求与 Range 处理"""
+
+import os
+from wsgiref.util import FileWrapper
+
+import pytest
+
+SCHOOL = "sjtu_ai"
+NAME = "招生简章.pdf"
+CONTENT = bytes(range(256)) * 4
+URL = f"/api/file/{SCHOOL}/{NAME}"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def school_file(webapp, data_dir):
+    folder = os.path.join(data_dir, webapp.SCHOOL_FOLDERS[SCHOOL])
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, NAME), "wb") as f:
+        f.write(CONTENT)
+
+
+def test_full_file_with_validators(client):
+    rv = client.get(URL)
+    assert rv.status_code == 200
+    assert rv.data == CONTENT
+    assert rv.headers["Accept-Ranges"] == "bytes"
+    assert rv.headers["Content-Length"] == str(len(CONTENT))
+    assert "no-cache" in rv.headers["Cache-Control"]
+    assert rv.headers["Last-Modified"]
+    etag, weak = rv.get_etag()
+    assert etag and not weak
+
+
+def test_conditional_requests(client):
+    etag = client.get(URL).get_etag()[0]
+    rv = client.get(URL, headers={"If-None-Match": f'"{etag}"'})
+    assert rv.status_code == 304
+    assert rv.data == b""
+    assert rv.get_etag()[0] == etag
+    assert client.get(URL, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_single_range(client):
+    rv = client.get(URL, headers={"Range": "bytes=10-25"})
+    assert rv.status_code == 206
+    assert rv.data == CONTENT[10:26]
+    assert rv.headers["Content-Range"] == f"bytes 10-25/{len(CONTENT)}"
+    assert rv.headers["Content-Length"] == "16"
+
+
+def test_suffix_and_open_ranges(client):
+    assert client.get(URL, headers={"Range": "bytes=-100"}).data == CONTENT[-100:]
+    assert client.get(URL, headers={"Range": "bytes=1000-"}).data == CONTENT[1000:]
+    # 结束位置超出文件时截到末尾
+    rv = client.get(URL, headers={"Range": "bytes=1020-5000"})
+    assert rv.status_code == 206
+    assert rv.data == CONTENT[1020:]
+
+
+def test_unsatisfiable_range(client):
+    rv = client.get(URL, headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert rv.status_code == 416
+    assert rv.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_if_range(client):
+    etag = client.get(URL).get_etag()[0]
+    rv = client.get(URL, headers={"Range": "bytes=0-9", "If-Range": f'"{etag}"'})
+    assert rv.status_code == 206
+    assert rv.data == CONTENT[:10]
+    rv = client.get(URL, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert rv.status_code == 200
+    assert rv.data == CONTENT
+
+
+def test_multi_range_returns_whole_file(client):
+    rv = client.get(URL, headers={"Range": "bytes=0-1,4-5"})
+    assert rv.status_code == 200
+    assert rv.data == CONTENT
+
+
+def test_head(client):
+    rv = client.head(URL, headers={"Range": "bytes=0-9"})
+    assert rv.status_code == 206
+    assert rv.headers["Content-Length"] == "10"
+    assert rv.data == b""
+
+
+def test_range_bounded_with_file_wrapper(client):
+    """wsgiref 的 file_wrapper 会读到文件末尾，Range 响应不能交给它"""
+    environ = {"wsgi.file_wrapper": FileWrapper}
+    rv = client.get(URL, headers={"Range": "bytes=0-15"}, environ_base=environ)
+    assert rv.data == CONTENT[:16]
+    assert client.get(URL, environ_base=environ).data == CONTENT
+
+
+def test_unknown_paths(client):
+    assert client.get(f"/api/file/{SCHOOL}/missing.pdf").status_code == 404
+    assert client.get(f"/api/file/{SCHOOL}/..%2F..%2Fwebapp%2Fapp.py").status_code == 404
+    assert client.get(f"/api/file/no_such_school/{NAME}").status_code == 404
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""notice_index 的排序键、日期区间、游标分页与检索分页"""
+
+import pickle
+
+import pytest
+
+from notice_index import (NoticeIndex, date_bound, decode_cursor, encode_cursor, key_seq,
+                          make_key)
+from notice_record import NO_DATE, Notice, date_to_ordinal
+
+
+def notice(title, date="", school_id="pku_cs", category="夏令营"):
+    return Notice.from_record({"title": title, "url": f"https://example.edu.cn/{title}",
+                               "date": date, "source": "北京大学 - 计算机学院",
+                               "school_id": school_id, "category": category})
+
+
+def make_index():
+    # 同一日期多条、无日期、跨月与跨学校/分类
+    return NoticeIndex([
+        notice("a", "2025-05-31"),
+        notice("b", "2025-06-01"),
+        notice("c", "2025-06-01", category="预推免"),
+        notice("d", ""),
+        notice("e", "2025-06-30", school_id="thu_cs"),
+        notice("f", "2025-07-01"),
+        notice("g", "2025-06-01"),
+        notice("h", ""),
+    ])
+
+
+def titles(items):
+    return [n.title for n in items]
+
+
+def walk(index, limit, **kwargs):
+    """按游标取完全部页"""
+    pages, cursor = [], None
+    while True:
+        page = index.query(cursor=cursor, limit=limit, **kwargs)
+        pages.append(titles(page["items"]))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_key_order_matches_date_then_file_order():
+    day = date_to_ordinal("2025-06-01")
+    assert make_key(day, 1) > make_key(day, 2)
+    assert make_key(day, 9) > make_key(day - 1, 0)
+    assert make_key(NO_DATE, 0) < make_key(1, 0)
+    assert key_seq(make_key(day, 12345)) == 12345
+
+
+def test_cursor_round_trip_and_invalid():
+    key = make_key(date_to_ordinal("2025-06-01"), 7)
+    assert decode_cursor(encode_cursor(key)) == key
+    for bad in ("", "!!!", "bm90IGpzb24", encode_cursor(key)[:-3]):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_date_bound_prefixes():
+    assert date_bound("2025") == date_to_ordinal("2025-01-01")
+    assert date_bound("2025", upper=True) == date_to_ordinal("2025-12-31")
+    assert date_bound("2024-02", upper=True) == date_to_ordinal("2024-02-29")
+    assert date_bound("2025-6-1") == date_to_ordinal("2025-06-01")
+    for bad in ("2025-13", "2025-02-30", "25-01-01", "2025/01/01", "2025-06-01T00"):
+        with pytest.raises(ValueError):
+            date_bound(bad)
+
+
+def test_date_desc_paging_covers_everything_once():
+    index = make_index()
+    pages = walk(index, 3)
+    assert pages == [["f", "e", "b"], ["c", "g", "a"], ["d", "h"]]
+
+
+def test_date_asc_paging():
+    index = make_index()
+    # 升序是降序的严格逆序
+    ascending = sum(walk(index, 3, sort="date_asc"), [])
+    assert ascending == sum(walk(index, 3), [])[::-1]
+
+
+def test_date_range_is_inclusive_and_excludes_undated():
+    index = make_index()
+    page = index.query(date_from="2025-06", date_to="2025-06", limit=50)
+    assert titles(page["items"]) == ["e", "b", "c", "g"]
+    assert page["total"] == 4
+    page = index.query(date_from="2025-06-01", date_to="2025-06-01", limit=50)
+    assert titles(page["items"]) == ["b", "c", "g"]
+    assert index.query(date_from="2025-07-02", limit=50)["total"] == 0
+
+
+def test_paging_within_range_and_filters():
+    index = make_index()
+    pages = walk(index, 2, school_id="pku_cs", category="夏令营", date_from="2025-06")
+    assert pages == [["f", "b"], ["g"]]
+
+
+def test_cursor_survives_appends():
+    index = make_index()
+    first = index.query(limit=3)
+    index.add([notice("new", "2025-08-01"), notice("late", "2025-05-31")])
+    rest = index.query(cursor=first["next_cursor"], limit=50)
+    assert titles(rest["items"]) == ["c", "g", "a", "late", "d", "h"]
+
+
+def test_search_cursor_paging():
+    index = NoticeIndex([notice(f"夏令营通知{i}", "2025-06-01") for i in range(7)])
+    seen, cursor = [], None
+    while True:
+        page = index.search("夏令营", limit=3, cursor=cursor)
+        seen += titles(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == titles(index.search("夏令营", limit=50)["items"])
+    assert len(seen) == 7 == page["total"]
+    with pytest.raises(ValueError):
+        index.search("夏令营", cursor="bad")
+
+
+def test_search_filters_applied_before_paging():
+    index = make_index()
+    assert titles(index.search("c", category="预推免")["items"]) == ["c"]
+    assert index.search("e", school_id="pku_cs")["total"] == 0
+
+
+def test_search_includes_details():
+    records = [notice("夏令营通知", "2025-06-01"), notice("预推免通知", "2025-06-02")]
+    index = NoticeIndex(records, details={records[0].url: "需提交成绩单与推荐信"})
+    assert titles(index.search("成绩单")["items"]) == ["夏令营通知"]
+
+    assert titles(index.search("截止延长")["items"]) == []
+    assert index.set_details({records[1].url: "报名截止延长至6月30日"}) == 1
+    # 正文更新后缓存的检索结果作废
+    assert titles(index.search("截止延长")["items"]) == ["预推免通知"]
+
+
+def test_pickle_round_trip():
+    index = make_index()
+    index.search("a")
+    restored = pickle.loads(pickle.dumps(index))
+    assert titles(restored.search("a")["items"]) == ["a"]
+    assert restored.query(limit=50)["total"] == len(index)
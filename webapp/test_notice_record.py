@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""通知的紧凑表示：字段往返、日期序数与字符串驻留"""
+
+import pickle
+
+import pytest
+
+from notice_record import NO_DATE, Notice
+
+
+def record(**fields):
+    base = {"title": "2025年夏令营通知", "url": "https://cs.pku.edu.cn/camp", "date": "2025-06-01",
+            "source": "北京大学 - 计算机学院", "school_id": "pku_cs", "category": "夏令营"}
+    base.update(fields)
+    return base
+
+
+def fresh(text):
+    """运行时构造的字符串（不是编译期常量，默认不驻留）"""
+    return "".join(list(text))
+
+
+def test_round_trip():
+    assert Notice.from_record(record()).to_dict() == record()
+    empty = Notice.from_record(record(date=""))
+    assert empty.date == NO_DATE and empty.to_dict()["date"] == ""
+
+
+def test_date_ordinals_sort_like_text():
+    dates = ["2025-06-10", "", "2024-12-31", "2025-06-01"]
+    notices = [Notice.from_record(record(date=d)) for d in dates]
+    assert [n.date_text for n in sorted(notices, key=lambda n: n.date)] == sorted(dates)
+
+
+def test_bad_date_rejected():
+    with pytest.raises(ValueError):
+        Notice.from_record(record(date="2025-13-01"))
+
+
+def test_repeated_strings_shared():
+    a = Notice.from_record(record(source=fresh("北京大学 - 计算机学院"), school_id=fresh("pku_cs")))
+    b = Notice.from_record(record(source=fresh("北京大学 - 计算机学院"), school_id=fresh("pku_cs")))
+    assert a.source is b.source and a.school_id is b.school_id
+    assert not hasattr(a, "__dict__")
+
+
+def test_pickle_keeps_sharing():
+    notices = [Notice.from_record(record(url=f"https://cs.pku.edu.cn/{i}")) for i in range(2)]
+    restored = pickle.loads(pickle.dumps(notices))
+    assert [n.to_dict() for n in restored] == [n.to_dict() for n in notices]
+    assert restored[0].source is notices[0].source
+    assert restored[0].date == notices[0].date
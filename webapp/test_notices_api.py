@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""/api/notices 的查询、检索与游标分页"""
+
+import pytest
+
+
+@pytest.fixture
+def notices(add_notices):
+    add_notices(
+        {"title": "关于举办2025年优秀大学生夏令营的通知", "url": "https://cs.pku.edu.cn/camp",
+         "date": "2025-05-20", "source": "北京大学 - 计算机学院", "school_id": "pku_cs",
+         "category": "夏令营"},
+        {"title": "2025年推免生预报名通知", "url": "https://cs.pku.edu.cn/tm",
+         "date": "2025-06-10", "source": "北京大学 - 计算机学院", "school_id": "pku_cs",
+         "category": "预推免"},
+        {"title": "清华大学计算机系夏令营报名", "url": "https://cs.tsinghua.edu.cn/camp",
+         "date": "2025-06-01", "source": "清华大学 - 计算机系通知", "school_id": "thu_cs",
+         "category": "夏令营"},
+    )
+
+
+def test_query_cursor_pages(client, notices):
+    rv = client.get("/api/notices/query?limit=2")
+    body = rv.get_json()
+    assert [n["date"] for n in body["items"]] == ["2025-06-10", "2025-06-01"]
+    rest = client.get(f"/api/notices/query?limit=2&cursor={body['next_cursor']}").get_json()
+    assert [n["date"] for n in rest["items"]] == ["2025-05-20"]
+    assert rest["next_cursor"] is None
+    asc = client.get("/api/notices/query?sort=date_asc").get_json()
+    assert [n["date"] for n in asc["items"]] == ["2025-05-20", "2025-06-01", "2025-06-10"]
+    ranged = client.get("/api/notices/query?date_from=2025-06&school_id=pku_cs").get_json()
+    assert ranged["total"] == 1
+    assert client.get("/api/notices/query?date_from=2025-13").status_code == 400
+    assert client.get("/api/notices/query?cursor=bad").status_code == 400
+
+
+def search(client, **params):
+    rv = client.get("/api/notices/search", query_string=params)
+    assert rv.status_code == 200, rv.get_json()
+    return rv.get_json()
+
+
+def test_search_filters(client, notices):
+    assert search(client, q="夏令营")["total"] == 2
+    body = search(client, q="夏令营", school_id="thu_cs")
+    assert [n["url"] for n in body["items"]] == ["https://cs.tsinghua.edu.cn/camp"]
+    assert search(client, q="通知", category="预推免")["total"] == 1
+    assert search(client, q="夏")["total"] == 2
+
+
+def test_search_cursor_pages(client, notices):
+    first = search(client, q="2025", limit=1)
+    assert first["total"] == 2 and first["next_cursor"]
+    second = search(client, q="2025", limit=1, cursor=first["next_cursor"])
+    assert second["next_cursor"] is None
+    assert {first["items"][0]["url"], second["items"][0]["url"]} == {
+        "https://cs.pku.edu.cn/camp", "https://cs.pku.edu.cn/tm"}
+
+
+def test_search_bad_requests(client, notices):
+    assert client.get("/api/notices/search").status_code == 400
+    assert client.get("/api/notices/search?q=夏令营&cursor=bad").status_code == 400
+
+
+def test_search_detail_text(client, notices, add_details):
+    assert search(client, q="成绩单")["total"] == 0
+    add_details({"https://cs.pku.edu.cn/camp": "报名材料：成绩单、推荐信两封"})
+    body = search(client, q="成绩单")
+    assert [n["url"] for n in body["items"]] == ["https://cs.pku.edu.cn/camp"]
+    # 重访后正文变化
+    add_details({"https://cs.pku.edu.cn/camp": "报名材料：成绩单、英语成绩证明"})
+    assert search(client, q="推荐信")["total"] == 0
+    assert search(client, q="英语成绩")["total"] == 1
+
+
+def test_corrupt_store_line_skipped(client, add_notices, notices_file):
+    add_notices("2025年夏令营通知")
+    # 爬虫写入中途被终止留下的半行
+    with open(notices_file, "a", encoding="utf-8") as f:
+        f.write('{"title": "写了一半\n')
+    add_notices("2025年推免通知")
+    client.get("/api/changes")
+    rv = client.get("/api/notices/search", query_string={"q": "2025"})
+    assert rv.status_code == 200
+    assert rv.get_json()["total"] == 2
+    row = next(r for r in client.get("/api/schools").get_json() if r["id"] == "pku_cs")
+    assert row["notice_count"] == 2
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""/api/professors 的全局导师索引与按回复时间的不活跃筛选"""
+
+import os
+import shutil
+import time
+
+import pytest
+
+SCHOOL = "thu_cs"
+DAY = 86400
+
+
+@pytest.fixture(scope="module")
+def professors(webapp, data_dir):
+    """导师目录：{导师: [(文件名, 几天前修改)]}"""
+    layout = {
+        "甲教授": [("陶瓷邮件.md", 30), ("第二封邮件.md", 1)],
+        "乙教授": [("陶瓷邮件.md", 30), ("回复.md", 2)],
+        "丙教授": [("陶瓷邮件.md", 3)],
+        "丁教授": [("陶瓷邮件.md", 40), ("reply.md", 20)],
+    }
+    folder = os.path.join(data_dir, webapp.SCHOOL_FOLDERS[SCHOOL])
+    now = time.time()
+    for name, files in layout.items():
+        os.makedirs(os.path.join(folder, name))
+        for fn, days in files:
+            path = os.path.join(folder, name, fn)
+            open(path, "w").close()
+            os.utime(path, (now - days * DAY, now - days * DAY))
+    webapp.input_watcher.poll()
+    yield layout
+    shutil.rmtree(folder)
+    webapp.input_watcher.poll()
+
+
+def names(client, **params):
+    rv = client.get("/api/professors", query_string={"school_id": SCHOOL, **params})
+    assert rv.status_code == 200, rv.get_json()
+    return [p["name"] for p in rv.get_json()["items"]]
+
+
+def test_index_rows(client, professors):
+    rows = {p["name"]: p for p in client.get(
+        "/api/professors", query_string={"school_id": SCHOOL}).get_json()["items"]}
+    assert set(rows) == set(professors)
+    assert rows["乙教授"]["status"] == "已回复" and rows["丙教授"]["status"] == "待发送"
+    assert rows["甲教授"]["first_contact"] < rows["甲教授"]["last_activity"]
+    assert rows["甲教授"]["last_reply"] == ""
+    # 默认按最近活动倒序
+    assert names(client) == ["甲教授", "乙教授", "丙教授", "丁教授"]
+
+
+def test_inactive_days_uses_replies(client, professors):
+    # 甲教授近期有文件活动但一直未回复，按首次联系计已不活跃
+    assert sorted(names(client, inactive_days=14)) == ["丁教授", "甲教授"]
+    assert names(client, inactive_days=14, status="待发送") == ["甲教授"]
+    assert sorted(names(client, inactive_days=0)) == sorted(professors)
+
+
+def test_bad_params(client, professors):
+    assert client.get("/api/professors?inactive_days=x").status_code == 400
+    assert client.get("/api/professors?sort=age").status_code == 400
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""请求性能剖析：路由统计、阶段耗时、慢请求采样与 /api/debug/perf"""
+
+import time
+
+from profiling import BACKGROUND, Profiler
+
+
+def request(profiler, route, sleep_ms=0, phases=()):
+    profiler.begin_request()
+    for name in phases:
+        with profiler.phase(name):
+            time.sleep(sleep_ms / 1000)
+    profiler.end_request(route, f"/{route}", 200)
+
+
+def test_disabled_is_noop():
+    profiler = Profiler(enabled=False)
+    request(profiler, "GET /a", phases=["parse_notices"])
+    assert profiler.report()["routes"] == {}
+
+
+def test_route_stats_and_phases():
+    profiler = Profiler(enabled=True, slow_ms=10_000, sample_rate=0)
+    for _ in range(3):
+        request(profiler, "GET /a", phases=["fs_scan", "fs_scan", "status"])
+    route = profiler.report()["routes"]["GET /a"]
+    assert route["count"] == 3 and sum(route["histogram"].values()) == 3
+    assert route["p50_ms"] <= route["p99_ms"] <= route["max_ms"]
+    # 同一请求内的同名阶段合并计时
+    assert route["phases"]["fs_scan"]["count"] == 3
+    assert route["phases"]["status"]["count"] == 3
+
+
+def test_phase_outside_request_counts_as_background():
+    profiler = Profiler(enabled=True)
+    with profiler.phase("parse_notices"):
+        pass
+    assert "parse_notices" in profiler.report()["routes"][BACKGROUND]["phases"]
+
+
+def test_slow_requests_keep_profile():
+    profiler = Profiler(enabled=True, slow_ms=5, sample_rate=1.0, keep_slow=2)
+    request(profiler, "GET /fast")
+    for _ in range(3):
+        request(profiler, "GET /slow", sleep_ms=10, phases=["parse_notices"])
+    slow = profiler.report()["slow_requests"]
+    assert len(slow) == 2 and {s["route"] for s in slow} == {"GET /slow"}
+    assert slow[0]["profile"] and "parse_notices" in slow[0]["phases"]
+    profiler.reset()
+    assert profiler.report()["routes"] == {} and profiler.report()["slow_requests"] == []
+
+
+def test_debug_endpoint(client, webapp, monkeypatch):
+    assert client.get("/api/debug/perf").status_code == 404
+    monkeypatch.setattr(webapp, "profiler", Profiler(enabled=True, sample_rate=0))
+    client.get("/api/schools")
+    client.get("/api/school/no_such_school")
+    report = client.get("/api/debug/perf").get_json()
+    assert report["routes"]["GET /api/schools"]["count"] == 1
+    assert report["routes"]["GET /api/school/<school_id>"]["count"] == 1
+    assert client.delete("/api/debug/perf").get_json()["success"] is True
+    # 清空后只剩清空请求本身
+    assert list(client.get("/api/debug/perf").get_json()["routes"]) == ["DELETE /api/debug/perf"]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""fields/include 字段投影与可插拔的 JSON 序列化后端"""
+
+import json
+
+import pytest
+
+import serializer
+from notice_record import Notice
+
+FIELDS = ("id", "name", "files", "links")
+COLLECTIONS = ("files", "links")
+
+
+def parse(webapp, **args):
+    return webapp.parse_projection(args, FIELDS, COLLECTIONS)
+
+
+def test_parse_projection(webapp):
+    assert parse(webapp) == (None, {})
+    assert parse(webapp, fields="name,id") == (("id", "name"), {})
+    assert parse(webapp, include="files") == (("id", "name", "files"), {})
+    keys, nested = parse(webapp, fields="id,files.name,files.meta.size")
+    assert keys == ("id", "files") and nested == {"files": {"name": True, "meta": {"size": True}}}
+    # 同时要了整个集合时，子字段无效
+    assert parse(webapp, fields="files.name,files") == (("files",), {})
+    with pytest.raises(ValueError):
+        parse(webapp, fields="bogus")
+    with pytest.raises(ValueError):
+        parse(webapp, include="name")
+
+
+def test_project_converts_notices(webapp):
+    notice = Notice.from_record({"title": "夏令营", "url": "https://a", "date": "2025-06-01",
+                                 "source": "北京大学", "school_id": "pku_cs", "category": "夏令营"})
+    assert webapp.project_items([notice], ("title", "date"), {}) == [
+        {"title": "夏令营", "date": "2025-06-01"}]
+    rows = [{"id": 1, "files": [{"name": "a", "size": 3}]}]
+    assert webapp.project_items(rows, ("files",), {"files": {"name": True}}) == [
+        {"files": [{"name": "a"}]}]
+
+
+def test_schools_projection(client):
+    rows = client.get("/api/schools?fields=id,status").get_json()
+    assert rows and all(set(r) == {"id", "status"} for r in rows)
+    rows = client.get("/api/schools?include=links").get_json()
+    assert "links" in rows[0] and "latest_notice" not in rows[0] and "note" in rows[0]
+    rows = client.get("/api/schools?fields=id,links.url").get_json()
+    assert all(set(link) <= {"url"} for r in rows for link in r["links"])
+    assert client.get("/api/schools?fields=bogus").status_code == 400
+    assert client.get("/api/schools?include=note").status_code == 400
+
+
+def test_detail_projection(client, webapp, add_notices):
+    add_notices("2025年夏令营通知")
+    client.get("/api/changes")
+    full = client.get("/api/school/pku_cs").get_json()
+    assert list(full) == list(webapp.SCHOOL_DETAIL_FIELDS)
+    body = client.get("/api/school/pku_cs?fields=notices.title,status").get_json()
+    assert list(body) == ["status", "notices"]
+    assert body["notices"] == [{"title": n["title"]} for n in full["notices"]]
+    assert body["status"] == full["status"]
+    assert client.get("/api/school/pku_cs?fields=nope").status_code == 400
+
+
+def test_notices_projection(client, add_notices):
+    add_notices("2025年夏令营通知")
+    assert client.get("/api/notices?fields=title,url").get_json() == [
+        {"title": "2025年夏令营通知", "url": "https://cs.pku.edu.cn/2025年夏令营通知"}]
+    page = client.get("/api/notices/query?fields=date").get_json()
+    assert page["items"] == [{"date": "2025-06-01"}]
+    assert client.get("/api/notices/query?fields=body").status_code == 400
+
+
+@pytest.mark.parametrize("backend", sorted(serializer.BACKENDS))
+def test_backends_agree(backend):
+    data = {"学校": "北大", "n": [1, 2.5, None, True], "nested": {"b": 1, "a": 2}}
+    out = serializer.Serializer(lambda o: str(o), backend=backend).dumps(data)
+    assert isinstance(out, bytes)
+    assert out == serializer._json_dumps(data, None)
+    assert serializer.Serializer(lambda o: o.to_dict(), backend=backend).dumps(
+        [Notice("t", "u", 0, "s", "x", "c")]) == json.dumps(
+        [{"title": "t", "url": "u", "date": "", "source": "s", "school_id": "x", "category": "c"}],
+        separators=(",", ":")).encode()
+
+
+def test_backend_from_env(monkeypatch):
+    monkeypatch.setenv("CAMP_JSON_BACKEND", "json")
+    assert serializer.default_backend() == "json"
+    monkeypatch.setenv("CAMP_JSON_BACKEND", "simdjson")
+    with pytest.raises(ValueError):
+        serializer.default_backend()
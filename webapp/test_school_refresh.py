@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""单校刷新：按注册表的监控目标决定是否启动爬虫，并只抓取该校"""
+
+import json
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def fake_crawler(webapp, data_dir):
+    """代替爬虫的脚本：记录命令行参数"""
+    argv_file = os.path.join(data_dir, "crawler_argv.json")
+    with open(webapp.CRAWLER_PY, "w", encoding="utf-8") as f:
+        f.write(f"import json, sys\njson.dump(sys.argv[1:], open({argv_file!r}, 'w'))\n")
+    yield argv_file
+    os.remove(webapp.CRAWLER_PY)
+    if os.path.exists(argv_file):
+        os.remove(argv_file)
+
+
+def test_refresh_runs_crawler_for_school(client, fake_crawler):
+    rv = client.post("/api/school/pku_cs/refresh")
+    assert rv.get_json()["success"] is True
+    with open(fake_crawler, encoding="utf-8") as f:
+        assert json.load(f) == ["--school-id", "pku_cs"]
+
+
+def test_school_without_targets(client, fake_crawler):
+    assert client.post("/api/school/fudan/refresh").status_code == 404
+    assert client.post("/api/school/no_such_school/refresh").status_code == 404
+    assert not os.path.exists(fake_crawler)
+
+
+def test_target_check_does_not_import_crawler(client, webapp):
+    sys.modules.pop("crawler", None)
+    assert webapp._has_crawl_targets("thu_cs")
+    assert "crawler" not in sys.modules
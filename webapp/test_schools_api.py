@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""/api/schools 的分页、排序与概要模式"""
+
+import pytest
+
+
+@pytest.fixture
+def deadlines(client):
+    client.post("/api/batch", json={"changes": [
+        {"school_id": "thu_cs", "deadline": "2025-06-20"},
+        {"school_id": "pku_cs", "deadline": "2025-05-30"}]})
+    yield
+    client.post("/api/batch", json={"changes": [
+        {"school_id": sid, "deadline": ""} for sid in ("thu_cs", "pku_cs")]})
+
+
+def page(client, **params):
+    rv = client.get("/api/schools", query_string=params)
+    assert rv.status_code == 200, rv.get_json()
+    return rv.get_json()
+
+
+def test_unpaged_list_keeps_registry_order(client, webapp):
+    rows = page(client)
+    assert [r["id"] for r in rows] == list(webapp.SCHOOL_INFO)
+    assert {"links", "latest_notice", "notice_count", "professor_count"} <= set(rows[0])
+
+
+def test_pages_cover_all_schools(client, webapp):
+    ids = []
+    offset = 0
+    while True:
+        body = page(client, limit=5, offset=offset)
+        assert body["total"] == len(webapp.SCHOOL_INFO) and body["limit"] == 5
+        if not body["items"]:
+            break
+        ids += [r["id"] for r in body["items"]]
+        offset += 5
+    assert ids == list(webapp.SCHOOL_INFO)
+
+
+def test_sort_missing_values_last(client, deadlines):
+    asc = [r["id"] for r in page(client, sort="deadline", limit=200)["items"]]
+    assert asc[:2] == ["pku_cs", "thu_cs"]
+    desc = [r["id"] for r in page(client, sort="-deadline", limit=200)["items"]]
+    # 无截止日期的学校无论升降序都在最后
+    assert desc[:2] == ["thu_cs", "pku_cs"] and set(asc[2:]) == set(desc[2:])
+
+
+def test_summary_view(client, webapp):
+    summary = page(client, view="summary")
+    assert set(summary[0]) == set(webapp.SCHOOL_SUMMARY_FIELDS)
+    paged = page(client, view="summary", limit=3, sort="name")
+    assert len(paged["items"]) == 3 and set(paged["items"][0]) == set(webapp.SCHOOL_SUMMARY_FIELDS)
+
+
+@pytest.mark.parametrize("query", [
+    "sort=bogus", "limit=x", "view=compact", "view=summary&fields=id",
+])
+def test_bad_requests(client, query):
+    assert client.get(f"/api/schools?{query}").status_code == 400
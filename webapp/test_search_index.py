@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""search_index 的分词与检索"""
+
+from search_index import MAX_DETAIL_CHARS, SearchIndex, query_terms, tokenize
+
+TITLES = [
+    "2025年夏令营入营名单公示",
+    "计算机学院2025年预推免通知",
+    "Summer Camp 2025 Application",
+    "关于举办优秀大学生夏令营的通知",
+    "博士研究生招生简章",
+]
+
+
+def make_index(titles=TITLES):
+    index = SearchIndex()
+    for seq, title in enumerate(titles):
+        index.add(seq, title)
+    return index
+
+
+def found(index, query):
+    return sorted(seq for _, seq in index.search(query))
+
+
+def test_tokenize_bigrams_chars_and_words():
+    assert tokenize("夏令营 Summer２０２５") == ["夏令", "令营", "夏", "令", "营", "summer2025"]
+    assert tokenize("年") == ["年"]
+
+
+def test_query_terms_split():
+    assert query_terms("2025年 夏令营") == (["夏令", "令营"], ["年"], ["2025"])
+
+
+def test_single_cjk_char():
+    index = make_index()
+    assert found(index, "夏") == [0, 3]
+    assert found(index, "博") == [4]
+    assert found(index, "鲸") == []
+
+
+def test_isolated_char_within_longer_run():
+    index = make_index()
+    assert found(index, "2025年 夏令营") == [0]
+    assert found(index, "年 预推免") == [1]
+
+
+def test_partial_ascii_word():
+    index = make_index()
+    assert found(index, "sum") == [2]
+    assert found(index, "CAMP") == [2]
+    assert found(index, "app 202") == [2]
+    assert found(index, "xyz") == []
+
+
+def test_all_terms_required():
+    index = make_index()
+    assert found(index, "夏令营") == [0, 3]
+    assert found(index, "夏令营 名单") == [0]
+    assert found(index, "夏令营 简章") == []
+
+
+def test_phrase_ranks_first():
+    index = make_index(["夏令营活动 通知", "通知 夏令营活动", "夏令营通知"])
+    hits = index.search("夏令营通知")
+    assert hits[0][1] == 2
+
+
+def test_accept_filter():
+    index = make_index()
+    assert [seq for _, seq in index.search("夏", accept=lambda seq: seq != 0)] == [3]
+
+
+def test_partial_word_inside_longer_token():
+    index = make_index(["Summer2025 camp", "summercamp", "AI forum"])
+    assert found(index, "2025") == [0]
+    assert found(index, "mmerca") == [1]
+    assert found(index, "ai") == [2]
+    assert found(index, "i") == [2]
+
+
+def test_detail_text_searchable_and_ranked_below_title():
+    index = SearchIndex()
+    index.add(0, "关于举办2025年优秀大学生夏令营的通知", "报名截止时间：6月20日，需提交成绩单与推荐信")
+    index.add(1, "推荐信模板下载")
+    assert found(index, "成绩单") == [0]
+    assert [seq for _, seq in index.search("推荐信")] == [1, 0]
+
+
+def test_set_detail_replaces_terms():
+    index = SearchIndex()
+    index.add(0, "夏令营通知", "报名截止 6月20日")
+    index.add(1, "预推免通知")
+    index.set_detail(0, "夏令营通知", "报名截止延长至 6月30日")
+    assert found(index, "延长") == [0]
+    assert found(index, "20日") == []
+    # 标题中的词项不受正文替换影响
+    index.set_detail(0, "夏令营通知", "")
+    assert found(index, "夏令营") == [0]
+    assert found(index, "延长") == []
+    index.set_detail(1, "预推免通知", "接收推免生 10 名")
+    assert found(index, "推免生") == [1]
+    assert found(index, "通知") == [0, 1]
+
+
+def test_detail_capped():
+    index = SearchIndex()
+    index.add(0, "通知", "正" * MAX_DETAIL_CHARS + "尾部内容")
+    assert found(index, "尾部") == []
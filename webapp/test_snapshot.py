@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""物化视图：失效后才重建，并发请求只构建一次，构建失败不留下空快照"""
+
+import threading
+
+import pytest
+
+from snapshot import MaterializedView
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"n": self.calls}
+
+
+def test_built_once_until_invalidated():
+    build = Counter()
+    view = MaterializedView(build)
+    assert view.snapshot is None
+    first = view.get()
+    assert first.data == {"n": 1} and view.get() is first
+    view.invalidate()
+    second = view.get()
+    assert second.data == {"n": 2} and second.version == first.version + 1
+    assert set(second.meta()) == {"version", "built_at", "age_seconds", "build_ms"}
+
+
+def test_seed_until_invalidated():
+    build = Counter()
+    view = MaterializedView(build)
+    view.seed({"n": 0})
+    assert view.get().data == {"n": 0} and build.calls == 0
+    view.invalidate()
+    assert view.get().data == {"n": 1}
+
+
+def test_rebuild_without_force_reuses_fresh_snapshot():
+    build = Counter()
+    view = MaterializedView(build)
+    snap = view.get()
+    assert view.rebuild(force=False) is snap
+    assert view.rebuild().data == {"n": 2}
+
+
+def test_concurrent_gets_build_once():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_build():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return len(calls)
+
+    view = MaterializedView(slow_build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(view.get().data)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    started.wait(5)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == [1, 1, 1, 1] and len(calls) == 1
+
+
+def test_failed_build_retried():
+    outcomes = [RuntimeError("输入文件损坏"), {"ok": True}]
+
+    def build():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    view = MaterializedView(build)
+    with pytest.raises(RuntimeError):
+        view.get()
+    assert view.get().data == {"ok": True}
+
+
+def test_dashboard_rebuilt_only_when_inputs_change(client, webapp, add_notices):
+    client.get("/api/schools")
+    version = client.get("/api/dashboard/meta").get_json()["version"]
+    client.get("/api/schools")
+    client.get("/api/school/pku_cs")
+    assert client.get("/api/dashboard/meta").get_json()["version"] == version
+
+    add_notices("2025年优秀大学生夏令营通知")
+    webapp.input_watcher.poll()
+    assert client.get("/api/dashboard/meta").get_json()["version"] > version
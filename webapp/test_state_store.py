@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""状态存储：旧 JSON 迁移、WAL、事务与跨连接的缓存失效"""
+
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from state_store import KIND_DEADLINE, KIND_NOTE, KIND_STATUS, StateStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "state.sqlite3")
+
+
+def test_migrates_legacy_json_once(tmp_path, db):
+    status = tmp_path / "school_status.json"
+    status.write_text(json.dumps({"pku_cs": "已入营", "thu_cs": ""}, ensure_ascii=False),
+                      encoding="utf-8")
+    deadlines = tmp_path / "school_deadlines.json"
+    deadlines.write_text("{损坏", encoding="utf-8")
+    migrate = {KIND_STATUS: str(status), KIND_DEADLINE: str(deadlines)}
+
+    store = StateStore(db, migrate_from=migrate)
+    assert store.get_all(KIND_STATUS) == {"pku_cs": "已入营"}
+    assert store.get_all(KIND_DEADLINE) == {}
+    assert store.history()[0]["source"] == "migrate"
+
+    # 迁移只做一次：之后的修改不会被旧文件覆盖
+    store.set(KIND_STATUS, "pku_cs", None)
+    assert StateStore(db, migrate_from=migrate).get_all(KIND_STATUS) == {}
+
+
+def test_wal_mode(db):
+    StateStore(db)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_apply_reports_changes_and_bumps_version(db):
+    store = StateStore(db)
+    version = store.version()
+    applied = store.apply([(KIND_STATUS, "pku_cs", "已入营"), (KIND_NOTE, "pku_cs", "备注")])
+    assert applied == [(KIND_STATUS, "pku_cs", None, "已入营"), (KIND_NOTE, "pku_cs", None, "备注")]
+    assert store.version() == version + 1
+    # 值未变化时不记历史、不递增版本
+    assert store.set(KIND_STATUS, "pku_cs", "已入营") == []
+    assert store.version() == version + 1
+    assert [h["new"] for h in store.history("pku_cs")] == ["备注", "已入营"]
+
+
+def test_failed_transaction_rolls_back(db):
+    store = StateStore(db)
+    with pytest.raises(ValueError):
+        store.apply([(KIND_STATUS, "pku_cs", "已入营"), ("bogus", "pku_cs", "x")])
+    assert store.get(KIND_STATUS, "pku_cs") is None
+    assert store.history() == []
+
+
+def test_other_connection_commit_invalidates_cache(db):
+    a, b = StateStore(db), StateStore(db)
+    assert a.get(KIND_DEADLINE, "thu_cs") is None
+    b.set(KIND_DEADLINE, "thu_cs", "2025-06-20")
+    assert a.get(KIND_DEADLINE, "thu_cs") == "2025-06-20"
+
+
+def test_concurrent_writers_lose_nothing(db):
+    stores = [StateStore(db) for _ in range(4)]
+
+    def write(i, store):
+        for j in range(10):
+            store.set(KIND_NOTE, f"school_{i}_{j}", str(j))
+
+    threads = [threading.Thread(target=write, args=(i, s)) for i, s in enumerate(stores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(stores[0].get_all(KIND_NOTE)) == 40
+    assert stores[0].version() == 40
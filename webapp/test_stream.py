@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""/api/stream 推送流：事件格式、Last-Event-ID 续传与每进程的连接上限"""
+
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def two_slots(webapp, monkeypatch):
+    monkeypatch.setattr(webapp, "_stream_slots", threading.BoundedSemaphore(2))
+
+
+def read_until(rv, marker):
+    text = ""
+    for chunk in rv.response:
+        text += chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        if marker in text:
+            return text
+    raise AssertionError(text)
+
+
+def test_stream_replays_events_after_last_event_id(client, webapp, two_slots):
+    cursor = client.get("/api/changes").get_json()["cursor"]
+    webapp.change_log.append("note", {"school_id": "pku_cs", "value": "推送测试"})
+    rv = client.get("/api/stream", headers={"Last-Event-ID": cursor}, buffered=False)
+    try:
+        assert rv.status_code == 200 and rv.mimetype == "text/event-stream"
+        text = read_until(rv, "推送测试")
+        assert text.startswith("retry: 3000")
+        assert "event: note\n" in text
+    finally:
+        rv.close()
+
+
+def test_invalid_last_event_id_resyncs(client, two_slots):
+    rv = client.get("/api/stream", headers={"Last-Event-ID": "bogus.1"}, buffered=False)
+    try:
+        assert "event: resync" in read_until(rv, "event: resync")
+    finally:
+        rv.close()
+
+
+def test_streams_capped_per_process(client, two_slots):
+    streams = [client.get("/api/stream", buffered=False) for _ in range(2)]
+    assert [rv.status_code for rv in streams] == [200, 200]
+    over = client.get("/api/stream")
+    assert over.status_code == 503
+    assert over.get_json()["poll"] == "/api/changes"
+    assert over.headers["Retry-After"]
+    # 普通请求不受影响
+    assert client.get("/api/changes").status_code == 200
+
+    # 连接关闭后归还名额
+    streams[0].close()
+    again = client.get("/api/stream", buffered=False)
+    assert again.status_code == 200
+    for rv in (again, streams[1]):
+        rv.close()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""热启动快照的读写与版本校验、院校注册表编译，以及重启后直接用快照响应"""
+
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+import warm_start
+from registry import load_registry, parse_links_md
+from warm_start import WarmStart
+
+WEBAPP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_round_trip_and_version_check(tmp_path):
+    path = str(tmp_path / "warm.pickle")
+    WarmStart(path, "v1").write(pickle.dumps({"rows": [1, 2]}))
+    snap = WarmStart(path, "v1")
+    assert snap.load() == {"rows": [1, 2]} and snap.loaded_at is not None
+    assert WarmStart(path, "v2").load() is None
+    assert WarmStart(path, "v1", enabled=False).load() is None
+    assert WarmStart(str(tmp_path / "missing.pickle"), "v1").load() is None
+
+
+def test_old_format_and_corrupt_file_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "warm.pickle")
+    WarmStart(path, "v1").write(pickle.dumps({}))
+    monkeypatch.setattr(warm_start, "SNAPSHOT_FORMAT", warm_start.SNAPSHOT_FORMAT + 1)
+    assert WarmStart(path, "v1").load() is None
+    with open(path, "wb") as f:
+        f.write(b"\x80\x05not a pickle")
+    assert WarmStart(path, "v1").load() is None
+
+
+def test_scheduled_writes_coalesce(tmp_path, monkeypatch):
+    monkeypatch.setattr(warm_start, "WRITE_DELAY", 0.05)
+    path = str(tmp_path / "warm.pickle")
+    snap = WarmStart(path, "v1")
+    calls = []
+    for i in range(5):
+        snap.schedule(lambda i=i: calls.append(i) or pickle.dumps(i))
+    snap._thread.join(0.5)
+    assert calls == [4]
+    assert WarmStart(path, "v1").load() == 4
+
+
+def test_registry_validation(tmp_path):
+    path = tmp_path / "schools.json"
+    entry = {"id": "a", "university": "甲大学", "department": "计算机", "short": "甲", "folder": "甲"}
+    path.write_text(json.dumps({"schools": [entry, dict(entry)]}, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(ValueError, match="重复"):
+        load_registry(str(path))
+    path.write_text(json.dumps({"schools": [{**entry, "folder": ""}]}, ensure_ascii=False),
+                    encoding="utf-8")
+    with pytest.raises(ValueError, match="folder"):
+        load_registry(str(path))
+
+
+def test_links_md_compiled_by_section(tmp_path):
+    md = tmp_path / "links.md"
+    md.write_text("# 院校网址汇总\n\n## 1. 甲大学 计算机\n\n- **官网**: https://a.edu.cn/\n"
+                  "  - 另一入口: https://b.edu.cn/\n\n## 2. 未跟踪学校\n\n- **官网**: https://c.edu.cn/\n",
+                  encoding="utf-8")
+    assert parse_links_md(str(md), {"甲大学 计算机": "a"}) == {"a": [
+        {"label": "官网", "url": "https://a.edu.cn/"},
+        {"label": "另一入口", "url": "https://b.edu.cn/"}]}
+
+
+RESTART_SCRIPT = """
+import json, app
+first = app.warm_start.loaded_at is not None
+if not first:
+    app.app.test_client().get("/api/schools")
+    app.warm_start.write(app._dump_warm_start(app.get_dashboard().data))
+snap = app.dashboard_view.snapshot
+print(json.dumps({"restored": first, "build_ms": snap and snap.build_ms,
+                  "schools": len(app.app.test_client().get("/api/schools").get_json())}))
+"""
+
+
+def test_restart_serves_snapshot(tmp_path):
+    for sub in ("webapp", "monitor"):
+        os.makedirs(tmp_path / sub)
+    env = {k: v for k, v in os.environ.items() if not k.startswith("CAMP_")}
+    env.update(CAMP_BASE_DIR=str(tmp_path), CAMP_WATCH_INTERVAL="3600")
+
+    def run():
+        out = subprocess.run([sys.executable, "-c", RESTART_SCRIPT], cwd=WEBAPP_DIR, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    cold = run()
+    warm = run()
+    assert cold["restored"] is False and warm["restored"] is True
+    # 重启后首个请求直接返回快照（预填的快照构建耗时为 0）
+    assert warm["build_ms"] == 0.0 and warm["schools"] == cold["schools"]
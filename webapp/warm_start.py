@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+热启动快照
+把进程内已计算的缓存（看板、通知索引、文件夹扫描结果、院校链接）持久化到一个带版本的文件，
+重启后先用快照响应请求，再由后台轮询比对输入指纹、按需重建（stale-while-revalidate）。
+文件由文件头与正文两段 pickle 组成，版本不一致时只读文件头即放弃。
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+
+# 快照内容的格式版本：缓存结构或看板字段变化时递增，旧快照自动作废
+SNAPSHOT_FORMAT = 8
+
+# 两次写入之间的最短间隔（秒），短时间内多次重建只写最后一次
+WRITE_DELAY = 1.0
+
+
+class WarmStart:
+    """
+    path: 快照文件路径
+    version: 当前代码与配置对应的版本号（注册表等变化时不同），不一致的快照不会被加载
+    """
+
+    def __init__(self, path, version, enabled=True):
+        self.path = path
+        self.version = version
+        self.enabled = enabled
+        self.loaded_at = None
+        self._dump_fn = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def load(self):
+        """读取快照正文；文件缺失、损坏或版本不一致时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                header = pickle.load(f)
+                if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != self.version:
+                    return None
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logging.warning("热启动快照读取失败，忽略: %s", self.path, exc_info=True)
+            return None
+        self.loaded_at = header.get("saved_at")
+        return payload
+
+    def schedule(self, dump_fn):
+        """
+        请求写入快照：dump_fn() 返回 pickle 后的正文，在后台线程中调用（调用方负责加锁取一致的数据）。
+        多次请求合并为一次写入
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._dump_fn = dump_fn
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="warm-start-writer", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(WRITE_DELAY)
+            self._wakeup.clear()
+            with self._lock:
+                dump_fn, self._dump_fn = self._dump_fn, None
+            if dump_fn is None:
+                continue
+            try:
+                self.write(dump_fn())
+            except Exception:
+                logging.exception("热启动快照写入失败")
+
+    def write(self, body):
+        """原子写入（多个 worker 各用自己的临时文件）"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        header = {"format": SNAPSHOT_FORMAT, "version": self.version, "saved_at": time.time()}
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(body)
+        os.replace(tmp, self.path)
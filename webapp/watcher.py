@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+输入文件监视
+单个后台线程轮询各输入的指纹（stat 信息），变化时通知订阅者。
+所有订阅者共享同一次轮询，不随订阅者数量增加文件系统开销。
+"""
+
+import hashlib
+import logging
+import os
+import threading
+
+
+def stat_fingerprint(path):
+    """单个文件的指纹：(inode, 大小, 修改时间)，文件不存在时为 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def tree_fingerprint(path):
+    """目录树的指纹：所有非隐藏文件/目录的 (相对路径, 大小, 修改时间) 的摘要（跨进程稳定）"""
+    if not os.path.isdir(path):
+        return None
+    entries = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in dirs + files:
+            if name.startswith('.'):
+                continue
+            full = os.path.join(root, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((os.path.relpath(full, path), st.st_size, st.st_mtime_ns))
+    entries.sort()
+    return hashlib.blake2b(repr(entries).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class InputWatcher:
+    """轮询一组命名输入的指纹，变化时以变化的输入名集合回调订阅者"""
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._inputs = {}
+        self._fingerprints = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seeded = False
+
+    def add_input(self, name, fingerprint_fn):
+        """登记一个输入及其指纹函数"""
+        with self._lock:
+            self._inputs[name] = fingerprint_fn
+
+    def subscribe(self, callback):
+        """订阅变化通知，callback(changed_names)"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def seed(self, fingerprints):
+        """
+        以已知的指纹（如热启动快照对应的输入）为基线：start() 不再在当前线程轮询，
+        后台线程的首次轮询与之比较，变化的输入照常通知订阅者
+        """
+        with self._lock:
+            self._fingerprints.update(fingerprints)
+            self._seeded = True
+
+    def fingerprint(self, name):
+        """最近一次轮询得到的指纹（尚未轮询时为 None）"""
+        return self._fingerprints.get(name)
+
+    def current_fingerprints(self, fresh=None):
+        """
+        全部输入的当前指纹（不更新轮询基线，不触发回调）。
+        fresh 为要立即重新计算的输入名（None 为全部），其余取最近一次轮询的结果，尚未轮询过的照常计算
+        """
+        with self._lock:
+            inputs = list(self._inputs.items())
+        return {name: fingerprint_fn() if fresh is None or name in fresh or name not in self._fingerprints
+                else self._fingerprints[name] for name, fingerprint_fn in inputs}
+
+    def poll(self):
+        """轮询一次，返回变化的输入名集合并通知订阅者"""
+        with self._lock:
+            inputs = list(self._inputs.items())
+            subscribers = list(self._subscribers)
+        changed = set()
+        for name, fingerprint_fn in inputs:
+            fp = fingerprint_fn()
+            if name in self._fingerprints and self._fingerprints[name] != fp:
+                changed.add(name)
+            self._fingerprints[name] = fp
+        if changed:
+            for callback in subscribers:
+                try:
+                    callback(changed)
+                except Exception:
+                    logging.exception("输入变化回调失败: %s", sorted(changed))
+        return changed
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        启动后台轮询线程（重复调用无副作用）；首次轮询在当前线程完成，建立基线。
+        已由 seed() 给出基线时，首次轮询立即在后台进行
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="input-watcher", daemon=True)
+            seeded = self._seeded
+        if not seeded:
+            self.poll()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        if self._seeded:
+            try:
+                self.poll()
+            except Exception:
+                logging.exception("输入轮询失败")
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logging.exception("输入轮询失败")